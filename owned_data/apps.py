@@ -0,0 +1,20 @@
+"""Owned Data app configuration."""
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class OwnedDataConfig(AppConfig):
+    """Owned Data app configuration."""
+
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "owned_data"
+    verbose_name = "Owned Data"
+
+    def ready(self):
+        """Import the views modules of the installed apps.
+
+        The viewsets connect the signals of their denormalized fields and summaries
+        when they're defined, so they must be imported before any write, e.g. in a
+        shell or a management command, not on the first request.
+        """
+        autodiscover_modules("views")
@@ -1,4 +1,79 @@
-from .views import OwnedDataModelViewSet, CollaborateType
-
-__all__ = ["OwnedDataModelViewSet", "CollaborateType"]
+from .views import OwnedDataMixin, OwnedDataModelViewSet, CollaborateType
+from .checks import owned_data_check_many
+from .filters import OwnedDataFilterBackend
+from .permissions import OwnedDataPermission
+from .routers import (
+    OwnedDataReadReplicaRouter,
+    OwnedDataShardRouter,
+    get_owned_data_shard,
+)
+from .principals import (
+    OwnedDataPrincipalSource,
+    OwnedDataORMPrincipalSource,
+    OwnedDataTokenClaimsPrincipalSource,
+)
+from .acl import OwnedDataACLIndex, OwnedDataBitmaskPrincipalSource, owned_data_acl_index
+from .feeds import (
+    OwnedDataChangeFeed,
+    OwnedDataInMemoryTransport,
+    OwnedDataTransport,
+)
+from .snapshot import (
+    OwnedDataSnapshot,
+    OwnedDataSnapshotPrincipalSource,
+    write_owned_data_snapshot,
+)
+from .audit import (
+    OwnedDataAuditLog,
+    OwnedDataAuditSink,
+    OwnedDataDecisionRecord,
+    OwnedDataModelAuditSink,
+)
+from .budgets import OwnedDataQueryTracker
+from .exceptions import OwnedDataQueryBudgetExceeded
+from .denormalization import denormalize_owned_data_field, resync_owned_data_field
+from .policies import OwnedDataPolicyStore, owned_data_policy_store
+from .sharing import grant_owned_data, revoke_owned_data
+from .signals import owned_data_transferred
+from .summaries import get_owned_data_summaries, rebuild_owned_data_summaries
+from .transfer import transfer_owned_data
 
+__all__ = [
+    "OwnedDataMixin",
+    "OwnedDataModelViewSet",
+    "CollaborateType",
+    "owned_data_check_many",
+    "OwnedDataFilterBackend",
+    "OwnedDataPermission",
+    "OwnedDataReadReplicaRouter",
+    "OwnedDataShardRouter",
+    "get_owned_data_shard",
+    "OwnedDataPrincipalSource",
+    "OwnedDataORMPrincipalSource",
+    "OwnedDataTokenClaimsPrincipalSource",
+    "OwnedDataACLIndex",
+    "OwnedDataBitmaskPrincipalSource",
+    "owned_data_acl_index",
+    "OwnedDataSnapshot",
+    "OwnedDataSnapshotPrincipalSource",
+    "write_owned_data_snapshot",
+    "OwnedDataChangeFeed",
+    "OwnedDataTransport",
+    "OwnedDataInMemoryTransport",
+    "OwnedDataAuditLog",
+    "OwnedDataAuditSink",
+    "OwnedDataDecisionRecord",
+    "OwnedDataModelAuditSink",
+    "OwnedDataQueryTracker",
+    "OwnedDataQueryBudgetExceeded",
+    "denormalize_owned_data_field",
+    "resync_owned_data_field",
+    "OwnedDataPolicyStore",
+    "owned_data_policy_store",
+    "grant_owned_data",
+    "revoke_owned_data",
+    "owned_data_transferred",
+    "get_owned_data_summaries",
+    "rebuild_owned_data_summaries",
+    "transfer_owned_data",
+]
@@ -0,0 +1,223 @@
+"""Owned Data bitmask ACL index implementation.
+
+Each group and permission gets a stable bit position in the process, so the
+g: and p: collaborators of a viewset method compile into a bitmask, and the
+user memberships into an integer mask. The allow decision is one AND operation:
+>>> user_mask & collaborators_mask == collaborators_mask
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_save
+from rest_framework.request import Request
+from .principals import OwnedDataORMPrincipalSource
+from .signals import owned_data_transferred
+
+
+class OwnedDataACLIndex:
+    """In-process bitmask index of the group and permission memberships.
+
+    The user masks are rebuilt lazily: the m2m_changed and post_save signals of
+    this process drop the affected masks, and the masks expire after ttl seconds
+    to pick up the changes made by the other processes.
+    """
+
+    # Seconds to keep a user mask.
+    ttl: float = 60
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._lock = threading.Lock()
+        self._bits: Dict[Tuple[str, str], int] = {}
+        self._compiled: Dict[Tuple[str, ...], Tuple[int, int]] = {}
+        # {user pk: (group mask, permission mask, expiry)}.
+        self._user_masks: Dict[int, Tuple[int, int, float]] = {}
+        self._connected = False
+
+    def get_bit(self, kind: str, name: str) -> int:
+        """Get the bit of a group ("g") or a permission codename ("p").
+
+        Args:
+            kind (str): "g" or "p".
+            name (str): group name, or permission codename.
+
+        Returns:
+            int: the bit value, e.g. 1 << 3.
+        """
+        key = (kind, name)
+        if (bit := self._bits.get(key)) is None:
+            with self._lock:
+                if (bit := self._bits.get(key)) is None:
+                    bit = self._bits[key] = 1 << len(self._bits)
+        return bit
+
+    def compile(self, collaborators: List[str]) -> Optional[Tuple[int, int]]:
+        """Compile the g: and p: collaborators into the group and permission masks.
+
+        >>> compile(["g:editor", "p:change_post"])
+        (1, 2)
+
+        Args:
+            collaborators (List[str]): collaborators.
+
+        Returns:
+            Optional[Tuple[int, int]]: group and permission masks, or None if there
+            are other collaborator types.
+        """
+        key = tuple(collaborators)
+        if (masks := self._compiled.get(key)) is not None:
+            return masks
+
+        group_mask = permission_mask = 0
+        for collaborator in collaborators:
+            prefix, _, value = collaborator.partition(":")
+            if prefix == "g":
+                group_mask |= self.get_bit("g", value)
+            elif prefix == "p":
+                permission_mask |= self.get_bit("p", value.rsplit(".", 1)[-1])
+            else:
+                return None
+
+        masks = self._compiled[key] = (group_mask, permission_mask)
+        return masks
+
+    def get_user_masks(self, user) -> Tuple[int, int]:
+        """Get the group and permission masks of the user.
+
+        Superusers have all permission bits.
+
+        Args:
+            user (AbstractBaseUser): user object.
+
+        Returns:
+            Tuple[int, int]: group and permission masks.
+        """
+        self.connect()
+        masks = self._user_masks.get(user.pk)
+        if masks is not None and masks[2] > time.monotonic():
+            return masks[0], masks[1]
+
+        group_mask = 0
+        for name in user.groups.values_list("name", flat=True):
+            group_mask |= self.get_bit("g", name)
+
+        if user.is_active and user.is_superuser:
+            permission_mask = -1
+        else:
+            permission_mask = 0
+            for permission in user.get_all_permissions():
+                permission_mask |= self.get_bit("p", permission.rsplit(".", 1)[-1])
+
+        self._user_masks[user.pk] = (
+            group_mask,
+            permission_mask,
+            time.monotonic() + self.ttl,
+        )
+        return group_mask, permission_mask
+
+    def invalidate(self, user_pks: Optional[List[int]] = None):
+        """Drop the masks of the users, or all of them.
+
+        Args:
+            user_pks (Optional[List[int]]): user primary keys. Defaults to None (all).
+        """
+        if user_pks is None:
+            self._user_masks.clear()
+            return
+        for user_pk in user_pks:
+            self._user_masks.pop(user_pk, None)
+
+    def _on_user_m2m_changed(self, sender, instance, action, reverse, pk_set, **kwargs):
+        """Drop the masks of the users whose groups or permissions are changed."""
+        if not action.startswith("post_"):
+            return
+        if not reverse:
+            self.invalidate([instance.pk])
+        else:
+            self.invalidate(None if pk_set is None else list(pk_set))
+
+    def _on_group_changed(self, sender, action="post_", **kwargs):
+        """Drop all masks when group permissions or names are changed."""
+        if action.startswith("post_"):
+            self.invalidate()
+
+    def _on_user_saved(self, sender, instance, **kwargs):
+        """Drop the mask of a saved user, e.g. a superuser change."""
+        self.invalidate([instance.pk])
+
+    def _on_owned_data_transferred(self, sender, from_user, to_user, **kwargs):
+        """Drop the masks of both users of an ownership transfer."""
+        self.invalidate([from_user.pk, to_user.pk])
+
+    def connect(self):
+        """Connect the invalidation signals, once."""
+        if self._connected:
+            return
+        user_model = get_user_model()
+        uid = f"owned_data_acl_index:{id(self)}"
+        m2m_changed.connect(
+            self._on_user_m2m_changed,
+            sender=user_model.groups.through,
+            dispatch_uid=f"{uid}:groups",
+        )
+        m2m_changed.connect(
+            self._on_user_m2m_changed,
+            sender=user_model.user_permissions.through,
+            dispatch_uid=f"{uid}:user_permissions",
+        )
+        m2m_changed.connect(
+            self._on_group_changed,
+            sender=Group.permissions.through,
+            dispatch_uid=f"{uid}:group_permissions",
+        )
+        post_save.connect(self._on_group_changed, sender=Group, dispatch_uid=f"{uid}:group")
+        post_save.connect(
+            self._on_user_saved, sender=user_model, dispatch_uid=f"{uid}:user"
+        )
+        owned_data_transferred.connect(
+            self._on_owned_data_transferred, dispatch_uid=f"{uid}:transferred"
+        )
+        self._connected = True
+
+
+# The ACL index of the process.
+owned_data_acl_index = OwnedDataACLIndex()
+
+
+class OwnedDataBitmaskPrincipalSource(OwnedDataORMPrincipalSource):
+    """Principal source based on the bitmask ACL index.
+
+    The g: and p: collaborators are validated by the user masks of the index,
+    with the permission codenames. The u: collaborators use the user model.
+    """
+
+    # The ACL index.
+    acl_index: OwnedDataACLIndex = owned_data_acl_index
+
+    def has_group(self, request: Request, value: str) -> bool:
+        """Check if the request user is a member of the given group by the index."""
+        group_mask, _ = self.acl_index.get_user_masks(request.user)
+        return bool(group_mask & self.acl_index.get_bit("g", value))
+
+    def has_permission(self, request: Request, value: str) -> bool:
+        """Check if the request user has the given permission codename by the index."""
+        _, permission_mask = self.acl_index.get_user_masks(request.user)
+        return bool(
+            permission_mask & self.acl_index.get_bit("p", value.rsplit(".", 1)[-1])
+        )
+
+    def has_collaborators(
+        self, request: Request, collaborators: List[str]
+    ) -> Optional[bool]:
+        """Check all the g: and p: collaborators at once by the compiled masks."""
+        masks = self.acl_index.compile(collaborators)
+        if masks is None:
+            return None
+
+        group_mask, permission_mask = self.acl_index.get_user_masks(request.user)
+        return (
+            group_mask & masks[0] == masks[0]
+            and permission_mask & masks[1] == masks[1]
+        )
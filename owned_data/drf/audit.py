@@ -0,0 +1,217 @@
+"""Owned Data decision audit log implementation.
+
+The owned_data_collaborators decisions are put on an in-process bounded queue,
+and a background thread writes them to a sink in batches, so the requests don't
+wait for an audit write.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional
+from abcmeta import ABC, abstractmethod
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class OwnedDataDecisionRecord(NamedTuple):
+    """Compact decision record."""
+
+    created_at: datetime
+    user_pk: Any
+    viewset: str
+    action: str
+    allowed: bool
+    collaborator: str
+
+
+class OwnedDataAuditSink(ABC):
+    """Decision records sink interface."""
+
+    @abstractmethod
+    def write(self, records: List[OwnedDataDecisionRecord]):
+        """Write a batch of records.
+
+        Args:
+            records (List[OwnedDataDecisionRecord]): decision records.
+        """
+
+
+class OwnedDataModelAuditSink(OwnedDataAuditSink):
+    """Sink which writes the records to owned_data.models.OwnedDataDecision (default).
+
+    "owned_data" must be in INSTALLED_APPS to use it. The collaborators, e.g. the
+    matched ones of a long list, are truncated to the max_length of the column.
+    """
+
+    def write(self, records: List[OwnedDataDecisionRecord]):
+        """Write the records in a single bulk_create."""
+        from owned_data.models import OwnedDataDecision
+
+        max_length = OwnedDataDecision._meta.get_field("collaborator").max_length
+        OwnedDataDecision.objects.bulk_create(
+            OwnedDataDecision(
+                created_at=record.created_at,
+                user_id=record.user_pk,
+                viewset=record.viewset,
+                action=record.action,
+                allowed=record.allowed,
+                collaborator=record.collaborator[:max_length],
+            )
+            for record in records
+        )
+
+
+class OwnedDataAuditLog:
+    """In-process bounded queue of decision records, flushed by a background thread.
+
+    When the queue is full, the "drop" policy drops the record, and the "block"
+    policy waits up to block_timeout seconds for a free slot before dropping it.
+    The dropped records are counted in the dropped attribute.
+    """
+
+    # Maximum number of queued records.
+    max_size: int = 10000
+
+    # Maximum number of records per sink write.
+    batch_size: int = 500
+
+    # Seconds to wait for more records, before writing a partial batch.
+    flush_interval: float = 1
+
+    # "drop" or "block".
+    policy: str = "drop"
+
+    # Seconds to wait for a free slot by the "block" policy.
+    block_timeout: float = 0.1
+
+    # Flush the queue by a background thread. Otherwise, by flush() calls.
+    background: bool = True
+
+    def __init__(self, sink: Optional[OwnedDataAuditSink] = None, **options: Any):
+        """Initialize the audit log.
+
+        >>> OwnedDataAuditLog(sink=KafkaSink(), max_size=1000, policy="block")
+
+        Args:
+            sink (Optional[OwnedDataAuditSink]): records sink.
+                Defaults to OwnedDataModelAuditSink.
+            options (Any): overrides of the class attributes, e.g. max_size.
+
+        Raises:
+            ValueError: in case of an invalid policy or option.
+        """
+        for name, value in options.items():
+            if not hasattr(type(self), name):
+                raise ValueError("invalid audit log option: %s" % name)
+            setattr(self, name, value)
+        if self.policy not in ("drop", "block"):
+            raise ValueError("invalid audit log policy! valid policies: drop, block")
+
+        self.sink = sink or OwnedDataModelAuditSink()
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._queue: "queue.Queue[OwnedDataDecisionRecord]" = queue.Queue(self.max_size)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        atexit.register(self.flush)
+
+    def __start(self):
+        """Start the background thread once per process, e.g. after a pre-fork."""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # The thread of the parent process isn't copied by fork.
+            self._queue = queue.Queue(self.max_size)
+            self._thread = threading.Thread(
+                target=self.__run, name="owned-data-audit-log", daemon=True
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def record(
+        self,
+        user_pk: Any,
+        viewset: str,
+        action: str,
+        allowed: bool,
+        collaborator: str = "",
+    ):
+        """Put a decision record on the queue, without waiting for the write.
+
+        Args:
+            user_pk (Any): user primary key, or None for anonymous users.
+            viewset (str): dotted path of the viewset class.
+            action (str): viewset action, or HTTP method.
+            allowed (bool): decision.
+            collaborator (str): the matched collaborators, or the denying one.
+                Defaults to "".
+        """
+        if self.background:
+            self.__start()
+        record = OwnedDataDecisionRecord(
+            timezone.now(), user_pk, viewset, action, allowed, collaborator
+        )
+        try:
+            if self.policy == "block":
+                self._queue.put(record, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.recorded += 1
+
+    def __write(self, records: List[OwnedDataDecisionRecord]):
+        """Write a batch to the sink, and count the failures."""
+        with self._write_lock:
+            try:
+                self.sink.write(records)
+            except Exception:
+                self.failed += len(records)
+                logger.exception("failed to write %d audit records", len(records))
+                return
+            self.written += len(records)
+
+    def __drain(self, records: List[OwnedDataDecisionRecord]):
+        """Move the queued records into the batch, up to batch_size."""
+        while len(records) < self.batch_size:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def __run(self):
+        """Write the batches in the background."""
+        while True:
+            records = [self._queue.get()]
+            # Wait for a full batch, up to flush_interval.
+            deadline = time.monotonic() + self.flush_interval
+            while len(records) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    records.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self.__write(records)
+
+    def flush(self):
+        """Write the queued records in the calling thread, e.g. in tests, or at exit."""
+        while True:
+            records: List[OwnedDataDecisionRecord] = []
+            self.__drain(records)
+            if not records:
+                return
+            self.__write(records)
@@ -0,0 +1,108 @@
+"""Owned Data query budgets implementation.
+
+OwnedDataQueryTracker counts the database queries which the owned data logic of a
+request runs, e.g. the policy, collaborators, and filter, against the
+owned_data_query_budget of the action:
+
+>>> with OwnedDataQueryTracker("post.views.PostViewSet", "list", budget=1):
+...     view.check_owned_data_collaborators()
+
+Exceeding the budget raises OwnedDataQueryBudgetExceeded with the captured SQL in
+DEBUG mode and tests, and logs a sampled warning otherwise.
+"""
+import logging
+import random
+from contextlib import ExitStack
+from typing import List, Optional
+from django.conf import settings
+from django.core import mail
+from django.db import connections
+from .exceptions import OwnedDataQueryBudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+
+class OwnedDataQueryTracker:
+    """Reentrant counter of the queries of all the database connections."""
+
+    # Raise OwnedDataQueryBudgetExceeded instead of logging a warning.
+    # Defaults to None, which means in DEBUG mode, or in the Django test environment.
+    strict: Optional[bool] = None
+
+    # The fraction of the exceeded budgets which are logged, when not strict.
+    # Defaults to 0.01.
+    sample_rate: float = 0.01
+
+    def __init__(self, label: str, action: str, budget: int):
+        """Initialize the tracker.
+
+        Args:
+            label (str): dotted path of the viewset class.
+            action (str): viewset action, or the lowercase HTTP method.
+            budget (int): maximum number of queries.
+        """
+        self.label = label
+        self.action = action
+        self.budget = budget
+        self.queries: List[str] = []
+        self.__depth = 0
+        self.__exit_stack: Optional[ExitStack] = None
+        self.__reported = False
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper of the connections, which captures the SQL."""
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self) -> "OwnedDataQueryTracker":
+        """Start counting, unless it's counting already."""
+        if self.__depth == 0:
+            self.__exit_stack = ExitStack()
+            for connection in connections.all():
+                self.__exit_stack.enter_context(connection.execute_wrapper(self))
+        self.__depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop counting, and check the budget once the outermost block is done."""
+        self.__depth -= 1
+        if self.__depth > 0:
+            return
+        self.__exit_stack.close()
+        self.__exit_stack = None
+        # The denied requests are checked as well.
+        if len(self.queries) > self.budget:
+            self.report()
+
+    def is_strict(self) -> bool:
+        """Check if the exceeded budget must raise.
+
+        Returns:
+            bool: True in DEBUG mode, or in the Django test environment, by default.
+        """
+        if self.strict is not None:
+            return self.strict
+        # setup_test_environment() adds the outbox of the locmem email backend.
+        return settings.DEBUG or hasattr(mail, "outbox")
+
+    def report(self):
+        """Report the exceeded budget once.
+
+        Raises:
+            OwnedDataQueryBudgetExceeded: in strict mode.
+        """
+        if self.__reported:
+            return
+        self.__reported = True
+
+        message = "%s %s ran %d owned data queries, over the budget of %d:\n%s" % (
+            self.label,
+            self.action,
+            len(self.queries),
+            self.budget,
+            "\n".join(self.queries),
+        )
+        if self.is_strict():
+            raise OwnedDataQueryBudgetExceeded(message)
+        if random.random() < self.sample_rate:
+            logger.warning(message)
@@ -0,0 +1,144 @@
+"""Owned Data denormalization implementation.
+
+Deep ownership paths like "comment__post__author" join a table per step on every
+filtered query. They can be materialized into a local indexed column of the model,
+which is kept correct by signals on every model along the path.
+"""
+from typing import Any, Dict, List, Optional, Tuple, Type
+from django.db.models import Model, OuterRef, Subquery
+from django.db.models.signals import post_save, pre_save
+
+# Registered denormalized fields: {(model, path): field name}.
+_denormalized_fields: Dict[Tuple[Type[Model], str], str] = {}
+
+
+def _get_path_models(model: Type[Model], path: str) -> List[Type[Model]]:
+    """Get the models along the ownership path.
+
+    >>> _get_path_models(Comment, "post__author")
+    [Comment, Post]
+
+    Args:
+        model (Type[Model]): source model.
+        path (str): ownership path, e.g. "post__author".
+
+    Raises:
+        ValueError: in case of a path which is not made of forward relations.
+
+    Returns:
+        List[Type[Model]]: the models which hold each part of the path.
+    """
+    models = [model]
+    for part in path.split("__")[:-1]:
+        field = models[-1]._meta.get_field(part)
+        if not (field.many_to_one or field.one_to_one) or not field.concrete:
+            raise ValueError(
+                "invalid denormalized path %s! only forward relations are supported" % path
+            )
+        models.append(field.related_model)
+    return models
+
+
+def _resolve_owned_data_value(instance: Optional[Model], path: str) -> Any:
+    """Resolve the ownership path value of the instance.
+
+    >>> _resolve_owned_data_value(comment, "post__author")
+    1
+
+    Args:
+        instance (Optional[Model]): model instance.
+        path (str): ownership path.
+
+    Returns:
+        Any: the column value of the last part, or None if the path is broken.
+    """
+    *parts, last = path.split("__")
+    for part in parts:
+        if instance is None:
+            return None
+        instance = getattr(instance, part)
+    if instance is None:
+        return None
+    return getattr(instance, instance._meta.get_field(last).attname)
+
+
+def resync_owned_data_field(model: Type[Model], path: str, field: str) -> int:
+    """Re-sync the denormalized field of all records in a single UPDATE.
+
+    It repairs the drift caused by the writes which don't send signals,
+    e.g. QuerySet.update() or on_delete=SET_NULL.
+
+    Args:
+        model (Type[Model]): source model.
+        path (str): ownership path, e.g. "post__author".
+        field (str): denormalized field name, e.g. "owned_data_owner".
+
+    Returns:
+        int: number of updated records.
+    """
+    attname = model._meta.get_field(field).attname
+    return model._default_manager.update(
+        **{
+            attname: Subquery(
+                model._default_manager.filter(pk=OuterRef("pk")).values(path)[:1]
+            )
+        }
+    )
+
+
+def denormalize_owned_data_field(model: Type[Model], path: str, field: str):
+    """Keep the denormalized field of the model equal to the ownership path value.
+
+    >>> denormalize_owned_data_field(Comment, "post__author", "owned_data_owner")
+
+    The source model sets the field on save, and the other models along the path
+    update the related records in bulk when they are changed.
+
+    Args:
+        model (Type[Model]): source model.
+        path (str): ownership path, e.g. "post__author".
+        field (str): denormalized field name, e.g. "owned_data_owner".
+    """
+    if _denormalized_fields.get((model, path)) == field:
+        return
+
+    path_models = _get_path_models(model, path)
+    attname = model._meta.get_field(field).attname
+    parts = path.split("__")
+    uid = f"owned_data:{model._meta.label}:{path}"
+
+    def set_source_value(sender, instance, raw=False, **kwargs):
+        if not raw:
+            setattr(instance, attname, _resolve_owned_data_value(instance, path))
+
+    pre_save.connect(set_source_value, sender=model, weak=False, dispatch_uid=uid)
+
+    for depth, path_model in enumerate(path_models[1:], start=1):
+        related_path = "__".join(parts[:depth])
+        remaining_path = "__".join(parts[depth:])
+
+        def resync_related(
+            sender,
+            instance,
+            created=False,
+            raw=False,
+            related_path=related_path,
+            remaining_path=remaining_path,
+            **kwargs,
+        ):
+            # New records have no related records yet.
+            if created or raw:
+                return
+            value = _resolve_owned_data_value(instance, remaining_path)
+            model._default_manager.filter(**{related_path: instance}).exclude(
+                **{attname: value}
+            ).update(**{attname: value})
+
+        post_save.connect(
+            resync_related,
+            sender=path_model,
+            weak=False,
+            dispatch_uid=f"{uid}:{depth}",
+        )
+
+    _denormalized_fields[(model, path)] = field
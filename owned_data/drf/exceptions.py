@@ -0,0 +1,5 @@
+"""Owned Data exceptions."""
+
+
+class OwnedDataQueryBudgetExceeded(Exception):
+    """The owned data logic of an action ran more queries than its budget."""
@@ -0,0 +1,288 @@
+"""Owned Data change feed implementation.
+
+The changes of a model are fanned out to the subscribers who own them, without a
+query per subscriber: the owned_data_fields of the viewset compile into an
+in-memory predicate, which resolves the owner ids of the changed instance, and
+the subscribers are looked up by an index from owner id to subscribers. The
+messages of the saved and deleted instances are sent once their transaction
+commits.
+"""
+import operator
+import threading
+from ast import literal_eval
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, List, Set, Tuple, Type, Union
+from abcmeta import ABC, abstractmethod
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils.module_loading import import_string
+from rest_framework.request import Request
+from .denormalization import _resolve_owned_data_value
+from .signals import owned_data_transferred
+from .views import OwnedDataMixin
+
+
+class OwnedDataTransport(ABC):
+    """Change feed transport interface."""
+
+    @abstractmethod
+    def send(self, subscriber: Hashable, message: Dict[str, Any]):
+        """Deliver the message to the subscriber.
+
+        Args:
+            subscriber (Hashable): subscriber id, e.g. a websocket channel name.
+            message (Dict[str, Any]): change message.
+        """
+
+
+class OwnedDataInMemoryTransport(OwnedDataTransport):
+    """Transport which keeps the messages of each subscriber in memory (for tests)."""
+
+    def __init__(self):
+        """Initialize empty mailboxes."""
+        self.messages: Dict[Hashable, List[Dict[str, Any]]] = defaultdict(list)
+
+    def send(self, subscriber: Hashable, message: Dict[str, Any]):
+        """Append the message to the subscriber mailbox."""
+        self.messages[subscriber].append(message)
+
+
+class OwnedDataChangeFeed:
+    """Fan out the saved and deleted instances of the viewset model to their owners.
+
+    >>> feed = OwnedDataChangeFeed("post.views.AdminPostViewSet", transport)
+    >>> feed.connect()
+    >>> feed.subscribe("channel-1", request)
+
+    The subscribers are authorized once, by the GET collaborators, when they
+    subscribe. The records shared by owned_data.models.OwnedDataShare are not
+    fanned out. The previous owners of a saved instance, e.g. after an owner
+    reassignment, receive a "deleted" message. An ownership transfer sends a single
+    "transferred" message, without pk, to the subscribers of both users, so they
+    reload the records.
+    """
+
+    def __init__(
+        self,
+        viewset_class: Union[str, Type[OwnedDataMixin]],
+        transport: OwnedDataTransport,
+    ):
+        """Compile the ownership predicate of the viewset.
+
+        Args:
+            viewset_class (Union[str, Type[OwnedDataMixin]]): viewset class, or its dotted path.
+            transport (OwnedDataTransport): transport of the change messages.
+
+        Raises:
+            ValueError: in case of a viewset without queryset or owned_data_fields.
+        """
+        if isinstance(viewset_class, str):
+            viewset_class = import_string(viewset_class)
+        if viewset_class.queryset is None or not viewset_class.owned_data_fields:
+            raise ValueError(
+                "%s must have queryset and owned_data_fields!" % viewset_class.__name__
+            )
+
+        self.viewset_class = viewset_class
+        self.model: Type[Model] = viewset_class.queryset.model
+        self.transport = transport
+        self._lock = threading.Lock()
+        # {subscriber: user pk}, and {user pk: subscribers}.
+        self._subscribers: Dict[Hashable, Any] = {}
+        self._index: Dict[Any, Set[Hashable]] = defaultdict(set)
+        self._predicate = self.__compile_predicate()
+
+    def __compile_predicate(
+        self,
+    ) -> List[Tuple[List[str], List[Tuple[str, Callable, Any]]]]:
+        """Compile owned_data_fields into an "OR" of (owner paths, literals).
+
+        >>> owned_data_fields = [["author"], ["publisher", "is_draft=False"]]
+        >>> __compile_predicate()
+        [(["author"], []), (["publisher"], [("is_draft", operator.eq, False)])]
+
+        Returns:
+            List[Tuple[List[str], List[Tuple[str, Callable, Any]]]]: compiled predicate.
+        """
+        owned_data_fields = self.viewset_class.owned_data_fields
+        if isinstance(owned_data_fields[0], str):
+            owned_data_fields = [owned_data_fields]
+
+        denormalized_fields = self.viewset_class.owned_data_denormalized_fields or {}
+        predicate = []
+        for owned_data_field in owned_data_fields:
+            owner_paths, literals = [], []
+            for field_value in owned_data_field:
+                if "!=" in field_value:
+                    attribute, value = field_value.split("!=", maxsplit=1)
+                    literals.append((attribute, operator.ne, literal_eval(value)))
+                elif "=" in field_value:
+                    attribute, value = field_value.split("=", maxsplit=1)
+                    literals.append((attribute, operator.eq, literal_eval(value)))
+                else:
+                    # Use the local column of the denormalized path.
+                    owner_paths.append(denormalized_fields.get(field_value, field_value))
+            predicate.append((owner_paths, literals))
+        return predicate
+
+    def connect(self):
+        """Connect the save, delete, and owned_data_transferred signals."""
+        uid = f"owned_data:feed:{id(self)}"
+        pre_save.connect(
+            self.__on_pre_save, sender=self.model, weak=False, dispatch_uid=uid
+        )
+        post_save.connect(self.__on_save, sender=self.model, weak=False, dispatch_uid=uid)
+        post_delete.connect(
+            self.__on_delete, sender=self.model, weak=False, dispatch_uid=uid
+        )
+        owned_data_transferred.connect(
+            self.__on_transferred, weak=False, dispatch_uid=uid
+        )
+
+    def disconnect(self):
+        """Disconnect the signals."""
+        uid = f"owned_data:feed:{id(self)}"
+        pre_save.disconnect(sender=self.model, dispatch_uid=uid)
+        post_save.disconnect(sender=self.model, dispatch_uid=uid)
+        post_delete.disconnect(sender=self.model, dispatch_uid=uid)
+        owned_data_transferred.disconnect(dispatch_uid=uid)
+
+    def subscribe(self, subscriber: Hashable, request: Request):
+        """Subscribe to the changes of the records owned by the request user.
+
+        Args:
+            subscriber (Hashable): subscriber id, e.g. a websocket channel name.
+            request (Request): request of the subscriber.
+
+        Raises:
+            PermissionDenied: in case of the user is not a GET collaborator.
+        """
+        view = self.viewset_class()
+        view.request = request
+        view.action = "list"
+        view.check_owned_data_collaborators()
+
+        with self._lock:
+            self.__remove_subscriber(subscriber)
+            self._subscribers[subscriber] = request.user.pk
+            self._index[request.user.pk].add(subscriber)
+
+    def unsubscribe(self, subscriber: Hashable):
+        """Remove the subscriber.
+
+        Args:
+            subscriber (Hashable): subscriber id.
+        """
+        with self._lock:
+            self.__remove_subscriber(subscriber)
+
+    def __remove_subscriber(self, subscriber: Hashable):
+        """Remove the subscriber from the index (lock must be held)."""
+        if (user_pk := self._subscribers.pop(subscriber, None)) is not None:
+            self._index[user_pk].discard(subscriber)
+            if not self._index[user_pk]:
+                del self._index[user_pk]
+
+    def get_recipients(self, instance: Model) -> Set[Hashable]:
+        """Get the subscribers who own the instance, by the in-memory predicate.
+
+        Args:
+            instance (Model): changed instance.
+
+        Returns:
+            Set[Hashable]: subscriber ids.
+        """
+        owner_pks = set()
+        for owner_paths, literals in self._predicate:
+            if not all(
+                op(_resolve_owned_data_value(instance, attribute), value)
+                for attribute, op, value in literals
+            ):
+                continue
+            # Only literals, so the record is visible to everyone.
+            if not owner_paths:
+                with self._lock:
+                    return set(self._subscribers)
+            # "AND" of the owner paths: all of them must be the same user.
+            values = {_resolve_owned_data_value(instance, path) for path in owner_paths}
+            if len(values) == 1 and None not in values:
+                owner_pks |= values
+
+        with self._lock:
+            return {
+                subscriber
+                for owner_pk in owner_pks
+                for subscriber in self._index.get(owner_pk, ())
+            }
+
+    def publish(self, instance: Model, event: str):
+        """Send the change message to the subscribers who own the instance.
+
+        Args:
+            instance (Model): changed instance.
+            event (str): "created", "updated", or "deleted".
+        """
+        self.__send(self.get_recipients(instance), self.__get_message(instance, event))
+
+    def __get_message(self, instance: Model, event: str) -> Dict[str, Any]:
+        """Get the change message of the instance."""
+        return {"event": event, "model": self.model._meta.label, "pk": instance.pk}
+
+    def __send(self, recipients: Set[Hashable], message: Dict[str, Any]):
+        """Send the message to the recipients."""
+        for subscriber in recipients:
+            self.transport.send(subscriber, message)
+
+    def __publish_on_commit(
+        self, instance: Model, event: str, recipients: Set[Hashable]
+    ):
+        """Send the change message to the recipients once the transaction commits.
+
+        The message and the recipients are resolved now, e.g. the pk of a deleted
+        instance is reset after the signals.
+        """
+        if not recipients:
+            return
+        message = self.__get_message(instance, event)
+        transaction.on_commit(
+            lambda: self.__send(recipients, message), using=instance._state.db
+        )
+
+    def __on_pre_save(self, sender, instance, raw=False, **kwargs):
+        # The recipients of the stored instance, per feed of the model.
+        recipients = set()
+        if not raw and not instance._state.adding and instance.pk is not None:
+            previous = self.model._default_manager.filter(pk=instance.pk).first()
+            if previous is not None:
+                recipients = self.get_recipients(previous)
+        if "_owned_data_feed_recipients" not in instance.__dict__:
+            instance._owned_data_feed_recipients = {}
+        instance._owned_data_feed_recipients[id(self)] = recipients
+
+    def __on_save(self, sender, instance, created=False, raw=False, **kwargs):
+        if raw:
+            return
+        recipients = self.get_recipients(instance)
+        previous_recipients = instance.__dict__.get(
+            "_owned_data_feed_recipients", {}
+        ).pop(id(self), set())
+        self.__publish_on_commit(
+            instance, "created" if created else "updated", recipients
+        )
+        # The previous owners don't own the instance anymore.
+        self.__publish_on_commit(instance, "deleted", previous_recipients - recipients)
+
+    def __on_delete(self, sender, instance, **kwargs):
+        self.__publish_on_commit(instance, "deleted", self.get_recipients(instance))
+
+    def __on_transferred(self, sender, from_user, to_user, models=(), **kwargs):
+        if self.model not in models:
+            return
+        message = {"event": "transferred", "model": self.model._meta.label}
+        with self._lock:
+            subscribers = self._index.get(from_user.pk, set()) | self._index.get(
+                to_user.pk, set()
+            )
+        for subscriber in subscribers:
+            self.transport.send(subscriber, message)
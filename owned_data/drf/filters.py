@@ -0,0 +1,30 @@
+"""Owned Data filter backends implementation."""
+from typing import Optional
+from django.db.models import Q
+from django.db.models.query import QuerySet
+from rest_framework.filters import BaseFilterBackend
+
+
+class OwnedDataFilterBackend(BaseFilterBackend):
+    """OwnedData filter backend implementation.
+
+    It filters the queryset by the owned data filter of the view, merged with
+    owned_data_filter_params in a single filter() call.
+    The view must be derived from OwnedDataMixin.
+
+    >>> class PostListView(OwnedDataMixin, generics.ListAPIView):
+    ...     filter_backends = [OwnedDataFilterBackend]
+    ...     owned_data_fields = ["author"]
+    """
+
+    def filter_queryset(self, request, queryset: QuerySet, view) -> QuerySet:
+        """DRF built-in method."""
+        query: Optional[Q] = view.get_owned_data_filter()
+        for param, lookup in (view.owned_data_filter_params or {}).items():
+            if param in request.query_params:
+                param_query = Q(**{lookup: request.query_params[param]})
+                query = query & param_query if query is not None else param_query
+
+        if query is None:
+            return queryset
+        return queryset.filter(query)
@@ -0,0 +1,23 @@
+"""Owned Data permissions implementation."""
+from rest_framework.permissions import BasePermission
+
+
+class OwnedDataPermission(BasePermission):
+    """OwnedData permission implementation.
+
+    It validates the owned_data_collaborators of the view once per request,
+    in check_permissions. The view must be derived from OwnedDataMixin.
+
+    >>> class PostListView(OwnedDataMixin, generics.ListAPIView):
+    ...     permission_classes = [OwnedDataPermission]
+    ...     owned_data_collaborators = {CollaborateType.GET: ["g:editor"]}
+    """
+
+    def has_permission(self, request, view) -> bool:
+        """DRF built-in method.
+
+        Raises:
+            PermissionDenied: in case of permission denied.
+        """
+        view.check_owned_data_collaborators()
+        return True
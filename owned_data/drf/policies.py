@@ -0,0 +1,155 @@
+"""Owned Data policy store implementation.
+
+The policies of owned_data.models.OwnedDataPolicy override the owned_data_fields
+and owned_data_collaborators class attributes, so "owned_data" must be in
+INSTALLED_APPS to use them. Each process keeps the compiled policies, and checks
+a shared version key in the Django cache at most once per check_interval, so the
+edits propagate to all the workers without reading the table per request.
+"""
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+if TYPE_CHECKING:
+    from .views import CollaborateType
+
+OwnedDataPolicyRules = Tuple[
+    Optional[Union[List[str], List[List[str]]]],
+    Optional[Dict[Union["CollaborateType", str], List[str]]],
+]
+
+
+def compile_owned_data_policy(
+    fields: Any, collaborators: Any
+) -> OwnedDataPolicyRules:
+    """Compile the JSON policy into the owned_data_fields and owned_data_collaborators format.
+
+    >>> compile_owned_data_policy(["author"], {"post": ["g:bot"], "cancel": ["g:op"]})
+    (["author"], {CollaborateType.POST: ["g:bot"], "cancel": ["g:op"]})
+
+    Args:
+        fields (Any): owned data fields, or None.
+        collaborators (Any): {HTTP method or action: collaborators}, or None.
+
+    Raises:
+        ValueError: in case of an invalid policy.
+
+    Returns:
+        OwnedDataPolicyRules: owned_data_fields and owned_data_collaborators.
+    """
+    from .views import CollaborateType
+
+    if fields is not None:
+        if not isinstance(fields, list) or not fields:
+            raise ValueError("invalid policy fields! it must be a non-empty list")
+        if not all(isinstance(field, str) for field in fields) and not all(
+            isinstance(field, list) and all(isinstance(f, str) for f in field)
+            for field in fields
+        ):
+            raise ValueError("invalid policy fields! valid types: List[str], List[List[str]]")
+
+    if collaborators is None:
+        return fields, None
+    if not isinstance(collaborators, dict):
+        raise ValueError("invalid policy collaborators! it must be an object")
+
+    methods = {method.value for method in CollaborateType}
+    compiled: Dict[Union[CollaborateType, str], List[str]] = {}
+    for key, rules in collaborators.items():
+        # The HTTP methods, and the other keys are action names, e.g. "publish".
+        if key.lower() in methods:
+            key = CollaborateType(key.lower())
+        # The conditional collaborators aren't evaluated by the viewsets.
+        if not isinstance(rules, list) or not all(isinstance(r, str) for r in rules):
+            raise ValueError(
+                "invalid policy collaborators of %s! it must be a list of strings"
+                % getattr(key, "value", key)
+            )
+        compiled[key] = rules
+    return fields, compiled
+
+
+class OwnedDataPolicyStore:
+    """In-process cache of the compiled policies.
+
+    The policies are reloaded when the shared version key is changed, which is
+    checked at most once per check_interval seconds. The post_save and post_delete
+    signals of this process change the version key.
+    """
+
+    # Seconds between the checks of the shared version key.
+    check_interval: float = 5
+
+    # The cache key of the policies version.
+    version_key: str = "owned_data:policy:version"
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._lock = threading.Lock()
+        self._policies: Optional[Dict[str, OwnedDataPolicyRules]] = None
+        self._version: Optional[str] = None
+        self._next_check: float = 0
+        self._connected = False
+
+    def connect(self):
+        """Connect the signals of the policy model, once."""
+        if self._connected:
+            return
+        from owned_data.models import OwnedDataPolicy
+
+        uid = f"owned_data_policy_store:{id(self)}"
+        post_save.connect(
+            self._on_policy_changed, sender=OwnedDataPolicy, dispatch_uid=uid
+        )
+        post_delete.connect(
+            self._on_policy_changed, sender=OwnedDataPolicy, dispatch_uid=uid
+        )
+        self._connected = True
+
+    def invalidate(self):
+        """Change the shared version key, so all the workers reload the policies."""
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+        self._next_check = 0
+
+    def _on_policy_changed(self, sender, **kwargs):
+        """Invalidate the policies after a change."""
+        self.invalidate()
+
+    def __load(self) -> Dict[str, OwnedDataPolicyRules]:
+        """Load and compile all the policies in a single query."""
+        from owned_data.models import OwnedDataPolicy
+
+        return {
+            viewset: compile_owned_data_policy(fields, collaborators)
+            for viewset, fields, collaborators in OwnedDataPolicy.objects.values_list(
+                "viewset", "fields", "collaborators"
+            )
+        }
+
+    def get_policy(self, viewset: str) -> Optional[OwnedDataPolicyRules]:
+        """Get the compiled policy of the viewset.
+
+        Args:
+            viewset (str): dotted path of the viewset class.
+
+        Returns:
+            Optional[OwnedDataPolicyRules]: owned_data_fields and owned_data_collaborators,
+            or None if there is no policy.
+        """
+        self.connect()
+        now = time.monotonic()
+        if self._policies is None or now >= self._next_check:
+            with self._lock:
+                if self._policies is None or now >= self._next_check:
+                    version = cache.get(self.version_key)
+                    if self._policies is None or version != self._version:
+                        self._policies = self.__load()
+                        self._version = version
+                    self._next_check = now + self.check_interval
+        return self._policies.get(viewset)
+
+
+owned_data_policy_store = OwnedDataPolicyStore()
@@ -0,0 +1,168 @@
+"""Owned Data principal sources implementation.
+
+A principal source answers the collaborator checks of the request user:
+user (u:), group (g:), and permission (p:).
+"""
+from typing import Any, List, Optional, Set, Tuple
+from abcmeta import ABC, abstractmethod
+from django.contrib.auth.models import Permission
+from django.db.models import Q
+from rest_framework.request import Request
+
+
+class OwnedDataPrincipalSource(ABC):
+    """Principal source interface."""
+
+    @abstractmethod
+    def is_user(self, request: Request, value: str) -> bool:
+        """Check if the request user is the given user.
+
+        Args:
+            request (Request): DRF request.
+            value (str): username or email.
+
+        Returns:
+            bool: True if the request user matches.
+        """
+
+    @abstractmethod
+    def has_group(self, request: Request, value: str) -> bool:
+        """Check if the request user is a member of the given group.
+
+        Args:
+            request (Request): DRF request.
+            value (str): group name.
+
+        Returns:
+            bool: True if the request user is a member.
+        """
+
+    @abstractmethod
+    def has_permission(self, request: Request, value: str) -> bool:
+        """Check if the request user has the given permission.
+
+        Args:
+            request (Request): DRF request.
+            value (str): permission name or codename.
+
+        Returns:
+            bool: True if the request user has the permission.
+        """
+
+    def has_collaborators(
+        self, request: Request, collaborators: List[str]
+    ) -> Optional[bool]:
+        """Check all the collaborators at once, if the source supports it.
+
+        Args:
+            request (Request): DRF request.
+            collaborators (List[str]): collaborators, e.g. ["g:editor", "p:change_post"].
+
+        Returns:
+            Optional[bool]: True if the request user matches all of them, or None
+            to check them one by one.
+        """
+        return None
+
+    def get_collaborator_cost(self, collaborator: str) -> int:
+        """Get the relative cost of checking the collaborator.
+
+        The cheap collaborators are checked first.
+
+        >>> get_collaborator_cost("u:admin")
+        0
+
+        Args:
+            collaborator (str): collaborator, e.g. "g:editor".
+
+        Returns:
+            int: 0 for in-memory checks, 1 for cached group and permission sets,
+            2 for database lookups, and 3 for f: functions.
+        """
+        prefix = collaborator.split(":", maxsplit=1)[0]
+        if prefix == "u":
+            return 0
+        elif prefix == "f":
+            return 3
+        return 1
+
+
+class OwnedDataORMPrincipalSource(OwnedDataPrincipalSource):
+    """Principal source based on the Django auth models (default).
+
+    The group names of the request user are loaded once per request.
+    """
+
+    def is_user(self, request: Request, value: str) -> bool:
+        """Check if the request user is the given user by its username or email."""
+        user = request.user
+        return value in (user.get_username(), getattr(user, "email", None))
+
+    def has_group(self, request: Request, value: str) -> bool:
+        """Check if the request user is a member of the given group by the user groups."""
+        user, group_names = getattr(request, "_owned_data_group_names", (None, None))
+        if user is not request.user:
+            group_names = set(request.user.groups.values_list("name", flat=True))
+            request._owned_data_group_names = (request.user, group_names)
+        return value in group_names
+
+    def has_permission(self, request: Request, value: str) -> bool:
+        """Check if the request user has the given permission by the auth backends."""
+        # Active superusers have all permissions.
+        if request.user.is_active and request.user.is_superuser:
+            return True
+        permission = Permission.objects.select_related("content_type").get(
+            Q(name=value) | Q(codename=value)
+        )
+        return request.user.has_perm(
+            f"{permission.content_type.app_label}.{permission.codename}"
+        )
+
+    def get_collaborator_cost(self, collaborator: str) -> int:
+        """The p: collaborators are looked up in the database."""
+        if collaborator.startswith("p:"):
+            return 2
+        return super().get_collaborator_cost(collaborator)
+
+
+class OwnedDataTokenClaimsPrincipalSource(OwnedDataPrincipalSource):
+    """Principal source based on the claims of the authentication token.
+
+    The checks are in-memory lookups on request.auth, without any database query.
+    request.auth must be a mapping, e.g. the decoded JWT payload:
+    >>> {"username": "test", "groups": ["editor"], "permissions": ["change_post"]}
+    """
+
+    # Claims which identify the user.
+    user_claims: Tuple[str, ...] = ("username", "email")
+
+    # Claim which contains the group names.
+    groups_claim: str = "groups"
+
+    # Claim which contains the permission names or codenames.
+    permissions_claim: str = "permissions"
+
+    def _get_claims(self, request: Request) -> Any:
+        """Get the token claims of the request."""
+        return request.auth or {}
+
+    def _get_claim_set(self, request: Request, claim: str) -> Set[str]:
+        """Get a list claim of the request as a set."""
+        return set(self._get_claims(request).get(claim) or ())
+
+    def is_user(self, request: Request, value: str) -> bool:
+        """Check if the request user is the given user by the user claims."""
+        claims = self._get_claims(request)
+        return any(claims.get(claim) == value for claim in self.user_claims)
+
+    def has_group(self, request: Request, value: str) -> bool:
+        """Check if the request user is a member of the given group by the groups claim."""
+        return value in self._get_claim_set(request, self.groups_claim)
+
+    def has_permission(self, request: Request, value: str) -> bool:
+        """Check if the request user has the given permission by the permissions claim."""
+        return value in self._get_claim_set(request, self.permissions_claim)
+
+    def get_collaborator_cost(self, collaborator: str) -> int:
+        """The u:, g:, and p: collaborators are in-memory checks."""
+        return 3 if collaborator.startswith("f:") else 0
@@ -0,0 +1,121 @@
+"""Owned Data database routers implementation."""
+import zlib
+from contextvars import ContextVar
+from typing import Any, List, Optional, Tuple
+
+# The database alias that the current request reads from.
+# It's set by OwnedDataModelViewSet per request, and None means the default routing.
+owned_data_read_database: ContextVar[Optional[str]] = ContextVar(
+    "owned_data_read_database", default=None
+)
+
+# The model and the shard database alias of the current request.
+# It's set by OwnedDataModelViewSet per request, and None means the default routing.
+owned_data_shard_database: ContextVar[Optional[Tuple[Any, str]]] = ContextVar(
+    "owned_data_shard_database", default=None
+)
+
+
+def get_owned_data_shard(value: Any, shards: List[str]) -> str:
+    """Get the shard database alias of the ownership value.
+
+    >>> get_owned_data_shard(3, ["shard_0", "shard_1"])
+    "shard_1"
+
+    Args:
+        value (Any): ownership value, e.g. the author pk.
+        shards (List[str]): shard database aliases.
+
+    Returns:
+        str: shard database alias.
+    """
+    if not isinstance(value, int):
+        value = zlib.crc32(str(value).encode())
+    return shards[value % len(shards)]
+
+
+class OwnedDataShardRouter:
+    """OwnedData owner-sharded database router.
+
+    It sends the reads and writes of the viewset model in the current request to
+    the shard chosen by OwnedDataModelViewSet.owned_data_shards, and leaves the
+    other models to the next routers.
+
+    >>> DATABASE_ROUTERS = [
+    ...     "owned_data.drf.routers.OwnedDataShardRouter",
+    ...     "owned_data.drf.routers.OwnedDataReadReplicaRouter",
+    ... ]
+    """
+
+    def db_for_read(self, model: Any, **hints: Any) -> Optional[str]:
+        """Django built-in method.
+
+        Returns:
+            Optional[str]: shard database alias of the current request.
+        """
+        shard = owned_data_shard_database.get()
+        if shard is not None and model is shard[0]:
+            return shard[1]
+        return None
+
+    def db_for_write(self, model: Any, **hints: Any) -> Optional[str]:
+        """Django built-in method.
+
+        Returns:
+            Optional[str]: shard database alias of the current request.
+        """
+        return self.db_for_read(model, **hints)
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> Optional[bool]:
+        """Django built-in method.
+
+        The sharded objects can be related to the objects of the other databases,
+        e.g. the owner, which must exist on every shard.
+
+        Returns:
+            Optional[bool]: True if one of the objects is on the shard.
+        """
+        shard = owned_data_shard_database.get()
+        if shard is not None and shard[1] in (obj1._state.db, obj2._state.db):
+            return True
+        return None
+
+
+class OwnedDataReadReplicaRouter:
+    """OwnedData read replica database router.
+
+    It sends the reads of the current request to the database alias chosen by
+    OwnedDataModelViewSet.owned_data_read_database, and leaves the writes to the
+    default routing.
+
+    >>> DATABASE_ROUTERS = ["owned_data.drf.routers.OwnedDataReadReplicaRouter"]
+    """
+
+    def db_for_read(self, model: Any, **hints: Any) -> Optional[str]:
+        """Django built-in method.
+
+        Returns:
+            Optional[str]: read database alias of the current request.
+        """
+        return owned_data_read_database.get()
+
+    def db_for_write(self, model: Any, **hints: Any) -> Optional[str]:
+        """Django built-in method.
+
+        Returns:
+            Optional[str]: always None, writes go to the primary.
+        """
+        return None
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> Optional[bool]:
+        """Django built-in method.
+
+        Objects read from the replica can be related to the objects of the primary.
+
+        Returns:
+            Optional[bool]: True if one of the objects is read from the replica.
+        """
+        read_database = owned_data_read_database.get()
+        if read_database and read_database in (obj1._state.db, obj2._state.db):
+            return True
+        return None
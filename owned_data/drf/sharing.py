@@ -0,0 +1,143 @@
+"""Owned Data per-object sharing implementation.
+
+The grants are stored in owned_data.models.OwnedDataShare, so "owned_data" must
+be in INSTALLED_APPS to use them.
+"""
+from collections import defaultdict
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Type
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Exists, Model, OuterRef, Q
+
+if TYPE_CHECKING:
+    from .views import CollaborateType
+
+
+def _batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    """Split the items into lists of batch_size."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def get_owned_data_shared_filter(
+    model: Type[Model], user: Model, action: "CollaborateType"
+) -> Q:
+    """Get the filter of the records which are shared with the user.
+
+    >>> Model.objects.filter(get_owned_data_shared_filter(Model, user, CollaborateType.GET))
+
+    It's an EXISTS subquery on the indexed grants of the user and their groups.
+
+    Args:
+        model (Type[Model]): model class.
+        user (Model): user object.
+        action (CollaborateType): shared action.
+
+    Returns:
+        Q: shared records query.
+    """
+    from owned_data.models import OwnedDataShare
+
+    return Q(
+        Exists(
+            OwnedDataShare.objects.filter(
+                Q(user=user) | Q(group__in=user.groups.values("pk")),
+                content_type=ContentType.objects.get_for_model(model),
+                object_id=OuterRef("pk"),
+                action=action.value,
+            )
+        )
+    )
+
+
+def grant_owned_data(
+    objects: Iterable[Model],
+    users: Iterable[Model] = (),
+    groups: Iterable[Group] = (),
+    actions: Optional[Iterable["CollaborateType"]] = None,
+    batch_size: int = 1000,
+) -> int:
+    """Share the records with the users and groups in batched INSERTs.
+
+    >>> grant_owned_data(Post.objects.filter(author=user), users=[editor])
+
+    The existing grants are ignored.
+
+    Args:
+        objects (Iterable[Model]): records, e.g. a queryset.
+        users (Iterable[Model]): grantee users. Defaults to ().
+        groups (Iterable[Group]): grantee groups. Defaults to ().
+        actions (Optional[Iterable[CollaborateType]]): shared actions.
+            Defaults to None (GET only).
+        batch_size (int): number of grants per INSERT. Defaults to 1000.
+
+    Returns:
+        int: number of written grants, including the ignored ones.
+    """
+    from owned_data.models import OwnedDataShare
+
+    grantees = [{"user": user} for user in users] + [{"group": group} for group in groups]
+    actions = ["get"] if actions is None else [action.value for action in actions]
+
+    def build_grants() -> Iterator[OwnedDataShare]:
+        for obj in objects:
+            content_type = ContentType.objects.get_for_model(obj)
+            for grantee in grantees:
+                for action in actions:
+                    yield OwnedDataShare(
+                        content_type=content_type,
+                        object_id=obj.pk,
+                        action=action,
+                        **grantee,
+                    )
+
+    written = 0
+    for batch in _batches(build_grants(), batch_size):
+        OwnedDataShare.objects.bulk_create(batch, ignore_conflicts=True)
+        written += len(batch)
+    return written
+
+
+def revoke_owned_data(
+    objects: Iterable[Model],
+    users: Iterable[Model] = (),
+    groups: Iterable[Group] = (),
+    actions: Optional[Iterable["CollaborateType"]] = None,
+    batch_size: int = 1000,
+) -> int:
+    """Revoke the grants of the records from the users and groups in batched DELETEs.
+
+    >>> revoke_owned_data(Post.objects.filter(author=user), users=[editor])
+
+    Args:
+        objects (Iterable[Model]): records, e.g. a queryset, of one or more models.
+        users (Iterable[Model]): grantee users. Defaults to ().
+        groups (Iterable[Group]): grantee groups. Defaults to ().
+        actions (Optional[Iterable[CollaborateType]]): revoked actions.
+            Defaults to None (all actions).
+        batch_size (int): number of records per DELETE. Defaults to 1000.
+
+    Returns:
+        int: number of deleted grants.
+    """
+    from owned_data.models import OwnedDataShare
+
+    grantees = Q(user__in=list(users)) | Q(group__in=list(groups))
+    queryset = OwnedDataShare.objects.filter(grantees)
+    if actions is not None:
+        queryset = queryset.filter(action__in=[action.value for action in actions])
+
+    deleted = 0
+    for batch in _batches(objects, batch_size):
+        # The records of a batch can be of several models.
+        object_ids: Dict[Type[Model], List] = defaultdict(list)
+        for obj in batch:
+            object_ids[type(obj)].append(obj.pk)
+        for model, pks in object_ids.items():
+            content_type = ContentType.objects.get_for_model(model)
+            deleted += queryset.filter(
+                content_type=content_type, object_id__in=pks
+            ).delete()[0]
+    return deleted
@@ -0,0 +1,7 @@
+"""Owned Data signals."""
+from django.dispatch import Signal
+
+# Sent after the owned data of a user is transferred to another user.
+# Receivers should invalidate their owned data caches of both users.
+# Arguments: from_user, to_user, models (the models of the rewritten columns).
+owned_data_transferred = Signal()
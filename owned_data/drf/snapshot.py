@@ -0,0 +1,359 @@
+"""Owned Data shared-memory authorization snapshot implementation.
+
+A single refresher per host, e.g. the owned_data_snapshot command, writes the
+group and permission masks of all the users into a file, and swaps it atomically.
+The workers memory-map the file, so the memberships are loaded once per host,
+not once per process.
+
+The file layout is little-endian:
+| Offset     | Content                                                    |
+|------------|------------------------------------------------------------|
+| 0          | b"ODS2"                                                    |
+| 4          | uint32: words per mask                                     |
+| 8          | uint32: users                                              |
+| 12         | uint32: names length                                       |
+| 16         | float64: build time, in seconds since the epoch            |
+| 24         | names JSON: {"groups": [...], "permissions": [...]}        |
+| 24 + names | users by pk: int64 pk, uint64 group and permission words   |
+
+The permissions are named by "app_label.codename".
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from rest_framework.request import Request
+from .principals import OwnedDataORMPrincipalSource
+
+_MAGIC = b"ODS2"
+_HEADER = struct.Struct("<4sIIId")
+
+
+def _to_words(mask: int, words: int) -> List[int]:
+    """Split the mask into unsigned 64-bit words."""
+    return [(mask >> (64 * i)) & 0xFFFFFFFFFFFFFFFF for i in range(words)]
+
+
+def write_owned_data_snapshot(path: str) -> int:
+    """Write the group and permission masks of all the users into the snapshot file.
+
+    The file is written next to the path and swapped atomically, so the readers
+    never see a partial snapshot.
+
+    Args:
+        path (str): snapshot file path, e.g. "/dev/shm/owned_data.snapshot".
+
+    Raises:
+        ValueError: in case of a user model without integer primary keys.
+
+    Returns:
+        int: number of users.
+    """
+    # The snapshot is as old as its first query.
+    built_at = time.time()
+    user_model = get_user_model()
+    group_rows = list(Group.objects.order_by("pk").values_list("pk", "name"))
+    group_bits = {pk: i for i, (pk, _) in enumerate(group_rows)}
+    permissions = list(
+        Permission.objects.order_by("pk").values_list(
+            "pk", "content_type__app_label", "codename"
+        )
+    )
+    permission_bits = {pk: i for i, (pk, _, _) in enumerate(permissions)}
+
+    group_permissions: Dict[int, int] = defaultdict(int)
+    for group_pk, permission_pk in Group.permissions.through.objects.values_list(
+        "group_id", "permission_id"
+    ):
+        group_permissions[group_pk] |= 1 << permission_bits[permission_pk]
+
+    group_masks: Dict[int, int] = defaultdict(int)
+    permission_masks: Dict[int, int] = defaultdict(int)
+    for user_pk, group_pk in user_model.groups.through.objects.values_list(
+        f"{user_model._meta.model_name}_id", "group_id"
+    ):
+        group_masks[user_pk] |= 1 << group_bits[group_pk]
+        permission_masks[user_pk] |= group_permissions[group_pk]
+    user_permissions = user_model.user_permissions.through.objects.values_list(
+        f"{user_model._meta.model_name}_id", "permission_id"
+    )
+    for user_pk, permission_pk in user_permissions:
+        permission_masks[user_pk] |= 1 << permission_bits[permission_pk]
+
+    words = max(1, (max(len(group_rows), len(permissions)) + 63) // 64)
+    all_permissions = (1 << (64 * words)) - 1
+    users = user_model._default_manager.order_by("pk").values_list(
+        "pk", "is_active", "is_superuser"
+    )
+    record = struct.Struct(f"<q{2 * words}Q")
+    names = json.dumps(
+        {
+            "groups": [name for _, name in group_rows],
+            "permissions": [
+                f"{app_label}.{codename}" for _, app_label, codename in permissions
+            ],
+        }
+    ).encode()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".owned_data_snapshot.")
+    count = 0
+    try:
+        with os.fdopen(fd, "wb") as snapshot_file:
+            snapshot_file.write(_HEADER.pack(_MAGIC, words, 0, len(names), built_at))
+            snapshot_file.write(names)
+            for user_pk, is_active, is_superuser in users.iterator():
+                if not isinstance(user_pk, int):
+                    raise ValueError("the snapshot requires integer user primary keys!")
+                if not is_active:
+                    permission_mask = 0
+                elif is_superuser:
+                    permission_mask = all_permissions
+                else:
+                    permission_mask = permission_masks[user_pk]
+                snapshot_file.write(
+                    record.pack(
+                        user_pk,
+                        *_to_words(group_masks[user_pk], words),
+                        *_to_words(permission_mask, words),
+                    )
+                )
+                count += 1
+            snapshot_file.seek(0)
+            snapshot_file.write(
+                _HEADER.pack(_MAGIC, words, count, len(names), built_at)
+            )
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return count
+
+
+class _OwnedDataSnapshotLayout(NamedTuple):
+    """Immutable mapping of a snapshot file, which is published as a whole."""
+
+    buffer: mmap.mmap
+    words: int
+    users: int
+    offset: int
+    record: struct.Struct
+    group_bits: Dict[str, int]
+    permission_bits: Dict[str, int]
+    built_at: float
+
+    def get_bits(self, kind: str, name: str) -> Optional[int]:
+        """Get the bits of a group ("g") or a permission ("p")."""
+        return (self.group_bits if kind == "g" else self.permission_bits).get(name)
+
+    def get_user_masks(self, user_pk: int) -> Optional[Tuple[int, int]]:
+        """Get the group and permission masks of the user by a binary search."""
+        low, high = 0, self.users - 1
+        while low <= high:
+            middle = (low + high) // 2
+            offset = self.offset + middle * self.record.size
+            (pk,) = struct.unpack_from("<q", self.buffer, offset)
+            if pk < user_pk:
+                low = middle + 1
+            elif pk > user_pk:
+                high = middle - 1
+            else:
+                values = self.record.unpack_from(self.buffer, offset)
+                group_mask = permission_mask = 0
+                for i in range(self.words):
+                    group_mask |= values[1 + i] << (64 * i)
+                    permission_mask |= values[1 + self.words + i] << (64 * i)
+                return group_mask, permission_mask
+        return None
+
+
+class OwnedDataSnapshot:
+    """Read-only memory-mapped snapshot.
+
+    The users are looked up by a binary search on the mapped records. The file is
+    re-mapped when the refresher swaps it, which is checked at most once per
+    check_interval seconds. The mapping is published by a single assignment, and
+    the previous one is closed once its readers release it, so the concurrent
+    readers never mix the layouts.
+    """
+
+    # Seconds between the checks of the snapshot file.
+    check_interval: float = 1
+
+    # Seconds after the build time of the snapshot, when the checks return None, so
+    # the principal source falls back to the database, e.g. if the refresher stops.
+    # Defaults to None, which means the snapshot never expires.
+    max_age: Optional[float] = None
+
+    def __init__(self, path: str):
+        """Initialize the snapshot, the file is mapped lazily.
+
+        Args:
+            path (str): snapshot file path.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._layout: Optional[_OwnedDataSnapshotLayout] = None
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._next_check: float = 0
+
+    def __map(self):
+        """Map the snapshot file, if it's swapped since the last check."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        file_id = (stat.st_ino, stat.st_mtime_ns)
+        if file_id == self._file_id:
+            return
+
+        with open(self.path, "rb") as snapshot_file:
+            snapshot_mmap = mmap.mmap(
+                snapshot_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        magic = snapshot_mmap[: len(_MAGIC)]
+        if magic != _MAGIC:
+            snapshot_mmap.close()
+            raise ValueError("invalid owned data snapshot file %s!" % self.path)
+        _, words, users, names_length, built_at = _HEADER.unpack_from(snapshot_mmap)
+        names = json.loads(snapshot_mmap[_HEADER.size : _HEADER.size + names_length])
+
+        permission_bits: Dict[str, int] = {}
+        # The bare codenames too, unless the same codename is in several apps.
+        ambiguous_codenames = set()
+        for i, name in enumerate(names["permissions"]):
+            permission_bits[name] = 1 << i
+            codename = name.split(".", 1)[1]
+            if codename in permission_bits:
+                ambiguous_codenames.add(codename)
+            permission_bits[codename] = 1 << i
+        for codename in ambiguous_codenames:
+            del permission_bits[codename]
+
+        # The previous mmap is closed when it's garbage collected, so the readers
+        # which hold it are never left with a closed mmap.
+        self._layout = _OwnedDataSnapshotLayout(
+            buffer=snapshot_mmap,
+            words=words,
+            users=users,
+            offset=_HEADER.size + names_length,
+            record=struct.Struct(f"<q{2 * words}Q"),
+            group_bits={name: 1 << i for i, name in enumerate(names["groups"])},
+            permission_bits=permission_bits,
+            built_at=built_at,
+        )
+        self._file_id = file_id
+
+    def refresh(self):
+        """Re-map the snapshot file, if the check interval is passed."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        with self._lock:
+            if now >= self._next_check:
+                self.__map()
+                self._next_check = now + self.check_interval
+
+    def get_bits(self, kind: str, name: str) -> Optional[int]:
+        """Get the bits of a group ("g") or a permission ("p").
+
+        Args:
+            kind (str): "g" or "p".
+            name (str): group name, or permission "app_label.codename". The bare
+                codenames are only known if they're unique across the apps.
+
+        Returns:
+            Optional[int]: the bits, or None if the name isn't in the snapshot.
+        """
+        self.refresh()
+        layout = self._layout
+        return None if layout is None else layout.get_bits(kind, name)
+
+    def get_user_masks(self, user_pk: int) -> Optional[Tuple[int, int]]:
+        """Get the group and permission masks of the user.
+
+        Args:
+            user_pk (int): user primary key.
+
+        Returns:
+            Optional[Tuple[int, int]]: group and permission masks, or None if the
+            user isn't in the snapshot.
+        """
+        self.refresh()
+        layout = self._layout
+        return None if layout is None else layout.get_user_masks(user_pk)
+
+    def check(self, user_pk: int, kind: str, name: str) -> Optional[bool]:
+        """Check a group ("g") or a permission ("p") of the user.
+
+        The masks and the bits are read from the same mapping.
+
+        Args:
+            user_pk (int): user primary key.
+            kind (str): "g" or "p".
+            name (str): group name, or permission "app_label.codename".
+
+        Returns:
+            Optional[bool]: True if the user has it, or None if the snapshot is older
+            than max_age, or the user or the name isn't in the snapshot.
+        """
+        self.refresh()
+        layout = self._layout
+        if layout is None:
+            return None
+        if self.max_age is not None and time.time() - layout.built_at > self.max_age:
+            return None
+        masks = layout.get_user_masks(user_pk)
+        bits = layout.get_bits(kind, name)
+        if masks is None or bits is None:
+            return None
+        return bool(masks[0 if kind == "g" else 1] & bits)
+
+
+class OwnedDataSnapshotPrincipalSource(OwnedDataORMPrincipalSource):
+    """Principal source based on the shared-memory snapshot.
+
+    The g: and p: collaborators are validated by the user masks of the snapshot,
+    with the permission "app_label.codename", or the codename if it's unique, and
+    the u: collaborators by the request user. The users and names which aren't in
+    the snapshot yet, and the snapshots older than their max_age, fall back to the
+    user model.
+
+    >>> class PostSnapshotPrincipalSource(OwnedDataSnapshotPrincipalSource):
+    ...     snapshot = OwnedDataSnapshot("/dev/shm/owned_data.snapshot")
+    """
+
+    # The snapshot.
+    snapshot: Optional[OwnedDataSnapshot] = None
+
+    def __check(self, request: Request, kind: str, name: str) -> Optional[bool]:
+        """Check the group or permission of the request user by the snapshot."""
+        if self.snapshot is None or not isinstance(request.user.pk, int):
+            return None
+        return self.snapshot.check(request.user.pk, kind, name)
+
+    def is_user(self, request: Request, value: str) -> bool:
+        """Check if the request user is the given user by its username or email."""
+        user = request.user
+        return value in (user.get_username(), getattr(user, "email", None))
+
+    def has_group(self, request: Request, value: str) -> bool:
+        """Check if the request user is a member of the given group by the snapshot."""
+        allowed = self.__check(request, "g", value)
+        if allowed is None:
+            return super().has_group(request, value)
+        return allowed
+
+    def has_permission(self, request: Request, value: str) -> bool:
+        """Check the given permission of the request user by the snapshot."""
+        allowed = self.__check(request, "p", value)
+        if allowed is None:
+            return super().has_permission(request, value)
+        return allowed
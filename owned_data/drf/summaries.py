@@ -0,0 +1,303 @@
+"""Owned Data per-owner summaries implementation.
+
+The aggregates of the owned records, e.g. posts per status, are stored per owner
+in owned_data.models.OwnedDataSummary, so "owned_data" must be in INSTALLED_APPS
+to use them. They're registered per viewset, by the queryset of the viewset, and
+updated incrementally by the save/delete signals of the model, and the writes
+which don't send signals, e.g. QuerySet.update(), are repaired by
+rebuild_owned_data_summaries. The summaries of both users of an ownership transfer
+are rebuilt by the owned_data_transferred signal.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type, Union
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Model, Sum
+from django.db.models.query import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from .denormalization import _resolve_owned_data_value
+from .signals import owned_data_transferred
+
+
+class _OwnedDataSummaryScope(NamedTuple):
+    """Registered summaries of a viewset."""
+
+    # The records of the summaries, e.g. by the literal owned_data_fields.
+    queryset: QuerySet
+    # Ownership path, e.g. "author".
+    owner_path: str
+    # {name: (aggregate, group by)}.
+    summaries: Dict[str, Tuple[str, Optional[str]]]
+
+
+# Registered summaries: {viewset dotted path: scope}.
+_summaries: Dict[str, _OwnedDataSummaryScope] = {}
+
+
+def _get_summary_viewset(viewset: Union[str, type]) -> str:
+    """Get the dotted path of the viewset, e.g. "post.views.PostViewSet"."""
+    if isinstance(viewset, str):
+        return viewset
+    return f"{viewset.__module__}.{viewset.__qualname__}"
+
+
+def _get_summary_field(aggregate: str) -> Optional[str]:
+    """Get the field of the aggregate.
+
+    >>> _get_summary_field("sum:words")
+    "words"
+    >>> _get_summary_field("count")
+    None
+
+    Args:
+        aggregate (str): "count", or "sum:<field>".
+
+    Raises:
+        ValueError: in case of an unknown aggregate.
+
+    Returns:
+        Optional[str]: summed field, or None for "count".
+    """
+    if aggregate == "count":
+        return None
+    if aggregate.startswith("sum:"):
+        return aggregate[len("sum:") :]
+    raise ValueError(
+        "invalid summary aggregate %s! valid aggregates: count, sum:<field>" % aggregate
+    )
+
+
+def _get_summary_row(
+    instance: Model, owner_path: str, summaries: Dict[str, Tuple[str, Optional[str]]]
+) -> Dict[str, Any]:
+    """Get the owner, group by, and summed values of the instance."""
+    row = {owner_path: _resolve_owned_data_value(instance, owner_path)}
+    for aggregate, group_by in summaries.values():
+        for field in (_get_summary_field(aggregate), group_by):
+            if field is not None:
+                row[field] = _resolve_owned_data_value(instance, field)
+    return row
+
+
+def _apply_summary_row(viewset: str, row: Dict[str, Any], sign: int):
+    """Add (sign=1), or subtract (sign=-1) the row to the summaries of its owner."""
+    from owned_data.models import OwnedDataSummary
+
+    scope = _summaries[viewset]
+    owner_pk = row[scope.owner_path]
+    if owner_pk is None:
+        return
+
+    content_type = ContentType.objects.get_for_model(scope.queryset.model)
+    for name, (aggregate, group_by) in scope.summaries.items():
+        field = _get_summary_field(aggregate)
+        delta = sign * (1 if field is None else row[field] or 0)
+        if not delta:
+            continue
+        lookup = {
+            "content_type": content_type,
+            "viewset": viewset,
+            "name": name,
+            "owner_id": owner_pk,
+            "key": "" if group_by is None else str(row[group_by]),
+        }
+        if OwnedDataSummary.objects.filter(**lookup).update(value=F("value") + delta):
+            continue
+        try:
+            with transaction.atomic():
+                OwnedDataSummary.objects.create(value=delta, **lookup)
+        except IntegrityError:
+            # Created by a concurrent write.
+            OwnedDataSummary.objects.filter(**lookup).update(value=F("value") + delta)
+
+
+def register_owned_data_summaries(
+    viewset: Union[str, type],
+    queryset: QuerySet,
+    owner_path: str,
+    summaries: Dict[str, Tuple[str, Optional[str]]],
+):
+    """Keep the summaries of the viewset up to date by the save/delete signals.
+
+    >>> register_owned_data_summaries(
+    ...     PostViewSet,
+    ...     Post.objects.filter(is_draft=False),
+    ...     "author",
+    ...     {"per_status": ("count", "is_draft")},
+    ... )
+
+    Args:
+        viewset (Union[str, type]): viewset class, or its dotted path.
+        queryset (QuerySet): records of the summaries.
+        owner_path (str): ownership path, e.g. "author".
+        summaries (Dict[str, Tuple[str, Optional[str]]]): {name: (aggregate, group by)}.
+    """
+    for aggregate, _ in summaries.values():
+        _get_summary_field(aggregate)
+
+    viewset = _get_summary_viewset(viewset)
+    _summaries[viewset] = _OwnedDataSummaryScope(queryset, owner_path, dict(summaries))
+    owned_data_transferred.connect(
+        _on_owned_data_transferred, dispatch_uid="owned_data:summaries"
+    )
+    # The signals are connected once per viewset, and read its registered scope.
+    uid = f"owned_data:summaries:{viewset}"
+
+    def get_rows(instance: Model) -> Dict[str, Optional[Dict[str, Any]]]:
+        # The rows before the write, per viewset of the model.
+        if "_owned_data_summary_rows" not in instance.__dict__:
+            instance._owned_data_summary_rows = {}
+        return instance._owned_data_summary_rows
+
+    def get_row(
+        scope: _OwnedDataSummaryScope, instance: Model
+    ) -> Optional[Dict[str, Any]]:
+        # The filtered querysets are checked per record, e.g. is_draft=False.
+        if scope.queryset.query.where and not (
+            scope.queryset.filter(pk=instance.pk).exists()
+        ):
+            return None
+        return _get_summary_row(instance, scope.owner_path, scope.summaries)
+
+    def load_previous_row(sender, instance, raw=False, **kwargs):
+        rows = get_rows(instance)
+        rows[viewset] = None
+        scope = _summaries.get(viewset)
+        if scope is None or raw or instance._state.adding or instance.pk is None:
+            return
+        previous = scope.queryset.filter(pk=instance.pk).first()
+        if previous is not None:
+            rows[viewset] = _get_summary_row(
+                previous, scope.owner_path, scope.summaries
+            )
+
+    def apply_saved_row(sender, instance, raw=False, **kwargs):
+        scope = _summaries.get(viewset)
+        if scope is None or raw:
+            return
+        previous_row = get_rows(instance).get(viewset)
+        row = get_row(scope, instance)
+        if previous_row == row:
+            return
+        if previous_row is not None:
+            _apply_summary_row(viewset, previous_row, -1)
+        if row is not None:
+            _apply_summary_row(viewset, row, 1)
+
+    def load_deleted_row(sender, instance, **kwargs):
+        scope = _summaries.get(viewset)
+        row = None if scope is None else get_row(scope, instance)
+        get_rows(instance)[viewset] = row
+
+    def apply_deleted_row(sender, instance, **kwargs):
+        row = get_rows(instance).get(viewset)
+        if row is not None and viewset in _summaries:
+            _apply_summary_row(viewset, row, -1)
+
+    model = queryset.model
+    pre_save.connect(load_previous_row, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(apply_saved_row, sender=model, weak=False, dispatch_uid=uid)
+    pre_delete.connect(load_deleted_row, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(apply_deleted_row, sender=model, weak=False, dispatch_uid=uid)
+
+
+def get_owned_data_summaries(
+    viewset: Union[str, type], owner: Model
+) -> Dict[str, Union[int, Dict[str, int]]]:
+    """Get the summaries of the owner in a single query.
+
+    >>> get_owned_data_summaries(PostViewSet, user)
+    {"total": 3, "per_status": {"True": 1, "False": 2}}
+
+    Args:
+        viewset (Union[str, type]): viewset class, or its dotted path.
+        owner (Model): owner user.
+
+    Returns:
+        Dict[str, Union[int, Dict[str, int]]]: summary values, grouped by the group by value.
+    """
+    from owned_data.models import OwnedDataSummary
+
+    viewset = _get_summary_viewset(viewset)
+    summaries = _summaries[viewset].summaries
+    result: Dict[str, Union[int, Dict[str, int]]] = {
+        name: 0 if group_by is None else {}
+        for name, (_, group_by) in summaries.items()
+    }
+    rows = OwnedDataSummary.objects.filter(
+        viewset=viewset, name__in=summaries, owner=owner
+    ).values_list("name", "key", "value")
+    for name, key, value in rows:
+        if summaries[name][1] is None:
+            result[name] = value
+        elif value:
+            result[name][key] = value
+    return result
+
+
+def rebuild_owned_data_summaries(
+    model: Optional[Type[Model]] = None, owners: Optional[List[Model]] = None
+) -> int:
+    """Rebuild the summaries by GROUP BY queries, to repair the drift.
+
+    Args:
+        model (Optional[Type[Model]]): model class. Defaults to all the registered models.
+        owners (Optional[List[Model]]): owner users. Defaults to None (all).
+
+    Raises:
+        KeyError: in case of the model has no registered summaries.
+
+    Returns:
+        int: number of summary rows.
+    """
+    from owned_data.models import OwnedDataSummary
+
+    viewsets = [
+        viewset
+        for viewset, scope in _summaries.items()
+        if model is None or scope.queryset.model is model
+    ]
+    if model is not None and not viewsets:
+        raise KeyError(model)
+
+    created = 0
+    for viewset in viewsets:
+        queryset, owner_path, summaries = _summaries[viewset]
+        content_type = ContentType.objects.get_for_model(queryset.model)
+        records = queryset.filter(**{f"{owner_path}__isnull": False})
+        stored = OwnedDataSummary.objects.filter(viewset=viewset)
+        if owners is not None:
+            owner_pks = [owner.pk for owner in owners]
+            records = records.filter(**{f"{owner_path}__in": owner_pks})
+            stored = stored.filter(owner_id__in=owner_pks)
+        for name, (aggregate, group_by) in summaries.items():
+            field = _get_summary_field(aggregate)
+            group_fields = [owner_path] if group_by is None else [owner_path, group_by]
+            rows = (
+                records.order_by()
+                .values(*group_fields)
+                .annotate(summary_value=Count("pk") if field is None else Sum(field))
+            )
+            with transaction.atomic():
+                stored.filter(name=name).delete()
+                objs = OwnedDataSummary.objects.bulk_create(
+                    OwnedDataSummary(
+                        content_type=content_type,
+                        viewset=viewset,
+                        name=name,
+                        owner_id=row[owner_path],
+                        key="" if group_by is None else str(row[group_by]),
+                        value=row["summary_value"] or 0,
+                    )
+                    for row in rows
+                )
+            created += len(objs)
+    return created
+
+
+def _on_owned_data_transferred(sender, from_user, to_user, **kwargs):
+    """Rebuild the summaries of both users of an ownership transfer.
+
+    The owner paths may follow the relations of the transferred models, so all the
+    registered viewsets are rebuilt, only for the two owners.
+    """
+    rebuild_owned_data_summaries(owners=[from_user, to_user])
@@ -0,0 +1,332 @@
+"""Owned Data test helpers.
+
+OwnedDataPolicyHarness evaluates the collaborators and the owned data filter of
+a viewset against a fake user and in-memory instances, without any database
+query, so the ownership rules can be unit tested with SimpleTestCase.
+
+assert_owned_data_query_budgets asserts the owned_data_query_budget of the
+registered viewsets against the database.
+"""
+from typing import Any, Iterable, List, Optional, Type, Union
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, Q
+from rest_framework.exceptions import PermissionDenied
+from .checks import _get_owned_data_view
+from .exceptions import OwnedDataQueryBudgetExceeded
+from .principals import OwnedDataTokenClaimsPrincipalSource
+from .views import (
+    CollaborateType,
+    OwnedDataMixin,
+    _collaborator_type_map,
+    get_owned_data_viewsets,
+)
+
+
+class OwnedDataFakeUser:
+    """In-memory user of the harness.
+
+    >>> OwnedDataFakeUser(1, username="test", groups=["editor"], permissions=["change_post"])
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+
+    def __init__(
+        self,
+        pk: Any,
+        username: str = "",
+        email: str = "",
+        groups: Iterable[str] = (),
+        permissions: Iterable[str] = (),
+    ):
+        """Initialize the fake user.
+
+        Args:
+            pk (Any): user primary key, which the owner fields are compared to.
+            username (str): username of the u: collaborators. Defaults to "".
+            email (str): email of the u: collaborators. Defaults to "".
+            groups (Iterable[str]): group names of the g: collaborators. Defaults to ().
+            permissions (Iterable[str]): permission names or codenames of the p: collaborators. Defaults to ().
+        """
+        self.pk = self.id = pk
+        self.username = username
+        self.email = email
+        self.groups = list(groups)
+        self.permissions = list(permissions)
+
+    def __str__(self):
+        return self.username or str(self.pk)
+
+
+def _evaluate_owned_data_lookup(instance: Model, lookup: str, value: Any) -> bool:
+    """Evaluate a filter lookup on the instance in memory.
+
+    >>> _evaluate_owned_data_lookup(comment, "post__author", user)
+    True
+
+    Args:
+        instance (Model): model instance, with its forward relations set in memory.
+        lookup (str): filter lookup, e.g. "post__author", or "is_draft".
+        value (Any): filter value.
+
+    Raises:
+        ValueError: in case of an unsupported lookup.
+
+    Returns:
+        bool: True if the instance matches.
+    """
+    parts = lookup.split("__")
+    obj, actual = instance, None
+    while parts:
+        try:
+            field = obj._meta.get_field(parts[0])
+        except FieldDoesNotExist:
+            break
+        parts.pop(0)
+        if field.many_to_many or field.one_to_many:
+            raise ValueError(
+                "unsupported in memory lookup %s! only forward relations" % lookup
+            )
+        if field.is_relation and parts and parts[0] not in ("exact", "in", "isnull"):
+            obj = getattr(obj, field.name)
+            if obj is None:
+                # Broken path, only the lookup type remains.
+                parts = parts[-1:] if parts[-1] in ("exact", "in", "isnull") else []
+                break
+            continue
+        actual = getattr(obj, field.attname)
+        break
+
+    if isinstance(value, (Model, OwnedDataFakeUser)):
+        value = value.pk
+    operator_name = parts[0] if parts else "exact"
+    if operator_name == "exact":
+        return actual == value
+    elif operator_name == "in":
+        return actual in [v.pk if isinstance(v, Model) else v for v in value]
+    elif operator_name == "isnull":
+        return (actual is None) == value
+    raise ValueError("unsupported in memory lookup %s!" % lookup)
+
+
+def _evaluate_owned_data_query(query: Q, instance: Model) -> bool:
+    """Evaluate the Q object on the instance in memory.
+
+    Args:
+        query (Q): owned data query.
+        instance (Model): model instance.
+
+    Raises:
+        ValueError: in case of an expression which can't be evaluated in memory.
+
+    Returns:
+        bool: True if the instance matches.
+    """
+    results = []
+    for child in query.children:
+        if isinstance(child, Q):
+            results.append(_evaluate_owned_data_query(child, instance))
+        elif isinstance(child, tuple):
+            results.append(_evaluate_owned_data_lookup(instance, *child))
+        else:
+            raise ValueError("unsupported in memory expression %r!" % child)
+    result = all(results) if query.connector == Q.AND else any(results)
+    return not result if query.negated else result
+
+
+def _replace_owned_data_user(query: Q, user: OwnedDataFakeUser) -> Q:
+    """Replace the fake user values of the query by its primary key, for SQL."""
+    children = []
+    for child in query.children:
+        if isinstance(child, Q):
+            child = _replace_owned_data_user(child, user)
+        elif isinstance(child, tuple) and child[1] is user:
+            child = (child[0], user.pk)
+        children.append(child)
+    return Q(*children, _connector=query.connector, _negated=query.negated)
+
+
+class OwnedDataPolicyHarness:
+    """Evaluate the ownership rules of a viewset in memory.
+
+    >>> harness = OwnedDataPolicyHarness(PostViewSet, OwnedDataFakeUser(1, groups=["editor"]))
+    >>> harness.is_allowed("destroy")
+    True
+    >>> harness.filter("list", [Post(pk=1, author_id=1), Post(pk=2, author_id=2)])
+    [Post<1>]
+
+    The collaborators are validated by the groups and permissions of the fake user,
+    and the f: collaborators are called as usual. The grants of owned_data_shared,
+    and the policies of owned_data_policy live in the database, so they're ignored,
+    and the decisions aren't recorded by owned_data_audit_log.
+
+    With verify=True, filter() also runs the owned data filter in SQL, on the saved
+    instances, and raises AssertionError if the results are different.
+    """
+
+    def __init__(
+        self,
+        viewset_cls: Type[OwnedDataMixin],
+        user: OwnedDataFakeUser,
+        verify: bool = False,
+    ):
+        """Initialize the harness.
+
+        Args:
+            viewset_cls (Type[OwnedDataMixin]): viewset class.
+            user (OwnedDataFakeUser): fake user.
+            verify (bool): check the filter results against SQL. Defaults to False.
+        """
+        self.viewset_cls = viewset_cls
+        self.user = user
+        self.verify = verify
+
+    def get_view(self, action: Union[str, CollaborateType]) -> OwnedDataMixin:
+        """Get the viewset bound to a request of the fake user.
+
+        Args:
+            action (Union[str, CollaborateType]): viewset action, or HTTP method.
+
+        Returns:
+            OwnedDataMixin: viewset object.
+        """
+        view = _get_owned_data_view(self.viewset_cls, self.user, action)
+        view.owned_data_principal_source_class = OwnedDataTokenClaimsPrincipalSource
+        view.request.auth = {
+            "username": self.user.username,
+            "email": self.user.email,
+            "groups": self.user.groups,
+            "permissions": self.user.permissions,
+        }
+        view.owned_data_shared = False
+        view.owned_data_policy = False
+        view.owned_data_audit_log = None
+        return view
+
+    def is_allowed(self, action: Union[str, CollaborateType]) -> bool:
+        """Check the owned_data_collaborators of the action.
+
+        Args:
+            action (Union[str, CollaborateType]): viewset action, or HTTP method.
+
+        Returns:
+            bool: True if the fake user is a collaborator.
+        """
+        try:
+            self.get_view(action).check_owned_data_collaborators()
+        except PermissionDenied:
+            return False
+        return True
+
+    def get_filter(self, action: Union[str, CollaborateType]) -> Optional[Q]:
+        """Get the owned data filter of the action, by the ownership paths.
+
+        Args:
+            action (Union[str, CollaborateType]): viewset action, or HTTP method.
+
+        Returns:
+            Optional[Q]: owned data query, or None if there is nothing to filter.
+        """
+        view = self.get_view(action)
+        # The denormalized columns are set on save, so use the paths in memory.
+        view.owned_data_denormalized_fields = None
+        return view.get_owned_data_filter()
+
+    def filter(
+        self, action: Union[str, CollaborateType], instances: Iterable[Model]
+    ) -> List[Model]:
+        """Get the instances which the fake user may access by the action.
+
+        Args:
+            action (Union[str, CollaborateType]): viewset action, or HTTP method.
+            instances (Iterable[Model]): model instances, with their forward relations
+                set in memory.
+
+        Raises:
+            AssertionError: in case of the in-memory and SQL results are different.
+
+        Returns:
+            List[Model]: the allowed instances, in the given order.
+        """
+        instances = list(instances)
+        if not self.is_allowed(action):
+            return []
+
+        query = self.get_filter(action)
+        allowed = [
+            instance
+            for instance in instances
+            if query is None or _evaluate_owned_data_query(query, instance)
+        ]
+        if self.verify:
+            self.__verify(action, instances, allowed)
+        return allowed
+
+    def __verify(
+        self,
+        action: Union[str, CollaborateType],
+        instances: List[Model],
+        allowed: List[Model],
+    ):
+        """Check the in-memory results against the owned data filter in SQL."""
+        queryset = self.viewset_cls.queryset.model._default_manager.filter(
+            pk__in=[instance.pk for instance in instances]
+        )
+        if (query := self.get_view(action).get_owned_data_filter()) is not None:
+            queryset = queryset.filter(_replace_owned_data_user(query, self.user))
+
+        in_memory_pks = {instance.pk for instance in allowed}
+        sql_pks = set(queryset.values_list("pk", flat=True))
+        if in_memory_pks != sql_pks:
+            raise AssertionError(
+                "%s %s: in-memory %s != SQL %s"
+                % (
+                    self.viewset_cls.__name__,
+                    action,
+                    sorted(in_memory_pks),
+                    sorted(sql_pks),
+                )
+            )
+
+
+def assert_owned_data_query_budgets(
+    user: Any, viewsets: Optional[Iterable[Type[OwnedDataMixin]]] = None
+):
+    """Assert the owned_data_query_budget of the viewsets for the user.
+
+    The owned data logic of every action with a budget, i.e. the policy, collaborators,
+    and shared records filter, runs against the database. It must run in the Django
+    test environment, e.g. TestCase, where the exceeded budgets raise.
+
+    >>> assert_owned_data_query_budgets(user)
+
+    Args:
+        user (Any): user object, or AnonymousUser.
+        viewsets (Optional[Iterable[Type[OwnedDataMixin]]]): viewset classes. Defaults
+            to None, which means the registered ones, see get_owned_data_viewsets.
+
+    Raises:
+        AssertionError: with the captured SQL of the exceeded budgets.
+    """
+    if viewsets is None:
+        viewsets = get_owned_data_viewsets()
+
+    failures: List[str] = []
+    for viewset_cls in viewsets:
+        for action in viewset_cls.owned_data_query_budget or {}:
+            # Generic views budget the lowercase HTTP methods, and the viewsets
+            # their standard and custom actions.
+            owned_data_actions = viewset_cls.owned_data_actions or {}
+            if action not in _collaborator_type_map and action not in owned_data_actions:
+                action = CollaborateType(action)
+            view = _get_owned_data_view(viewset_cls, user, action)
+            try:
+                view.check_owned_data_collaborators()
+                view.get_owned_data_filter()
+            except PermissionDenied:
+                pass
+            except OwnedDataQueryBudgetExceeded as exceeded:
+                failures.append(str(exceeded))
+    if failures:
+        raise AssertionError("\n\n".join(failures))
@@ -0,0 +1,119 @@
+"""Owned Data ownership transfer implementation.
+
+It rewrites the ownership columns of the models of the registered
+OwnedDataModelViewSet classes from a user to another one, e.g. for offboarding.
+"""
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
+from django.contrib.auth import get_user_model
+from django.db.models import Model
+from .signals import owned_data_transferred
+from .views import get_owned_data_viewsets
+
+
+def get_owned_data_owner_columns() -> List[Tuple[Type[Model], str]]:
+    """Get the ownership columns of the registered viewsets.
+
+    The columns are the local foreign keys to the user model of owned_data_fields,
+    and the denormalized fields. Deeper paths belong to the related models.
+
+    Returns:
+        List[Tuple[Type[Model], str]]: sorted (model, field name) pairs.
+    """
+    user_model = get_user_model()
+    columns = set()
+    for viewset in get_owned_data_viewsets():
+        if viewset.queryset is None:
+            continue
+
+        model = viewset.queryset.model
+        for owner_field in viewset.get_owned_data_owner_fields():
+            if "__" in owner_field:
+                continue
+            field = model._meta.get_field(owner_field)
+            if field.many_to_one and field.related_model is user_model:
+                columns.add((model, owner_field))
+
+        for denormalized_field in (viewset.owned_data_denormalized_fields or {}).values():
+            columns.add((model, denormalized_field))
+
+    return sorted(columns, key=lambda column: (column[0]._meta.label, column[1]))
+
+
+def _load_checkpoint(checkpoint: Optional[str]) -> Dict[str, Any]:
+    """Load the progress checkpoint file."""
+    if checkpoint is None or not os.path.exists(checkpoint):
+        return {}
+    with open(checkpoint) as f:
+        return json.load(f)
+
+
+def _save_checkpoint(checkpoint: Optional[str], progress: Dict[str, Any]):
+    """Save the progress checkpoint file atomically."""
+    if checkpoint is None:
+        return
+    with open(f"{checkpoint}.tmp", "w") as f:
+        json.dump(progress, f)
+    os.replace(f"{checkpoint}.tmp", checkpoint)
+
+
+def transfer_owned_data(
+    from_user: Model,
+    to_user: Model,
+    batch_size: int = 1000,
+    sleep: float = 0,
+    checkpoint: Optional[str] = None,
+) -> Dict[str, int]:
+    """Transfer the owned data of a user to another user.
+
+    Each ownership column is rewritten in chunked UPDATE batches, paged by the
+    primary key, so the progress doesn't depend on the rewritten records:
+    >>> Model.objects.filter(pk__in=batch_pks).update(author=to_user)
+
+    Transferring to the same user is a no-op.
+
+    Args:
+        from_user (Model): current owner.
+        to_user (Model): new owner.
+        batch_size (int): number of records per UPDATE. Defaults to 1000.
+        sleep (float): seconds to sleep between the batches. Defaults to 0.
+        checkpoint (Optional[str]): progress file path, to resume an interrupted
+            transfer. It's removed once the transfer is done. Defaults to None.
+
+    Returns:
+        Dict[str, int]: number of transferred records per "app_label.Model.field".
+    """
+    if from_user.pk == to_user.pk:
+        return {}
+
+    progress = _load_checkpoint(checkpoint)
+    if progress.get("users") != [from_user.pk, to_user.pk]:
+        progress = {"users": [from_user.pk, to_user.pk], "transferred": {}}
+
+    models = []
+    for model, field in get_owned_data_owner_columns():
+        if model not in models:
+            models.append(model)
+        column = f"{model._meta.label}.{field}"
+        transferred = progress["transferred"].setdefault(column, 0)
+        queryset = model._default_manager.filter(**{field: from_user}).order_by("pk")
+        batch = queryset
+        while pks := list(batch.values_list("pk", flat=True)[:batch_size]):
+            transferred += queryset.filter(pk__in=pks).update(**{field: to_user})
+            batch = queryset.filter(pk__gt=pks[-1])
+            progress["transferred"][column] = transferred
+            _save_checkpoint(checkpoint, progress)
+            if sleep:
+                time.sleep(sleep)
+
+    owned_data_transferred.send(
+        sender=transfer_owned_data,
+        from_user=from_user,
+        to_user=to_user,
+        models=models,
+    )
+    if checkpoint is not None and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return progress["transferred"]
@@ -1,15 +1,64 @@
 """Owned Data views implementation."""
 from ast import literal_eval
+import csv
+import json
 import operator
-from typing import Any, Dict, Optional, Union, List, Tuple, Callable
-from rest_framework import viewsets
+import heapq
+from contextvars import Token
+from contextlib import nullcontext
+from functools import cmp_to_key
+from itertools import chain, islice
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    Optional,
+    Union,
+    List,
+    Tuple,
+    Callable,
+    Type,
+    ContextManager,
+)
+from rest_framework import mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import SAFE_METHODS, BasePermission
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
 from enum import Enum
 from abcmeta import ABC, abstractmethod
-from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, MultipleObjectsReturned
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from django.db.models.query import QuerySet
-from django.db.models import Q
+from django.db.models.deletion import Collector
+from django.db.models.signals import post_save, pre_save
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, StreamingHttpResponse
+from django.db.models import F, Q, Prefetch
+from django.utils.module_loading import import_string
 from django.contrib.auth.models import AnonymousUser
-from rest_framework.exceptions import PermissionDenied, MethodNotAllowed
+from rest_framework.exceptions import (
+    PermissionDenied,
+    MethodNotAllowed,
+    NotFound,
+    ValidationError,
+)
+from .audit import OwnedDataAuditLog
+from .budgets import OwnedDataQueryTracker
+from .denormalization import _resolve_owned_data_value, denormalize_owned_data_field
+from .filters import OwnedDataFilterBackend
+from .permissions import OwnedDataPermission
+from .policies import owned_data_policy_store
+from .principals import OwnedDataPrincipalSource, OwnedDataORMPrincipalSource
+from .routers import (
+    get_owned_data_shard,
+    owned_data_read_database,
+    owned_data_shard_database,
+)
+from .sharing import get_owned_data_shared_filter
+from .summaries import get_owned_data_summaries, register_owned_data_summaries
 from django.contrib.auth.models import Group, Permission, AbstractBaseUser
 
 
@@ -32,11 +81,214 @@ _collaborator_type_map = {
     "update": CollaborateType.PUT,
     "partial_update": CollaborateType.PATCH,
     "destroy": CollaborateType.DELETE,
+    "export": CollaborateType.GET,
+    "summary": CollaborateType.GET,
 }
 
 
-class OwnedDataModelViewSet(viewsets.ModelViewSet):  # viewsets.GenericViewSet,
-    """OwnedData model viewset implementation.
+# Registered OwnedDataMixin derived classes, e.g. OwnedDataModelViewSet classes.
+_owned_data_viewsets: List[Type["OwnedDataMixin"]] = []
+
+# Analyzed select_related and only of the list and retrieve querysets:
+# {(viewset class, serializer class, owned_data_fields repr): (select_related, only)}.
+_owned_data_query_plans: Dict[
+    Tuple[type, type, str], Tuple[List[str], Optional[List[str]]]
+] = {}
+
+# Cost-ordered evaluation plans of the collaborators:
+# {(principal source class, collaborators): collaborators sorted by cost}.
+_owned_data_collaborator_plans: Dict[Tuple[type, Tuple[str, ...]], List[str]] = {}
+
+
+def get_owned_data_viewsets() -> List[Type["OwnedDataMixin"]]:
+    """Get the registered OwnedDataMixin derived classes.
+
+    The classes are registered once their modules are imported: the views modules of
+    the installed apps are imported by the ready() of the "owned_data" app.
+
+    Returns:
+        List[Type[OwnedDataMixin]]: derived classes.
+    """
+    return list(_owned_data_viewsets)
+
+
+def _get_owned_data_owner_fields(
+    owned_data_fields: Optional[Union[List[str], List[List[str]]]]
+) -> List[str]:
+    """Get the fields without a fixed literal, e.g. of a policy override.
+
+    >>> _get_owned_data_owner_fields([["author"], ["publisher", "is_draft=False"]])
+    ["author", "publisher"]
+
+    Args:
+        owned_data_fields (Optional[Union[List[str], List[List[str]]]]): fields.
+
+    Returns:
+        List[str]: the fields without a fixed literal.
+    """
+    if not owned_data_fields:
+        return []
+
+    if isinstance(owned_data_fields[0], str):
+        owned_data_fields = [owned_data_fields]
+
+    owner_fields: List[str] = []
+    for sub_owned_data_fields in owned_data_fields:
+        for owned_data_field in sub_owned_data_fields:
+            if "=" not in owned_data_field and owned_data_field not in owner_fields:
+                owner_fields.append(owned_data_field)
+    return owner_fields
+
+
+def _get_owned_data_literal_filter(
+    owned_data_fields: Union[List[str], List[List[str]]], owner_field: str
+) -> Optional[Q]:
+    """Get the literal terms which apply to the records of the owner field.
+
+    >>> _get_owned_data_literal_filter([["author", "is_draft=False"]], "author")
+    Q(is_draft=False)
+
+    Args:
+        owned_data_fields (Union[List[str], List[List[str]]]): fields.
+        owner_field (str): owner field, e.g. "author".
+
+    Returns:
+        Optional[Q]: "OR" query of the literal terms of the owner field sub lists,
+            or None if a sub list of the owner field has no literal term.
+    """
+    if isinstance(owned_data_fields[0], str):
+        owned_data_fields = [owned_data_fields]
+
+    queries: List[Q] = []
+    for sub_owned_data_fields in owned_data_fields:
+        if owner_field not in sub_owned_data_fields:
+            continue
+        query = Q()
+        for owned_data_field in sub_owned_data_fields:
+            if "!=" in owned_data_field:
+                attribute, value = owned_data_field.split("!=", maxsplit=1)
+                query &= ~Q(**{attribute: literal_eval(value)})
+            elif "=" in owned_data_field:
+                attribute, value = owned_data_field.split("=", maxsplit=1)
+                query &= Q(**{attribute: literal_eval(value)})
+        # The owner records without a literal term.
+        if not query:
+            return None
+        queries.append(query)
+
+    query = queries[0]
+    for sub_query in queries[1:]:
+        query |= sub_query
+    return query
+
+
+class _EchoBuffer:
+    """File-like object which returns the written value instead of buffering it."""
+
+    def write(self, value: str) -> str:
+        """Return the written value."""
+        return value
+
+
+class _OwnedDataScatteredRecords:
+    """Lazy merge of a queryset on every shard, in the shape the paginators expect.
+
+    The ordering and the page window are pushed to the shards, so a page reads at
+    most its stop index of records per shard, which are merged by the ordering:
+    >>> records = _OwnedDataScatteredRecords(Post.objects.order_by("title"), shards)
+    >>> records[20:30]  # Post.objects.using(shard).order_by("title", "pk")[:30]
+
+    The NULL values are the smallest ones on every database, and the primary key
+    breaks the ties, since it's unique across the shards.
+    """
+
+    def __init__(self, queryset: QuerySet, shards: List[str]):
+        """Order the queryset by the string fields of its ordering.
+
+        Args:
+            queryset (QuerySet): filtered queryset.
+            shards (List[str]): shard database aliases.
+        """
+        pk_name = queryset.model._meta.pk.name
+        ordering = queryset.query.order_by or queryset.model._meta.ordering or []
+        # [(field name, descending)].
+        self.keys: List[Tuple[str, bool]] = []
+        for field in ordering:
+            if not isinstance(field, str) or field == "?":
+                continue
+            name = field.lstrip("-")
+            self.keys.append((pk_name if name == "pk" else name, field[0] == "-"))
+        if all(name != pk_name for name, _ in self.keys):
+            self.keys.append((pk_name, False))
+
+        self.queryset = queryset.order_by(
+            *(
+                F(name).desc(nulls_last=True)
+                if descending
+                else F(name).asc(nulls_first=True)
+                for name, descending in self.keys
+            )
+        )
+        self.shards = shards
+        self.__count: Optional[int] = None
+
+    def count(self) -> int:
+        """Count the records of all the shards, once."""
+        if self.__count is None:
+            self.__count = sum(
+                self.queryset.using(shard).count() for shard in self.shards
+            )
+        return self.__count
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.__merge(None)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if not isinstance(index, slice):
+            if index < 0:
+                return list(self)[index]
+            records = self[index : index + 1]
+            if not records:
+                raise IndexError("index out of range")
+            return records[0]
+
+        start, stop, step = index.start or 0, index.stop, index.step
+        if start < 0 or (stop is not None and stop < 0) or step not in (None, 1):
+            return list(self)[index]
+        return list(islice(self.__merge(stop), start, stop))
+
+    def __merge(self, stop: Optional[int]) -> Iterator[Any]:
+        """Merge the first stop records of every shard by the ordering."""
+        return heapq.merge(
+            *(self.queryset.using(shard)[:stop] for shard in self.shards),
+            key=cmp_to_key(self.__compare),
+        )
+
+    def __compare(self, record: Any, other: Any) -> int:
+        for name, descending in self.keys:
+            value = _resolve_owned_data_value(record, name)
+            other_value = _resolve_owned_data_value(other, name)
+            if value == other_value:
+                continue
+            if value is None:
+                result = -1
+            elif other_value is None:
+                result = 1
+            else:
+                result = -1 if value < other_value else 1
+            return -result if descending else result
+        return 0
+
+
+class OwnedDataMixin:
+    """OwnedData mixin implementation.
+
+    It contains the owned data attributes and logic, so it can be used by
+    OwnedDataModelViewSet, or by any GenericAPIView together with
+    OwnedDataFilterBackend and OwnedDataPermission.
 
     There are two attributes which can be changed in any derived class:
     * owned_data_fields: contains the table fields that the logged-in user has access to.
@@ -78,11 +330,33 @@ class OwnedDataModelViewSet(viewsets.ModelViewSet):  # viewsets.GenericViewSet,
     #
     # To have permission in a certain condition:
     # {CollaborateType.POST: {("g:bot", "g:platform"): ["status=in_progress"]}
+    #
+    # The collaborators of an action take precedence over its HTTP method, for example:
+    # {CollaborateType.POST: ["g:editor"], "cancel": ["g:operator"]}
     # Defaults to None.
     owned_data_collaborators: Optional[
-        Dict[CollaborateType, Union[List[str], Dict[Tuple[str], List[str]]]]
+        Dict[
+            Union[CollaborateType, str],
+            Union[List[str], Dict[Tuple[str], List[str]]],
+        ]
     ] = None
 
+    # owned_data_actions contains the HTTP methods of the custom viewset actions, e.g.
+    # @action(detail=True, methods=["post"]) def cancel, by which the collaborators are
+    # validated, in addition to the ModelViewSet actions. Other actions are not allowed.
+    # The format is {action: HTTP method}, for example: {"cancel": CollaborateType.POST}
+    # Defaults to None.
+    owned_data_actions: Optional[Dict[str, CollaborateType]] = None
+
+    # How the owned_data_collaborators of a method are combined: "all" means the
+    # request user must match all of them, and "any" means one of them is enough.
+    # Either way, they're checked by cost: in-memory checks first, then cached group
+    # and permission sets, then database lookups, and then f: functions, and the
+    # check stops as soon as the outcome is known.
+    # For example: {CollaborateType.GET: "any"}
+    # Defaults to None, which means "all" for all methods.
+    owned_data_collaborators_match: Optional[Dict[CollaborateType, str]] = None
+
     # Filter the database records by owned_data_fields.
     #
     # For example: Blog posts.
@@ -98,22 +372,161 @@ class OwnedDataModelViewSet(viewsets.ModelViewSet):  # viewsets.GenericViewSet,
     # customized permissions.
     owned_data_apply_default_permissions: bool = True
 
+    # owned_data_denormalized_fields contains the deep ownership paths which are
+    # materialized into a local indexed column of the model.
+    # The format is {path: field}, for example: {"post__author": "owned_data_owner"}
+    # which means the "post__author" field value is filtered by the local column:
+    # >>> Model.objects.filter(owned_data_owner=request.user)
+    # The field must be added to the model, e.g. a nullable ForeignKey to the user
+    # model, and it's kept correct by signals on every model along the path.
+    # See owned_data.drf.denormalization.
+    # Defaults to None.
+    owned_data_denormalized_fields: Optional[Dict[str, str]] = None
+
+    # The source of the request user's identity, groups, and permissions to
+    # validate the u:, g:, and p: collaborators.
+    # For example, OwnedDataTokenClaimsPrincipalSource validates them by the
+    # authentication token claims without any database query.
+    # Defaults to OwnedDataORMPrincipalSource.
+    owned_data_principal_source_class: Type[
+        OwnedDataPrincipalSource
+    ] = OwnedDataORMPrincipalSource
+
+    # owned_data_filter_params contains the query params which OwnedDataFilterBackend
+    # merges into the owned data filter, so they run in a single filter() call.
+    # The format is {query param: lookup}, for example: {"title": "title__icontains"}
+    # which means, for "?title=draft":
+    # >>> Model.objects.filter(Q(author=request.user) & Q(title__icontains="draft"))
+    # Defaults to None.
+    owned_data_filter_params: Optional[Dict[str, str]] = None
+
+    # Include the records which are shared with the request user, or their groups,
+    # by the per-object grants of owned_data.models.OwnedDataShare, for the
+    # request method. It's an "OR" of an indexed EXISTS subquery:
+    # >>> Model.objects.filter(Q(author=request.user) | Q(Exists(shares)))
+    # See owned_data.drf.sharing.grant_owned_data and revoke_owned_data.
+    # Defaults to False.
+    owned_data_shared: bool = False
+
+    # Override owned_data_fields and owned_data_collaborators by the policy of the
+    # class in owned_data.models.OwnedDataPolicy, which is looked up by the dotted
+    # path of the class, e.g. "job.views.JobViewSet". The compiled policies are
+    # cached per process, and reloaded when the version key in the Django cache
+    # is changed, which is checked once per OwnedDataPolicyStore.check_interval.
+    # Defaults to False.
+    owned_data_policy: bool = False
+
+    # Record the owned_data_collaborators decisions: user, viewset, action, outcome,
+    # and the matched collaborators, or the denying one. The records are put on the
+    # bounded queue of the audit log, and written in batches by its background thread.
+    # For example: OwnedDataAuditLog(max_size=10000, policy="drop")
+    # Defaults to None, which means the decisions are not recorded.
+    owned_data_audit_log: Optional[OwnedDataAuditLog] = None
+
+    # owned_data_query_budget contains the maximum number of database queries which the
+    # owned data logic, i.e. the policy, collaborators, and shared records filter, may
+    # run per action, not including the queries of the action itself.
+    # The format is {action: queries}, for example: {"list": 1, "destroy": 0}
+    # Exceeding it raises OwnedDataQueryBudgetExceeded with the captured SQL in DEBUG
+    # mode and tests, or logs a sampled warning. See owned_data.drf.budgets.
+    # Defaults to None.
+    owned_data_query_budget: Optional[Dict[str, int]] = None
+
+    # Collaborators decision of the request: ((request, HTTP method), allowed).
+    __owned_data_decision: Optional[Tuple[Tuple[Any, CollaborateType], bool]] = None
+
+    # Query tracker of the owned_data_query_budget of the request.
+    __owned_data_query_tracker: Optional[OwnedDataQueryTracker] = None
+
     # Store temporary data based on the request.
     __owned_data_variables: Dict[str, Any] = {}
 
+    def __init_subclass__(cls, **kwargs):
+        """Register the derived class and its denormalized fields."""
+        super().__init_subclass__(**kwargs)
+        _owned_data_viewsets.append(cls)
+        if cls.owned_data_denormalized_fields and cls.queryset is not None:
+            for path, field in cls.owned_data_denormalized_fields.items():
+                denormalize_owned_data_field(cls.queryset.model, path, field)
+
+    @classmethod
+    def get_owned_data_owner_fields(cls) -> List[str]:
+        """Get the owned_data_fields which are bound to the request user.
+
+        >>> owned_data_fields = [["author"], ["publisher", "is_draft=False"]]
+        >>> get_owned_data_owner_fields()
+        ["author", "publisher"]
+
+        Returns:
+            List[str]: the fields without a fixed literal.
+        """
+        return _get_owned_data_owner_fields(cls.owned_data_fields)
+
+    def __track_owned_data_queries(self) -> ContextManager:
+        """Count the queries of the owned data logic by the owned_data_query_budget.
+
+        Returns:
+            ContextManager: query tracker of the request, or a null context if the
+            action has no budget.
+        """
+        if self.owned_data_query_budget is None:
+            return nullcontext()
+        if self.__owned_data_query_tracker is None:
+            action = getattr(self, "action", None) or self.request.method.lower()
+            budget = self.owned_data_query_budget.get(action)
+            if budget is None:
+                return nullcontext()
+            self.__owned_data_query_tracker = OwnedDataQueryTracker(
+                f"{type(self).__module__}.{type(self).__qualname__}", action, budget
+            )
+        return self.__owned_data_query_tracker
+
+    def __apply_owned_data_policy(self):
+        """Override the owned data attributes of the instance by the policy store."""
+        if not self.owned_data_policy:
+            return
+
+        with self.__track_owned_data_queries():
+            policy = owned_data_policy_store.get_policy(
+                f"{type(self).__module__}.{type(self).__qualname__}"
+            )
+        if policy is None:
+            return
+        fields, collaborators = policy
+        if fields is not None:
+            self.owned_data_fields = fields
+        if collaborators is not None:
+            # The keys the policy doesn't mention keep the collaborators of the class.
+            self.owned_data_collaborators = {
+                **(type(self).owned_data_collaborators or {}),
+                **collaborators,
+            }
+
     def __setup_owned_data_variables(self):
         """Prepare required variables for owned data."""
+        self.__apply_owned_data_policy()
+
+        # Keep the variables per instance, not shared between requests.
+        self.__owned_data_variables = {}
+
         # User.
         if self.request.user.is_authenticated:
             self.__owned_data_variables["request_user"] = self.request.user
 
-        # Method.
+        # Method, by the viewset action or, in generic views, by the HTTP method.
+        action = getattr(self, "action", None)
         try:
-            self.__owned_data_variables["request_method"] = _collaborator_type_map[
-                self.action
-            ]
-        except KeyError as action_not_found:
-            raise MethodNotAllowed(method=self.action) from action_not_found
+            if action is None:
+                request_method = CollaborateType(self.request.method.lower())
+            elif self.owned_data_actions and action in self.owned_data_actions:
+                request_method = self.owned_data_actions[action]
+            else:
+                request_method = _collaborator_type_map[action]
+        except (KeyError, ValueError) as action_not_found:
+            raise MethodNotAllowed(
+                method=action or self.request.method
+            ) from action_not_found
+        self.__owned_data_variables["request_method"] = request_method
 
     def __parse_owned_data_field_value(
         self, field_value: str
@@ -144,6 +557,11 @@ class OwnedDataModelViewSet(viewsets.ModelViewSet):  # viewsets.GenericViewSet,
         else:
             # Ignore user data field if the user is not authenticated yet.
             if self.__owned_data_variables.get("request_user"):
+                # Use the local column of the denormalized path.
+                if self.owned_data_denormalized_fields:
+                    field_value = self.owned_data_denormalized_fields.get(
+                        field_value, field_value
+                    )
                 return (
                     field_value,
                     operator.eq,
@@ -174,14 +592,11 @@ class OwnedDataModelViewSet(viewsets.ModelViewSet):  # viewsets.GenericViewSet,
                     % (type(first_owned_data_field), type(owned_data_field))
                 )
 
-    def __filter_by_owned_data_fields_by_str_type(self, queryset: QuerySet) -> QuerySet:
-        """Filter queryset based on the owned_data_fields: List[str] attribute.
-
-        Args:
-            queryset (QuerySet): queryset object.
+    def __build_owned_data_query_by_str_type(self) -> Optional[Q]:
+        """Build the owned data query based on the owned_data_fields: List[str] attribute.
 
         Returns:
-            QuerySet: customized queryset.
+            Optional[Q]: "AND" query of the parsed fields, or None if nothing parsed.
         """
         query: Optional[Q] = None
         for owned_data_field in self.owned_data_fields:
@@ -202,22 +617,13 @@ class OwnedDataModelViewSet(viewsets.ModelViewSet):  # viewsets.GenericViewSet,
                         else ~Q(**{attribute: value})
                     )
 
-        # If nothing parsed, then return.
-        if query is None:
-            return queryset
-
-        return queryset.filter(query)
-
-    def __filter_by_owned_data_fields_by_list_type(
-        self, queryset: QuerySet
-    ) -> QuerySet:
-        """Filter queryset based on the owned_data_fields: List[List[str]] attribute.
+        return query
 
-        Args:
-            queryset (QuerySet): queryset object.
+    def __build_owned_data_query_by_list_type(self) -> Optional[Q]:
+        """Build the owned data query based on the owned_data_fields: List[List[str]] attribute.
 
         Returns:
-            QuerySet: customized queryset.
+            Optional[Q]: "OR" query of the parsed sub queries, or None if nothing parsed.
         """
         queries: List[Q] = []
         for owned_data_field in self.owned_data_fields:
@@ -247,51 +653,109 @@ class OwnedDataModelViewSet(viewsets.ModelViewSet):  # viewsets.GenericViewSet,
 
         # If nothing parsed, then return.
         if not queries:
-            return queryset
+            return None
 
         # Make "OR" statement between all sub queries.
         query: Q = queries[0]
         for processed_query in queries[1:]:
             query |= processed_query
 
-        return queryset.filter(query)
+        return query
 
-    def __filter_by_owned_data_fields(self, queryset: QuerySet) -> QuerySet:
-        """Filter queryset based on the owned_data_fields attribute.
+    def get_owned_data_filter(self) -> Optional[Q]:
+        """Build the owned data filter based on the owned_data_fields attribute.
 
-        Args:
-            queryset (QuerySet): queryset object.
+        It can be used to apply the same ownership rules outside of get_queryset,
+        e.g. on related querysets.
 
         Returns:
-            QuerySet: customized queryset.
+            Optional[Q]: owned data query, or None if there is nothing to filter.
         """
+        if not self.owned_data_fields:
+            return None
+
+        # Prepare required variables, if they're not prepared by the request yet.
+        if "request_method" not in self.__owned_data_variables:
+            self.__setup_owned_data_variables()
+
         # Defining the filter type based on the first item of owned_data_fields.
         if isinstance(self.owned_data_fields[0], str):
-            return self.__filter_by_owned_data_fields_by_str_type(queryset)
-        return self.__filter_by_owned_data_fields_by_list_type(queryset)
+            query = self.__build_owned_data_query_by_str_type()
+        else:
+            query = self.__build_owned_data_query_by_list_type()
 
-    def __find_collaborator_by_prefix(
-        self, collaborator: str
-    ) -> Union[AbstractBaseUser, Group, Permission]:
-        """Find collaborator by prefix.
+        # Add the records which are shared with the request user.
+        user = self.__owned_data_variables.get("request_user")
+        if query is not None and self.owned_data_shared and user is not None:
+            with self.__track_owned_data_queries():
+                query |= get_owned_data_shared_filter(
+                    self.queryset.model,
+                    user,
+                    self.__owned_data_variables["request_method"],
+                )
+
+        return query
+
+    def __has_owned_data_collaborator(
+        self, principal_source: OwnedDataPrincipalSource, collaborator: str
+    ) -> bool:
+        """Check the request user against the collaborator by prefix.
+
+        >>> __has_owned_data_collaborator(principal_source, "g:admin")
+        True
 
         Args:
+            principal_source (OwnedDataPrincipalSource): principal source of the request.
             collaborator (str): collaborator. e.g. "u:admin".
 
         Returns:
-            Union[AbstractBaseUser, Group, Permission]: any object that can be used to validate the permission.
+            bool: True if the request user matches the collaborator.
         """
         prefix, value = collaborator.split(":", maxsplit=1)
         if prefix == "u":  # User.
-            return get_user_model().objects.get(Q(username=value) | Q(email=value))
+            return principal_source.is_user(self.request, value)
         elif prefix == "g":  # Group.
-            return Group.objects.get(name=value)
+            return principal_source.has_group(self.request, value)
         elif prefix == "p":  # Permission.
-            return Permission.objects.get(Q(name=value) | Q(codename=value))
+            return principal_source.has_permission(self.request, value)
         elif prefix == "f":  # Function must return a Group, User, or Permission.
-            return getattr(self, f"owned_data_collaborate_{value}")()
+            collaborator_obj = getattr(self, f"owned_data_collaborate_{value}")()
+            if isinstance(collaborator_obj, AbstractBaseUser):
+                return self.request.user.pk == collaborator_obj.pk
+            elif isinstance(collaborator_obj, Group):
+                return principal_source.has_group(self.request, collaborator_obj.name)
+            elif isinstance(collaborator_obj, Permission):
+                return principal_source.has_permission(
+                    self.request, collaborator_obj.codename
+                )
+            return False
         raise ValueError("invalid prefix: %s" % prefix)
 
+    @staticmethod
+    def __get_owned_data_collaborators_plan(
+        principal_source: OwnedDataPrincipalSource, collaborators: List[str]
+    ) -> List[str]:
+        """Get the collaborators in the order of their cost.
+
+        The plans are cached per principal source class.
+
+        >>> __get_owned_data_collaborators_plan(source, ["p:add_post", "u:admin"])
+        ["u:admin", "p:add_post"]
+
+        Args:
+            principal_source (OwnedDataPrincipalSource): principal source of the request.
+            collaborators (List[str]): collaborators, e.g. ["g:editor", "u:admin"].
+
+        Returns:
+            List[str]: sorted collaborators, the declaration order is kept per cost.
+        """
+        key = (type(principal_source), tuple(collaborators))
+        if (plan := _owned_data_collaborator_plans.get(key)) is None:
+            plan = _owned_data_collaborator_plans[key] = sorted(
+                collaborators, key=principal_source.get_collaborator_cost
+            )
+        return plan
+
     def __validate_owned_data_collaborators_by_list_type(
         self, collaborators: List[str]
     ):
@@ -301,10 +765,21 @@ class OwnedDataModelViewSet(viewsets.ModelViewSet):  # viewsets.GenericViewSet,
         >>> __validate_owned_data_collaborators_by_list_type(["*"])
 
         Raises:
+            ValueError: in case of invalid owned_data_collaborators_match.
             PermissionDenied: in case of permission denied.
         """
+        match = (self.owned_data_collaborators_match or {}).get(
+            self.__owned_data_variables["request_method"], "all"
+        )
+        if match not in ("all", "any"):
+            raise ValueError("invalid collaborators match: %s" % match)
+
+        # The decisive collaborators, for the audit log.
+        self.__owned_data_variables["collaborator"] = ",".join(collaborators)
+
         # Anyone can collaborate.
         if "*" in collaborators:
+            self.__owned_data_variables["collaborator"] = "*"
             return
 
         # Get user object.
@@ -312,25 +787,27 @@ class OwnedDataModelViewSet(viewsets.ModelViewSet):  # viewsets.GenericViewSet,
         if user is None:
             raise PermissionDenied
 
-        for collaborator in collaborators:
-            collaborator_obj = self.__find_collaborator_by_prefix(collaborator)
-
-            # User.
-            if isinstance(collaborator_obj, AbstractBaseUser):
-                if user.id != collaborator_obj.id:
-                    raise PermissionDenied
-
-            # Group.
-            elif isinstance(collaborator_obj, Group):
-                try:
-                    user.groups.get(id=collaborator_obj.id)
-                except Group.DoesNotExist:
-                    raise PermissionDenied
-
-            # Permission.
-            elif isinstance(collaborator_obj, Permission):
-                if not user.has_perm(collaborator_obj):
+        principal_source = self.owned_data_principal_source_class()
+        if match == "all":
+            allowed = principal_source.has_collaborators(self.request, collaborators)
+            if allowed is not None:
+                if not allowed:
                     raise PermissionDenied
+                return
+
+        # Stop at the first mismatch of "all", or the first match of "any".
+        for collaborator in self.__get_owned_data_collaborators_plan(
+            principal_source, collaborators
+        ):
+            matched = self.__has_owned_data_collaborator(principal_source, collaborator)
+            if matched != (match == "all"):
+                self.__owned_data_variables["collaborator"] = collaborator
+                if matched:
+                    return
+                raise PermissionDenied
+
+        if match == "any":
+            raise PermissionDenied
 
     def __validate_owned_data_collaborators(self):
         """Validate owned data collaborators.
@@ -338,16 +815,68 @@ class OwnedDataModelViewSet(viewsets.ModelViewSet):  # viewsets.GenericViewSet,
         Raises:
             PermissionDenied: in case of permission denied.
         """
-        collaborators = self.owned_data_collaborators.get(
-            self.__owned_data_variables["request_method"]
-        )
+        # The collaborators of the action take precedence over the HTTP method ones.
+        collaborators = self.owned_data_collaborators.get(getattr(self, "action", None))
+        if collaborators is None:
+            collaborators = self.owned_data_collaborators.get(
+                self.__owned_data_variables["request_method"]
+            )
         if collaborators is None:
             return
 
-        self.__validate_owned_data_collaborators_by_list_type(collaborators)
+        # Validate once per request, e.g. update and get_object both invoke owned data.
+        decision_key = (self.request, self.__owned_data_variables["request_method"])
+        if self.__owned_data_decision is not None:
+            key, allowed = self.__owned_data_decision
+            if key == decision_key:
+                if not allowed:
+                    raise PermissionDenied
+                return
+
+        with self.__track_owned_data_queries():
+            try:
+                self.__validate_owned_data_collaborators_by_list_type(collaborators)
+            except PermissionDenied:
+                self.__owned_data_decision = (decision_key, False)
+                if self.owned_data_audit_log is not None:
+                    self.__record_owned_data_decision(False)
+                raise
+            self.__owned_data_decision = (decision_key, True)
+            if self.owned_data_audit_log is not None:
+                self.__record_owned_data_decision(True)
+
+    def __record_owned_data_decision(self, allowed: bool):
+        """Put the collaborators decision on the audit log queue.
+
+        Args:
+            allowed (bool): decision.
+        """
+        user = self.__owned_data_variables.get("request_user")
+        self.owned_data_audit_log.record(
+            user_pk=None if user is None else user.pk,
+            viewset=f"{type(self).__module__}.{type(self).__qualname__}",
+            action=getattr(self, "action", None) or self.request.method.lower(),
+            allowed=allowed,
+            collaborator=self.__owned_data_variables.get("collaborator", ""),
+        )
+
+    def check_owned_data_collaborators(self):
+        """Validate the owned_data_collaborators of the request.
 
-    def __invoke_owned_data(self) -> bool:
-        """Initialize and validate by owned data."""
+        Raises:
+            PermissionDenied: in case of permission denied.
+        """
+        self.__setup_owned_data_variables()
+        if self.owned_data_collaborators is not None:
+            self.__validate_owned_data_collaborators()
+
+    def invoke_owned_data(self) -> bool:
+        """Initialize and validate by owned data.
+
+        Returns:
+            bool: False if there is no owned data attribute.
+        """
+        self.__apply_owned_data_policy()
         if self.owned_data_fields is None and self.owned_data_collaborators is None:
             return False
 
@@ -357,12 +886,655 @@ class OwnedDataModelViewSet(viewsets.ModelViewSet):  # viewsets.GenericViewSet,
         # Prepare required variables for replacement.
         self.__setup_owned_data_variables()
 
-        # Validate collaborators.
-        if self.owned_data_collaborators is not None:
+        # Validate collaborators, unless OwnedDataPermission validates them.
+        if self.owned_data_collaborators is not None and not any(
+            issubclass(permission_class, OwnedDataPermission)
+            for permission_class in getattr(self, "permission_classes", ())
+        ):
             self.__validate_owned_data_collaborators()
 
         return True
 
+
+class OwnedDataModelViewSet(OwnedDataMixin, viewsets.ModelViewSet):  # viewsets.GenericViewSet,
+    """OwnedData model viewset implementation.
+
+    It filters the queryset and validates the collaborators of the ModelViewSet
+    actions by the OwnedDataMixin attributes.
+    """
+
+    # owned_data_prefetch_related contains the nested relations which must be loaded
+    # by the owned data rules of their own viewsets.
+    # The format is {lookup: viewset class or its dotted path}, for example:
+    # {"comments": CommentViewSet} which means:
+    # >>> queryset.prefetch_related(
+    #   Prefetch("comments", queryset=CommentViewSet(request).get_queryset())
+    # )
+    # If the related viewset denies the collaborator, the relation will be empty.
+    # Defaults to None.
+    owned_data_prefetch_related: Optional[
+        Dict[str, Union[str, Type["OwnedDataModelViewSet"]]]
+    ] = None
+
+    # Run destroy and partial_update as a single ownership checked statement,
+    # instead of loading the object before the DELETE/UPDATE. For example:
+    # >>> Model.objects.filter(owned_data_filter, pk=pk).delete()
+    # >>> Model.objects.filter(owned_data_filter, pk=pk).update(**validated_data)
+    # The affected rows define the response: 204/200 or 404. The object isn't loaded,
+    # so the partial_update response only contains the updated fields, not the full
+    # serializer output of the default behaviour.
+    # It falls back to the default behaviour when a loaded instance is required, e.g.
+    # object permissions, signal receivers, cascades, auto_now fields, or customized
+    # perform_destroy, perform_update, and serializer update.
+    # Defaults to False.
+    owned_data_fast_write: bool = False
+
+    # Bind the owner fields, the plain owned_data_fields of the model itself, e.g.
+    # "author", to the request user instead of the request data. They're read-only in
+    # the create and update serializers, so clients can't forge the ownership, and the
+    # related fields don't run a query to validate the sent values. perform_create
+    # saves them by the request user, for a record or a list of records:
+    # >>> serializer.save(author=request.user)
+    # The updates keep the stored owner, e.g. of the records shared with the user.
+    # Defaults to False.
+    owned_data_inject_owner_fields: bool = False
+
+    # Send the safe (GET, HEAD, OPTIONS) requests to a read replica database alias.
+    # It requires owned_data.drf.routers.OwnedDataReadReplicaRouter in DATABASE_ROUTERS.
+    # For example: "replica".
+    # Defaults to None.
+    owned_data_read_database: Optional[str] = None
+
+    # After a successful write, the user reads from the primary database for
+    # this number of seconds, so the user can see their own writes.
+    # The writes are recorded in the Django cache.
+    # Defaults to 5.
+    owned_data_read_sticky_seconds: int = 5
+
+    # owned_data_export_fields contains the fields of the "export" action, which
+    # streams the owned data records without loading them all in memory:
+    # >>> queryset.values_list(*owned_data_export_fields).iterator(chunk_size)
+    # The format is NDJSON by default, or CSV by the "?export_format=csv" query param.
+    # The same collaborators as "list" (GET) apply.
+    # Defaults to None, which means the export action is disabled.
+    owned_data_export_fields: Optional[List[str]] = None
+
+    # The number of records fetched per database round-trip by the "export" action.
+    # Defaults to 2000.
+    owned_data_export_chunk_size: int = 2000
+
+    # owned_data_shards contains the database aliases that the records are split
+    # across by the owner. The shard is computed from the bound ownership value,
+    # the request user pk, and the reads and writes of the request are routed to it:
+    # >>> owned_data_shards[request.user.pk % len(owned_data_shards)]
+    # The requests which aren't pinned to an owner, e.g. anonymous users, literal only
+    # owned_data_fields, or owned_data_shared, gather the listings and exports from all
+    # the shards, merged by the ordering, look up the objects on every shard, and can't
+    # create records. The primary keys must be unique across the shards, e.g. UUIDs,
+    # or the detail lookups raise MultipleObjectsReturned.
+    # It requires owned_data.drf.routers.OwnedDataShardRouter in DATABASE_ROUTERS.
+    # Defaults to None.
+    owned_data_shards: Optional[List[str]] = None
+
+    # owned_data_summaries contains the aggregates of the owned records, which are
+    # stored per owner in owned_data.models.OwnedDataSummary, updated incrementally
+    # by the save/delete signals of the model, and served by the "summary" action.
+    # The format is {name: (aggregate, group by)}, where aggregate is "count" or
+    # "sum:<field>", and group by is a field or None, for example:
+    # {"total": ("count", None), "per_status": ("count", "is_draft")}
+    # The owner is the first field of get_owned_data_owner_fields(), and the records
+    # are the ones of queryset, under the literal terms of the owned_data_fields of the
+    # owner, e.g. "is_draft=False". They're stored per viewset, and the writes which
+    # don't send signals are repaired by the owned_data_rebuild_summaries command.
+    # Defaults to None, which means the summary action is disabled.
+    owned_data_summaries: Optional[Dict[str, Tuple[str, Optional[str]]]] = None
+
+    # Apply select_related and only to the list and retrieve querysets, by the forward
+    # relations of the ownership paths and of the serializer fields, which are analyzed
+    # once per class, so serializing a relation doesn't run a query per record:
+    # >>> queryset.select_related("author").only("id", "title", "author")
+    # only is skipped if the serializer needs the non-field attributes of the model.
+    # It can be a list of select_related lookups instead of the analysis, e.g. ["author"].
+    # Defaults to True. False disables it.
+    owned_data_select_related: Union[bool, List[str]] = True
+
+    # owned_data_bulk_updates contains the list actions which update the owned records
+    # by a single ownership filtered UPDATE statement, instead of a request per record.
+    # The format is {action: values}, for example: {"cancel": {"status": "cancelled"}}
+    # which adds the "cancel" action, by the HTTP method of owned_data_actions or POST,
+    # and means, for the {"ids": [1, 2]} request data:
+    # >>> queryset.filter(owned_data_filter, pk__in=[1, 2]).update(status="cancelled")
+    # Without "ids", the records of the filter backends, e.g. by query params, are
+    # updated. The response is the number of updated records. If the model has
+    # pre_save/post_save listeners, e.g. summaries, or auto_now fields, the records
+    # are saved one by one instead, by save(update_fields=...), in a transaction.
+    # The anonymous users, and the requests without an owned data filter, are denied,
+    # unless owned_data_collaborators contains the action or its HTTP method.
+    # Defaults to None.
+    owned_data_bulk_updates: Optional[Dict[str, Dict[str, Any]]] = None
+
+    # Reset token of the read database routing of the request.
+    __owned_data_read_database_token: Optional[Token] = None
+
+    # Reset token of the shard database routing of the request.
+    __owned_data_shard_database_token: Optional[Token] = None
+
+    def __init_subclass__(cls, **kwargs):
+        """Register the summaries and the bulk update actions of the derived class."""
+        super().__init_subclass__(**kwargs)
+        if cls.owned_data_bulk_updates:
+            owned_data_actions = dict(cls.owned_data_actions or {})
+            for name in cls.owned_data_bulk_updates:
+                method = owned_data_actions.setdefault(name, CollaborateType.POST)
+                if not hasattr(cls, name):
+                    bulk_update = cls.__get_owned_data_bulk_update_action(name, method)
+                    setattr(cls, name, bulk_update)
+            cls.owned_data_actions = owned_data_actions
+
+        if cls.owned_data_summaries and cls.queryset is not None:
+            owner_fields = cls.get_owned_data_owner_fields()
+            if not owner_fields:
+                raise ValueError(
+                    "%s owned_data_summaries require an owner field in owned_data_fields!"
+                    % cls.__name__
+                )
+            # The records of the owner, by the literal terms of owned_data_fields.
+            queryset = cls.queryset.all()
+            literal_filter = _get_owned_data_literal_filter(
+                cls.owned_data_fields, owner_fields[0]
+            )
+            if literal_filter is not None:
+                queryset = queryset.filter(literal_filter)
+            owner_path = owner_fields[0]
+            if cls.owned_data_denormalized_fields:
+                owner_path = cls.owned_data_denormalized_fields.get(owner_path, owner_path)
+            register_owned_data_summaries(
+                cls, queryset, owner_path, cls.owned_data_summaries
+            )
+
+    @staticmethod
+    def __get_owned_data_bulk_update_action(
+        name: str, method: CollaborateType
+    ) -> Callable:
+        """Get the list action of an owned_data_bulk_updates entry.
+
+        Args:
+            name (str): action name, e.g. "cancel".
+            method (CollaborateType): HTTP method of the action.
+
+        Returns:
+            Callable: viewset action.
+        """
+
+        def bulk_update(self, request, *args, **kwargs):
+            return self.__bulk_update_owned_data(request)
+
+        bulk_update.__name__ = name
+        bulk_update.__doc__ = "Update the owned records by the owned data filter."
+        return action(detail=False, methods=[method.value])(bulk_update)
+
+    def __bulk_update_owned_data(self, request) -> Response:
+        """Update the owned records by the owned_data_bulk_updates values of the action.
+
+        Args:
+            request (Request): DRF request.
+
+        Raises:
+            PermissionDenied: in case of an anonymous user, or no owned data filter,
+                unless the owned_data_collaborators of the action allow it.
+            ValidationError: in case of invalid "ids".
+
+        Returns:
+            Response: the number of updated records.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        # Without an owner, the statement would update every record of the table.
+        collaborators = self.owned_data_collaborators or {}
+        if (
+            not request.user.is_authenticated or self.get_owned_data_filter() is None
+        ) and (
+            self.action not in collaborators
+            and self.owned_data_actions[self.action] not in collaborators
+        ):
+            raise PermissionDenied
+
+        ids = request.data.get("ids") if isinstance(request.data, dict) else None
+        if ids is not None:
+            try:
+                if not isinstance(ids, list):
+                    raise TypeError
+                queryset = queryset.filter(pk__in=ids)
+            except (TypeError, ValueError) as invalid_ids:
+                raise ValidationError(
+                    {"ids": ["Expected a list of ids."]}
+                ) from invalid_ids
+
+        values = self.owned_data_bulk_updates[self.action]
+        if self.__is_owned_data_scattered():
+            querysets = [queryset.using(shard) for shard in self.owned_data_shards]
+        else:
+            querysets = [queryset]
+
+        if self.__can_fast_bulk_update(queryset.model):
+            updated = sum(queryset.update(**values) for queryset in querysets)
+        else:
+            updated = sum(
+                self.__save_owned_data_records(queryset, values)
+                for queryset in querysets
+            )
+        return Response({"updated": updated})
+
+    @staticmethod
+    def __save_owned_data_records(queryset: QuerySet, values: Dict[str, Any]) -> int:
+        """Update the records one by one, so the save signals are sent.
+
+        Args:
+            queryset (QuerySet): owned records.
+            values (Dict[str, Any]): field values.
+
+        Returns:
+            int: number of updated records.
+        """
+        update_fields = list(values) + [
+            field.name
+            for field in queryset.model._meta.concrete_fields
+            if getattr(field, "auto_now", False)
+        ]
+        updated = 0
+        with transaction.atomic(using=queryset.db):
+            for instance in queryset:
+                for field, value in values.items():
+                    setattr(instance, field, value)
+                instance.save(update_fields=update_fields)
+                updated += 1
+        return updated
+
+    def __filter_by_owned_data_fields(self, queryset: QuerySet) -> QuerySet:
+        """Filter queryset based on the owned_data_fields attribute.
+
+        Args:
+            queryset (QuerySet): queryset object.
+
+        Returns:
+            QuerySet: customized queryset.
+        """
+        query = self.get_owned_data_filter()
+        if query is None:
+            return queryset
+        return queryset.filter(query)
+
+    def __get_owned_data_prefetch_queryset(
+        self, viewset_class: Union[str, Type["OwnedDataModelViewSet"]]
+    ) -> QuerySet:
+        """Get the related queryset filtered by the related viewset owned data.
+
+        Args:
+            viewset_class (Union[str, Type[OwnedDataModelViewSet]]): related viewset
+                class or its dotted path.
+
+        Returns:
+            QuerySet: related queryset, or an empty queryset in case of permission denied.
+        """
+        if isinstance(viewset_class, str):
+            viewset_class = import_string(viewset_class)
+
+        related_viewset = viewset_class(
+            request=self.request,
+            format_kwarg=self.format_kwarg,
+            action="list",
+            args=(),
+            kwargs={},
+        )
+        try:
+            queryset = related_viewset.get_queryset()
+        except PermissionDenied:
+            return related_viewset.queryset.none()
+
+        # The filter backends don't run on the prefetch, so apply the owned data
+        # filter which get_queryset leaves to OwnedDataFilterBackend.
+        if any(
+            issubclass(filter_backend, OwnedDataFilterBackend)
+            for filter_backend in related_viewset.filter_backends
+        ):
+            queryset = related_viewset.__filter_by_owned_data_fields(queryset)
+
+        # The prefetch needs the columns of the relation.
+        return queryset.defer(None)
+
+    def __prefetch_owned_data_related(self, queryset: QuerySet) -> QuerySet:
+        """Prefetch the owned_data_prefetch_related relations.
+
+        Args:
+            queryset (QuerySet): queryset object.
+
+        Returns:
+            QuerySet: customized queryset.
+        """
+        if not self.owned_data_prefetch_related:
+            return queryset
+
+        return queryset.prefetch_related(
+            *(
+                Prefetch(
+                    lookup, queryset=self.__get_owned_data_prefetch_queryset(viewset)
+                )
+                for lookup, viewset in self.owned_data_prefetch_related.items()
+            )
+        )
+
+    @staticmethod
+    def __get_owned_data_relation_path(model: Any, path: List[str]) -> Optional[str]:
+        """Get the forward relations prefix of the path.
+
+        >>> __get_owned_data_relation_path(Comment, ["post", "author"])
+        "post__author"
+        >>> __get_owned_data_relation_path(Post, ["title"])
+        None
+
+        Args:
+            model (Any): model class.
+            path (List[str]): path parts.
+
+        Returns:
+            Optional[str]: select_related lookup, or None if there is no relation.
+        """
+        relations: List[str] = []
+        for part in path:
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                break
+            if not (field.many_to_one or field.one_to_one) or not field.concrete:
+                break
+            relations.append(part)
+            model = field.related_model
+        return "__".join(relations) or None
+
+    def __get_owned_data_query_plan(
+        self, model: Any
+    ) -> Tuple[List[str], Optional[List[str]]]:
+        """Analyze the select_related and only of the list and retrieve querysets.
+
+        Returns:
+            Tuple[List[str], Optional[List[str]]]: select_related lookups, and only
+            fields, or None if the serializer needs the other attributes.
+        """
+        if isinstance(self.owned_data_select_related, list):
+            return self.owned_data_select_related, None
+
+        # The policy may override owned_data_fields per instance.
+        key = (type(self), self.get_serializer_class(), repr(self.owned_data_fields))
+        if (plan := _owned_data_query_plans.get(key)) is not None:
+            return plan
+
+        select_related = set()
+        denormalized_fields = self.owned_data_denormalized_fields or {}
+        for path in _get_owned_data_owner_fields(self.owned_data_fields):
+            # The denormalized columns are filtered without any join.
+            if path not in denormalized_fields and (
+                lookup := self.__get_owned_data_relation_path(model, path.split("__"))
+            ):
+                select_related.add(lookup)
+
+        serializer = self.get_serializer()
+        only: Optional[set] = {model._meta.pk.name}
+        if not isinstance(serializer, serializers.ModelSerializer):
+            only = None
+        for field in getattr(serializer, "fields", {}).values():
+            if field.write_only:
+                continue
+            if field.source == "*":
+                only = None
+                continue
+            try:
+                model_field = model._meta.get_field(field.source_attrs[0])
+            except FieldDoesNotExist:
+                only = None
+                continue
+            if not model_field.concrete:
+                continue
+            if only is not None:
+                only.add(model_field.name)
+
+            # The related object is loaded, unless only its primary key is serialized.
+            if (
+                len(field.source_attrs) > 1
+                or isinstance(field, serializers.BaseSerializer)
+                or (
+                    isinstance(field, serializers.RelatedField)
+                    and not field.use_pk_only_optimization()
+                )
+            ) and (
+                lookup := self.__get_owned_data_relation_path(model, field.source_attrs)
+            ):
+                select_related.add(lookup)
+
+        if only is not None:
+            only.update(lookup.split("__")[0] for lookup in select_related)
+        plan = _owned_data_query_plans[key] = (
+            sorted(select_related),
+            None if only is None else sorted(only),
+        )
+        return plan
+
+    def __select_owned_data_related(self, queryset: QuerySet) -> QuerySet:
+        """Apply owned_data_select_related to the list and retrieve querysets.
+
+        Args:
+            queryset (QuerySet): queryset object.
+
+        Returns:
+            QuerySet: customized queryset.
+        """
+        if not self.owned_data_select_related or getattr(self, "action", None) not in (
+            "list",
+            "retrieve",
+        ):
+            return queryset
+
+        select_related, only = self.__get_owned_data_query_plan(queryset.model)
+        # Keep the select_related and only/defer of the viewset queryset.
+        if queryset.query.select_related is True or queryset.query.deferred_loading != (
+            frozenset(),
+            True,
+        ):
+            only = None
+        elif only is not None and queryset.query.select_related:
+            only = [*only, *queryset.query.select_related]
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if only is not None:
+            queryset = queryset.only(*only)
+        return queryset
+
+    def __get_owned_data_injected_fields(self) -> List[str]:
+        """Get the owner fields of the model itself, which are bound to the request user.
+
+        >>> owned_data_fields = [["author"], ["post__author", "is_draft=False"]]
+        >>> __get_owned_data_injected_fields()
+        ["author"]
+
+        Returns:
+            List[str]: model field names.
+        """
+        concrete_fields = {f.name for f in self.queryset.model._meta.concrete_fields}
+        return [f for f in self.get_owned_data_owner_fields() if f in concrete_fields]
+
+    def __get_owned_data_write_queryset(self) -> QuerySet:
+        """Get the owned data queryset of the requested object for a single statement write.
+
+        Raises:
+            Http404: in case of an invalid lookup value, like get_object_or_404.
+
+        Returns:
+            QuerySet: filtered queryset by the owned data and the lookup field.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            return queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, DjangoValidationError) as invalid_lookup:
+            raise Http404 from invalid_lookup
+
+    def __can_fast_write(self) -> bool:
+        """Check if the request can write without loading the object.
+
+        The object permissions of the permission classes need the loaded object.
+
+        Returns:
+            bool: True if owned_data_fast_write applies to the request.
+        """
+        if not self.owned_data_fast_write or self.__is_owned_data_scattered():
+            return False
+        return all(
+            type(permission).has_object_permission
+            is BasePermission.has_object_permission
+            for permission in self.get_permissions()
+        )
+
+    def __can_fast_destroy(self, queryset: QuerySet) -> bool:
+        """Check if the object can be deleted without loading it.
+
+        Args:
+            queryset (QuerySet): owned data write queryset.
+
+        Returns:
+            bool: True if a single DELETE statement is enough.
+        """
+        if type(self).perform_destroy is not mixins.DestroyModelMixin.perform_destroy:
+            return False
+        return Collector(using=queryset.db).can_fast_delete(queryset)
+
+    @staticmethod
+    def __can_fast_bulk_update(model: Any) -> bool:
+        """Check if the records can be updated by QuerySet.update, without the signals.
+
+        Args:
+            model (Any): model class.
+
+        Returns:
+            bool: True if no save signal listener or auto_now field is skipped.
+        """
+        if pre_save.has_listeners(model) or post_save.has_listeners(model):
+            return False
+        return not any(
+            getattr(field, "auto_now", False) for field in model._meta.concrete_fields
+        )
+
+    def __can_fast_update(self, model: Any, serializer: Any) -> bool:
+        """Check if the object can be updated without loading it.
+
+        Args:
+            model (Any): model class.
+            serializer (Any): serializer object.
+
+        Returns:
+            bool: True if a single UPDATE statement is enough.
+        """
+        if type(self).perform_update is not mixins.UpdateModelMixin.perform_update:
+            return False
+        if type(serializer).update is not serializers.ModelSerializer.update:
+            return False
+        if not self.__can_fast_bulk_update(model):
+            return False
+
+        # Unique validators need the instance to exclude itself.
+        if serializer.get_validators():
+            return False
+        for field in serializer.fields.values():
+            if any(isinstance(v, UniqueValidator) for v in field.validators):
+                return False
+        return True
+
+    def __get_owned_data_sticky_key(self, request) -> Optional[str]:
+        """Get the cache key of the read-your-writes stickiness of the request user.
+
+        Returns:
+            Optional[str]: cache key, or None for anonymous users.
+        """
+        if not request.user.is_authenticated:
+            return None
+        return f"owned_data:sticky:{request.user.pk}"
+
+    def __get_owned_data_shard(self, request) -> Optional[str]:
+        """Get the shard database alias of the request, if it's pinned to an owner.
+
+        Returns:
+            Optional[str]: shard database alias, or None to scatter-gather.
+        """
+        if (
+            not self.owned_data_shards
+            or not self.owned_data_fields
+            or not self.owned_data_filter_by_fields
+            or self.owned_data_shared
+            or not request.user.is_authenticated
+        ):
+            return None
+
+        # Every "OR" sub query must be bound to the request user.
+        owned_data_fields = self.owned_data_fields
+        if isinstance(owned_data_fields[0], str):
+            owned_data_fields = [owned_data_fields]
+        if not all(
+            any("=" not in field_value for field_value in owned_data_field)
+            for owned_data_field in owned_data_fields
+        ):
+            return None
+        return get_owned_data_shard(request.user.pk, self.owned_data_shards)
+
+    def __is_owned_data_scattered(self) -> bool:
+        """Check if the request must scatter-gather across the shards."""
+        return (
+            bool(self.owned_data_shards)
+            and self.__owned_data_shard_database_token is None
+        )
+
+    def initial(self, request, *args, **kwargs):
+        """DRF built-in method.
+
+        Route the request to its owned_data_shards alias, and the reads of the request
+        to owned_data_read_database.
+        """
+        super().initial(request, *args, **kwargs)
+        if (shard := self.__get_owned_data_shard(request)) is not None:
+            self.__owned_data_shard_database_token = owned_data_shard_database.set(
+                (self.queryset.model, shard)
+            )
+
+        if self.owned_data_read_database is None or request.method not in SAFE_METHODS:
+            return
+
+        sticky_key = self.__get_owned_data_sticky_key(request)
+        if sticky_key and cache.get(sticky_key):
+            return
+        self.__owned_data_read_database_token = owned_data_read_database.set(
+            self.owned_data_read_database
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """DRF built-in method.
+
+        Reset the shard and read routing, and record the successful writes for stickiness.
+        """
+        if self.__owned_data_shard_database_token is not None:
+            owned_data_shard_database.reset(self.__owned_data_shard_database_token)
+            self.__owned_data_shard_database_token = None
+
+        if self.__owned_data_read_database_token is not None:
+            owned_data_read_database.reset(self.__owned_data_read_database_token)
+            self.__owned_data_read_database_token = None
+
+        if (
+            self.owned_data_read_database is not None
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            if sticky_key := self.__get_owned_data_sticky_key(request):
+                cache.set(sticky_key, True, self.owned_data_read_sticky_seconds)
+
+        return super().finalize_response(request, response, *args, **kwargs)
+
     def get_queryset(self) -> QuerySet:
         """DRF built-in method.
 
@@ -372,28 +1544,239 @@ class OwnedDataModelViewSet(viewsets.ModelViewSet):  # viewsets.GenericViewSet,
             QuerySet: filtered queryset.
         """
         queryset = super().get_queryset()
-        if not self.__invoke_owned_data():
+        if not self.invoke_owned_data():
             return queryset
 
-        # Filter database records.
-        return self.__filter_by_owned_data_fields(queryset)
+        # Filter database records, unless OwnedDataFilterBackend filters them.
+        if not any(
+            issubclass(filter_backend, OwnedDataFilterBackend)
+            for filter_backend in self.filter_backends
+        ):
+            queryset = self.__filter_by_owned_data_fields(queryset)
+
+        # Load nested relations by their own owned data rules.
+        queryset = self.__prefetch_owned_data_related(queryset)
+        return self.__select_owned_data_related(queryset)
+
+    def __export_owned_data_ndjson_rows(self, rows: Iterator[tuple]) -> Iterator[str]:
+        """Encode the export rows as NDJSON lines.
+
+        Args:
+            rows (Iterator[tuple]): rows of owned_data_export_fields values.
+
+        Returns:
+            Iterator[str]: JSON lines.
+        """
+        for row in rows:
+            yield json.dumps(
+                dict(zip(self.owned_data_export_fields, row)), cls=DjangoJSONEncoder
+            ) + "\n"
+
+    def __export_owned_data_csv_rows(self, rows: Iterator[tuple]) -> Iterator[str]:
+        """Encode the export rows as CSV lines, with a header line.
+
+        Args:
+            rows (Iterator[tuple]): rows of owned_data_export_fields values.
+
+        Returns:
+            Iterator[str]: CSV lines.
+        """
+        writer = csv.writer(_EchoBuffer())
+        yield writer.writerow(self.owned_data_export_fields)
+        for row in rows:
+            yield writer.writerow(row)
+
+    @action(detail=False, methods=["get"])
+    def export(self, request, *args, **kwargs):
+        """Stream the owned data records as NDJSON or CSV."""
+        if self.owned_data_export_fields is None:
+            raise NotFound
+
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        # Pin the databases, the response is streamed after the request routing.
+        if self.__is_owned_data_scattered():
+            databases = self.owned_data_shards
+        else:
+            databases = [queryset.db]
+        rows = chain.from_iterable(
+            queryset.using(database)
+            .values_list(*self.owned_data_export_fields)
+            .iterator(chunk_size=self.owned_data_export_chunk_size)
+            for database in databases
+        )
+
+        if request.query_params.get("export_format") == "csv":
+            return StreamingHttpResponse(
+                self.__export_owned_data_csv_rows(rows), content_type="text/csv"
+            )
+        return StreamingHttpResponse(
+            self.__export_owned_data_ndjson_rows(rows),
+            content_type="application/x-ndjson",
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        """DRF built-in method.
+
+        Make the owner fields read-only in the create and update serializers, and
+        create a list of records in bulk, if owned_data_inject_owner_fields is set.
+        """
+        if not self.owned_data_inject_owner_fields or self.action not in (
+            "create",
+            "update",
+            "partial_update",
+        ):
+            return super().get_serializer(*args, **kwargs)
+
+        if self.action == "create" and isinstance(kwargs.get("data"), list):
+            kwargs["many"] = True
+        serializer = super().get_serializer(*args, **kwargs)
+        owner_fields = self.__get_owned_data_injected_fields()
+        if isinstance(serializer, serializers.ListSerializer):
+            fields = serializer.child.fields
+        else:
+            fields = serializer.fields
+        for field in fields.values():
+            if field.source in owner_fields:
+                field.read_only = True
+        return serializer
+
+    def perform_create(self, serializer):
+        """DRF built-in method.
+
+        Save the owner fields by the request user, if owned_data_inject_owner_fields
+        is set.
+
+        Raises:
+            PermissionDenied: in case of an anonymous request user.
+        """
+        if not self.owned_data_inject_owner_fields:
+            return super().perform_create(serializer)
+
+        owner_fields = self.__get_owned_data_injected_fields()
+        if owner_fields and not self.request.user.is_authenticated:
+            raise PermissionDenied
+        serializer.save(**{field: self.request.user for field in owner_fields})
+
+    def get_object(self):
+        """DRF built-in method.
+
+        Look up the object on every shard, if the request isn't pinned to a shard.
+
+        Raises:
+            MultipleObjectsReturned: in case of the lookup matches on several shards,
+                since the primary keys must be unique across the shards.
+        """
+        if not self.__is_owned_data_scattered():
+            return super().get_object()
+
+        objects = []
+        for shard in self.owned_data_shards:
+            token = owned_data_shard_database.set((self.queryset.model, shard))
+            try:
+                objects.append(super().get_object())
+            except Http404:
+                continue
+            finally:
+                owned_data_shard_database.reset(token)
+        if not objects:
+            raise Http404
+        if len(objects) > 1:
+            raise MultipleObjectsReturned(
+                "%s %s is found on %d shards! the primary keys must be unique across "
+                "owned_data_shards"
+                % (self.queryset.model.__name__, objects[0].pk, len(objects))
+            )
+        return objects[0]
+
+    def list(self, request, *args, **kwargs):
+        """DRF built-in method.
+
+        Gather the records from all the shards, if the request isn't pinned to a shard.
+        """
+        if not self.__is_owned_data_scattered():
+            return super().list(request, *args, **kwargs)
+
+        records = _OwnedDataScatteredRecords(
+            self.filter_queryset(self.get_queryset()), self.owned_data_shards
+        )
+        page = self.paginate_queryset(records)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(records, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["get"])
+    def summary(self, request, *args, **kwargs):
+        """Serve the owned_data_summaries of the request user."""
+        if self.owned_data_summaries is None:
+            raise NotFound
+
+        self.invoke_owned_data()
+        if not request.user.is_authenticated:
+            raise PermissionDenied
+        summaries = get_owned_data_summaries(type(self), request.user)
+        return Response(
+            {name: summaries[name] for name in self.owned_data_summaries}
+        )
 
     def create(self, request, *args, **kwargs):
-        """Override the 'create' method to initialize owned data before action."""
-        self.__invoke_owned_data()
+        """Override the 'create' method to initialize owned data before action.
+
+        Raises:
+            PermissionDenied: in case of the request isn't pinned to a shard.
+        """
+        self.invoke_owned_data()
+        # Without an owner, the shard of the record is unknown.
+        if self.__is_owned_data_scattered():
+            raise PermissionDenied
         return super().create(request, *args, **kwargs)
 
     def update(self, request, *args, **kwargs):
         """Override the 'update' method to initialize owned data before action."""
-        self.__invoke_owned_data()
+        self.invoke_owned_data()
         return super().update(request, *args, **kwargs)
 
     def partial_update(self, request, *args, **kwargs):
-        """Override the 'partial_update' method to initialize owned data before action."""
-        self.__invoke_owned_data()
+        """Override the 'partial_update' method to initialize owned data before action.
+
+        With owned_data_fast_write, the response only contains the updated fields.
+        """
+        self.invoke_owned_data()
+        if self.__can_fast_write():
+            queryset = self.__get_owned_data_write_queryset()
+            serializer = self.get_serializer(data=request.data, partial=True)
+            if self.__can_fast_update(queryset.model, serializer):
+                serializer.is_valid(raise_exception=True)
+                concrete_fields = {f.name for f in queryset.model._meta.concrete_fields}
+                if concrete_fields.issuperset(serializer.validated_data):
+                    # An empty update affects no rows, so only check the ownership.
+                    if serializer.validated_data:
+                        found = queryset.update(**serializer.validated_data)
+                    else:
+                        found = queryset.exists()
+                    if not found:
+                        raise Http404
+                    # The object is not loaded, so only the updated fields are returned.
+                    return Response(
+                        {
+                            field.field_name: field.to_representation(
+                                serializer.validated_data[field.source]
+                            )
+                            for field in serializer.fields.values()
+                            if field.source in serializer.validated_data
+                        }
+                    )
         return super().partial_update(request, *args, **kwargs)
 
     def destroy(self, request, *args, **kwargs):
         """Override the 'destroy' method to initialize owned data before action."""
-        self.__invoke_owned_data()
+        self.invoke_owned_data()
+        if self.__can_fast_write():
+            queryset = self.__get_owned_data_write_queryset()
+            if self.__can_fast_destroy(queryset):
+                deleted, _ = queryset.delete()
+                if not deleted:
+                    raise Http404
+                return Response(status=status.HTTP_204_NO_CONTENT)
         return super().destroy(request, *args, **kwargs)
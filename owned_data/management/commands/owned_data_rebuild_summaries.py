@@ -0,0 +1,33 @@
+"""Owned Data summaries rebuild command."""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from owned_data.drf.summaries import rebuild_owned_data_summaries
+
+
+class Command(BaseCommand):
+    """Rebuild the per-owner summaries."""
+
+    help = "Rebuild the per-owner summaries, e.g. after QuerySet.update() or raw SQL writes."
+
+    def add_arguments(self, parser):
+        """Django built-in method."""
+        parser.add_argument(
+            "--model", help="model label, e.g. post.Post. Defaults to all the models."
+        )
+
+    def handle(self, *args, **options):
+        """Django built-in method."""
+        model = None
+        if options["model"]:
+            try:
+                model = apps.get_model(options["model"])
+            except (LookupError, ValueError) as model_not_found:
+                raise CommandError(str(model_not_found)) from model_not_found
+
+        try:
+            rebuilt = rebuild_owned_data_summaries(model)
+        except KeyError as summaries_not_found:
+            raise CommandError(
+                "%s has no owned_data_summaries!" % options["model"]
+            ) from summaries_not_found
+        self.stdout.write(f"summary rows: {rebuilt}")
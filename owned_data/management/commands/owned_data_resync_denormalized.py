@@ -0,0 +1,42 @@
+"""Owned Data denormalized fields resync command."""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from owned_data.drf.denormalization import _denormalized_fields, resync_owned_data_field
+
+
+class Command(BaseCommand):
+    """Re-sync the denormalized ownership fields."""
+
+    help = (
+        "Re-sync the denormalized ownership fields, e.g. after QuerySet.update() "
+        "or raw SQL writes."
+    )
+
+    def add_arguments(self, parser):
+        """Django built-in method."""
+        parser.add_argument(
+            "--model",
+            help="model label, e.g. comment.Comment. Defaults to all the models.",
+        )
+
+    def handle(self, *args, **options):
+        """Django built-in method."""
+        model = None
+        if options["model"]:
+            try:
+                model = apps.get_model(options["model"])
+            except (LookupError, ValueError) as model_not_found:
+                raise CommandError(str(model_not_found)) from model_not_found
+
+        fields = [
+            (field_model, path, field)
+            for (field_model, path), field in _denormalized_fields.items()
+            if model is None or field_model is model
+        ]
+        if model is not None and not fields:
+            raise CommandError(
+                "%s has no owned_data_denormalized_fields!" % options["model"]
+            )
+        for field_model, path, field in fields:
+            updated = resync_owned_data_field(field_model, path, field)
+            self.stdout.write(f"{field_model._meta.label}.{field} ({path}): {updated}")
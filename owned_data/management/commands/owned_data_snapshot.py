@@ -0,0 +1,31 @@
+"""Owned Data authorization snapshot command."""
+import time
+from django.core.management.base import BaseCommand
+from owned_data.drf.snapshot import write_owned_data_snapshot
+
+
+class Command(BaseCommand):
+    """Write the shared-memory authorization snapshot."""
+
+    help = "Write the authorization snapshot of the host, once or periodically."
+
+    def add_arguments(self, parser):
+        """Django built-in method."""
+        parser.add_argument(
+            "path", help="snapshot file path, e.g. /dev/shm/owned_data.snapshot."
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="seconds between the refreshes. Defaults to 0, which means once.",
+        )
+
+    def handle(self, *args, **options):
+        """Django built-in method."""
+        while True:
+            users = write_owned_data_snapshot(options["path"])
+            self.stdout.write(f"users: {users}")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,43 @@
+"""Owned Data ownership transfer command."""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from owned_data.drf.transfer import transfer_owned_data
+
+
+class Command(BaseCommand):
+    """Transfer the owned data of a user to another user."""
+
+    help = "Transfer the owned data of a user to another user, e.g. for offboarding."
+
+    def add_arguments(self, parser):
+        """Django built-in method."""
+        parser.add_argument("from_user", help="username of the current owner.")
+        parser.add_argument("to_user", help="username of the new owner.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--sleep", type=float, default=0, help="seconds between the batches."
+        )
+        parser.add_argument(
+            "--checkpoint", help="progress file path to resume an interrupted transfer."
+        )
+
+    def handle(self, *args, **options):
+        """Django built-in method."""
+        user_model = get_user_model()
+        try:
+            from_user = user_model._default_manager.get_by_natural_key(
+                options["from_user"]
+            )
+            to_user = user_model._default_manager.get_by_natural_key(options["to_user"])
+        except user_model.DoesNotExist as user_not_found:
+            raise CommandError(str(user_not_found)) from user_not_found
+
+        transferred = transfer_owned_data(
+            from_user,
+            to_user,
+            batch_size=options["batch_size"],
+            sleep=options["sleep"],
+            checkpoint=options["checkpoint"],
+        )
+        for column, count in transferred.items():
+            self.stdout.write(f"{column}: {count}")
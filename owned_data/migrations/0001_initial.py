@@ -0,0 +1,50 @@
+# Generated by Django 4.0.4 on 2026-10-19 00:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwnedDataShare',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('action', models.CharField(max_length=10)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='auth.group')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='owneddatashare',
+            index=models.Index(fields=['content_type', 'object_id', 'action', 'user'], name='owned_data_share_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='owneddatashare',
+            index=models.Index(fields=['content_type', 'object_id', 'action', 'group'], name='owned_data_share_group_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='owneddatashare',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('group__isnull', True), ('user__isnull', False)), models.Q(('group__isnull', False), ('user__isnull', True)), _connector='OR'), name='owned_data_share_user_or_group'),
+        ),
+        migrations.AddConstraint(
+            model_name='owneddatashare',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', False)), fields=('content_type', 'object_id', 'action', 'user'), name='owned_data_share_unique_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='owneddatashare',
+            constraint=models.UniqueConstraint(condition=models.Q(('group__isnull', False)), fields=('content_type', 'object_id', 'action', 'group'), name='owned_data_share_unique_group'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.0.4 on 2026-10-19 00:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('owned_data', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwnedDataSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('key', models.CharField(blank=True, max_length=100)),
+                ('value', models.BigIntegerField(default=0)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='owneddatasummary',
+            constraint=models.UniqueConstraint(fields=('content_type', 'name', 'owner', 'key'), name='owned_data_summary_unique'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.0.4 on 2026-10-19 00:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('owned_data', '0002_owneddatasummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwnedDataPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('viewset', models.CharField(max_length=255, unique=True)),
+                ('fields', models.JSONField(blank=True, null=True)),
+                ('collaborators', models.JSONField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'owned data policies',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.0.4 on 2026-10-19 00:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('owned_data', '0003_owneddatapolicy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwnedDataDecision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('viewset', models.CharField(max_length=255)),
+                ('action', models.CharField(max_length=50)),
+                ('allowed', models.BooleanField()),
+                ('collaborator', models.CharField(blank=True, max_length=255)),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.0.4 on 2026-10-19 02:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('owned_data', '0004_owneddatadecision'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='owneddatasummary',
+            name='owned_data_summary_unique',
+        ),
+        migrations.AddField(
+            model_name='owneddatasummary',
+            name='viewset',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddConstraint(
+            model_name='owneddatasummary',
+            constraint=models.UniqueConstraint(fields=('viewset', 'name', 'owner', 'key'), name='owned_data_summary_unique'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.4 on 2026-10-19 02:31
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('owned_data', '0005_owneddatasummary_viewset'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='owneddatashare',
+            name='owned_data_share_user_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='owneddatashare',
+            name='owned_data_share_group_idx',
+        ),
+    ]
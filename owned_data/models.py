@@ -0,0 +1,135 @@
+"""Owned Data models."""
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import models
+
+
+class OwnedDataShare(models.Model):
+    """Per-object sharing grant of an owned data record.
+
+    A grant lets a user or a group run an action (HTTP method, e.g. "get") on a
+    record of the viewsets with owned_data_shared = True.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True
+    )
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, null=True, blank=True)
+    action = models.CharField(max_length=10)
+
+    class Meta:
+        # The unique constraints index the grant lookups of the users and groups.
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(user__isnull=False, group__isnull=True)
+                | models.Q(user__isnull=True, group__isnull=False),
+                name="owned_data_share_user_or_group",
+            ),
+            models.UniqueConstraint(
+                fields=["content_type", "object_id", "action", "user"],
+                condition=models.Q(user__isnull=False),
+                name="owned_data_share_unique_user",
+            ),
+            models.UniqueConstraint(
+                fields=["content_type", "object_id", "action", "group"],
+                condition=models.Q(group__isnull=False),
+                name="owned_data_share_unique_group",
+            ),
+        ]
+
+    def __str__(self):
+        grantee = f"User: {self.user_id}" if self.user_id else f"Group: {self.group_id}"
+        return f"{grantee}, {self.action}: {self.content_type_id}/{self.object_id}"
+
+
+class OwnedDataSummary(models.Model):
+    """Per-owner aggregate of the owned data records.
+
+    The rows are updated incrementally by the save/delete signals of the models
+    of the viewsets with owned_data_summaries, and rebuilt by the
+    owned_data_rebuild_summaries command.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    # The dotted path of the viewset class, e.g. "post.views.PostViewSet".
+    viewset = models.CharField(max_length=255)
+    name = models.CharField(max_length=50)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # The group by value, or "" for the summaries without group by.
+    key = models.CharField(max_length=100, blank=True)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["viewset", "name", "owner", "key"],
+                name="owned_data_summary_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Owner: {self.owner_id}, {self.name}[{self.key}]: {self.value}"
+
+
+class OwnedDataPolicy(models.Model):
+    """Ownership policy of a viewset.
+
+    It overrides the owned_data_fields and owned_data_collaborators class
+    attributes of the viewsets with owned_data_policy = True. The collaborators
+    format is {HTTP method or action: collaborators}, merged over the class ones,
+    for example: {"delete": ["g:admin"], "publish": ["g:editor"]}
+    """
+
+    # The dotted path of the viewset class, e.g. "job.views.JobViewSet".
+    viewset = models.CharField(max_length=255, unique=True)
+    # None means the owned_data_fields of the class.
+    fields = models.JSONField(null=True, blank=True)
+    # None means the owned_data_collaborators of the class.
+    collaborators = models.JSONField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "owned data policies"
+
+    def clean(self):
+        """Validate the policy format."""
+        from owned_data.drf.policies import compile_owned_data_policy
+
+        try:
+            compile_owned_data_policy(self.fields, self.collaborators)
+        except ValueError as invalid_policy:
+            raise ValidationError(str(invalid_policy)) from invalid_policy
+
+    def __str__(self):
+        return self.viewset
+
+
+class OwnedDataDecision(models.Model):
+    """Audit record of an owned_data_collaborators decision.
+
+    The records are written in batches by owned_data.drf.audit.OwnedDataAuditLog.
+    """
+
+    created_at = models.DateTimeField(db_index=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_constraint=False,
+    )
+    # The dotted path of the viewset class.
+    viewset = models.CharField(max_length=255)
+    # The viewset action, or the HTTP method in generic views.
+    action = models.CharField(max_length=50)
+    allowed = models.BooleanField()
+    # The matched collaborators, or the collaborator which denied the user.
+    collaborator = models.CharField(max_length=255, blank=True)
+
+    def __str__(self):
+        outcome = "allow" if self.allowed else "deny"
+        return f"User: {self.user_id}, {self.viewset}.{self.action}: {outcome}"
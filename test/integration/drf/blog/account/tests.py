@@ -1,3 +1,118 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from comment.models import Comment
+from comment.views import PostCommentViewSet
+from owned_data.drf import (
+    OwnedDataChangeFeed,
+    OwnedDataInMemoryTransport,
+    owned_data_acl_index,
+    owned_data_transferred,
+    transfer_owned_data,
+)
+from post.models import Note, Post
 
-# Create your tests here.
+
+class TestOwnedDataTransfer(APITestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="user1")
+        self.new_user = User.objects.create(username="user2")
+        self.other_user = User.objects.create(username="user3")
+        for i in range(3):
+            post = Post.objects.create(title=f"post {i}", body="content", author=self.user)
+            Comment.objects.create(body="comment", user=self.user, post=post)
+        other_post = Post.objects.create(
+            title="post", body="content", author=self.other_user
+        )
+        Comment.objects.create(body="comment", user=self.other_user, post=other_post)
+
+    def test_transfer_in_batches(self):
+        received = []
+        owned_data_transferred.connect(
+            lambda **kwargs: received.append(kwargs), weak=False, dispatch_uid="test"
+        )
+        try:
+            transferred = transfer_owned_data(self.user, self.new_user, batch_size=2)
+        finally:
+            owned_data_transferred.disconnect(dispatch_uid="test")
+
+        self.assertEqual(
+            transferred,
+            {
+                "comment.Comment.owned_data_owner": 3,
+                "comment.Comment.user": 3,
+                "post.Note.author": 0,
+                "post.Post.author": 3,
+            },
+        )
+        self.assertEqual(Post.objects.filter(author=self.new_user).count(), 3)
+        self.assertEqual(Comment.objects.filter(user=self.new_user).count(), 3)
+        self.assertEqual(
+            Comment.objects.filter(owned_data_owner=self.new_user).count(), 3
+        )
+        self.assertEqual(Post.objects.filter(author=self.other_user).count(), 1)
+        self.assertEqual(received[0]["from_user"], self.user)
+        self.assertEqual(received[0]["to_user"], self.new_user)
+        self.assertEqual(received[0]["models"], [Comment, Note, Post])
+
+    def test_transfer_to_same_user_is_noop(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(transfer_owned_data(self.user, self.user), {})
+        self.assertEqual(Post.objects.filter(author=self.user).count(), 3)
+
+    def test_transfer_invalidates_caches(self):
+        owned_data_acl_index.get_user_masks(self.user)
+        owned_data_acl_index.get_user_masks(self.new_user)
+        transport = OwnedDataInMemoryTransport()
+        feed = OwnedDataChangeFeed(PostCommentViewSet, transport)
+        subscribers = [("a", self.user), ("b", self.new_user), ("c", self.other_user)]
+        for subscriber, user in subscribers:
+            request = Request(APIRequestFactory().get("/"))
+            request.user = user
+            feed.subscribe(subscriber, request)
+
+        feed.connect()
+        try:
+            transfer_owned_data(self.user, self.new_user)
+        finally:
+            feed.disconnect()
+
+        self.assertNotIn(self.user.pk, owned_data_acl_index._user_masks)
+        self.assertNotIn(self.new_user.pk, owned_data_acl_index._user_masks)
+        message = {"event": "transferred", "model": "comment.Comment"}
+        self.assertEqual(transport.messages["a"], [message])
+        self.assertEqual(transport.messages["b"], [message])
+        self.assertNotIn("c", transport.messages)
+
+    def test_command_resumes_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, "transfer.json")
+            with open(checkpoint, "w") as f:
+                json.dump(
+                    {
+                        "users": [self.user.id, self.new_user.id],
+                        "transferred": {"comment.Comment.owned_data_owner": 3},
+                    },
+                    f,
+                )
+            Comment.objects.filter(user=self.user).update(owned_data_owner=self.new_user)
+
+            stdout = io.StringIO()
+            call_command(
+                "owned_data_transfer",
+                "user1",
+                "user2",
+                "--batch-size=2",
+                f"--checkpoint={checkpoint}",
+                stdout=stdout,
+            )
+            self.assertFalse(os.path.exists(checkpoint))
+            self.assertIn("post.Post.author: 3", stdout.getvalue())
+
+        self.assertFalse(Post.objects.filter(author=self.user).exists())
+        self.assertFalse(Comment.objects.filter(user=self.user).exists())
@@ -82,9 +82,26 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+    },
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.replica.sqlite3",
+    },
+    "shard_0": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.shard_0.sqlite3",
+    },
+    "shard_1": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.shard_1.sqlite3",
+    },
 }
 
+DATABASE_ROUTERS = [
+    "owned_data.drf.routers.OwnedDataShardRouter",
+    "owned_data.drf.routers.OwnedDataReadReplicaRouter",
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -34,3 +34,11 @@ class BaseAPITestCase(APITestCase):
     def logout(self):
         self.client.get(reverse("logout"))
         self.client.credentials()
+
+
+class BaseOwnersAPITestCase(BaseAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="user1")
+        cls.other_user = User.objects.create(username="user2")
@@ -5,6 +5,7 @@ from account.views import LoginView, LogoutView, RegisterView
 
 urlpatterns = [
     path("posts/", include(("post.urls", "post"))),
+    path("comments/", include(("comment.urls", "comment"))),
     path("register/", RegisterView.as_view(), name="register"),
     path("login/", LoginView.as_view(), name="login"),
     path("logout/", LogoutView.as_view(), name="logout"),
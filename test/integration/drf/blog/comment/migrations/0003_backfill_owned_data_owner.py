@@ -0,0 +1,24 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_owned_data_owner(apps, schema_editor):
+    Comment = apps.get_model("comment", "Comment")
+    Post = apps.get_model("post", "Post")
+    Comment.objects.using(schema_editor.connection.alias).update(
+        owned_data_owner=Subquery(
+            Post.objects.filter(pk=OuterRef("post")).values("author")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0001_initial'),
+        ('comment', '0002_owned_data_owner'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_owned_data_owner, migrations.RunPython.noop),
+    ]
@@ -7,6 +7,14 @@ class Comment(models.Model):
     body = models.TextField()
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
+    # Denormalized "post__author", maintained by owned-data.
+    owned_data_owner = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        editable=False,
+        related_name="+",
+    )
 
     def __str__(self):
         return f"User: {self.user.id}, Comment: {self.id}, Post: {self.post.id}"
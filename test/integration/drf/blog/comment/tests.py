@@ -1,8 +1,373 @@
-from rest_framework.test import APITestCase
+import io
+import json
+from unittest import mock
+from rest_framework import status
+from rest_framework.reverse import reverse
+from django.contrib.auth.models import Group, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from owned_data.drf.testing import (
+    OwnedDataFakeUser,
+    OwnedDataPolicyHarness,
+    assert_owned_data_query_budgets,
+)
+from owned_data.drf import (
+    CollaborateType,
+    OwnedDataChangeFeed,
+    OwnedDataInMemoryTransport,
+    OwnedDataQueryTracker,
+    grant_owned_data,
+    owned_data_check_many,
+    resync_owned_data_field,
+    revoke_owned_data,
+)
+from owned_data.models import OwnedDataShare
+from blog.test import BaseAPITestCase, BaseOwnersAPITestCase
+from comment.models import Comment
+from comment.views import CommentViewSet, PostCommentViewSet
+from post.models import Post
 
 
-class PostTest(APITestCase):
-    pass
+class BaseCommentAPITestCase(BaseOwnersAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        post = Post.objects.create(title="post", body="content", author=cls.user)
+        cls.comment = Comment.objects.create(body="mine", user=cls.user, post=post)
+        cls.other_comment = Comment.objects.create(
+            body="not mine", user=cls.other_user, post=post
+        )
+
+    def setUp(self) -> None:
+        super().setUp()
+        # Warm the content types cache of the shared comments filter.
+        ContentType.objects.get_for_model(Comment)
+        self.client.force_authenticate(self.user)
+
+
+class TestCommentWrites(BaseCommentAPITestCase):
+    def test_destroy_in_single_statement(self):
+        with self.assertNumQueries(1):
+            response = self.client.delete(
+                reverse("comment:comment-detail", args=[self.comment.id])
+            )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Comment.objects.filter(id=self.comment.id).exists())
+
+        response = self.client.delete(
+            reverse("comment:comment-detail", args=[self.other_comment.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(Comment.objects.filter(id=self.other_comment.id).exists())
+
+    def test_create_injects_owner_fields(self):
+        # The post validation and the insert, without a user validation query.
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                reverse("comment:comment-list"),
+                {"body": "new", "user": self.other_user.id, "post": self.comment.post_id},
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["user"], self.user.id)
+
+        response = self.client.post(
+            reverse("comment:comment-list"),
+            [
+                {"body": "first", "post": self.comment.post_id},
+                {"body": "second", "post": self.comment.post_id},
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            list(
+                Comment.objects.filter(body__in=["first", "second"]).values_list(
+                    "body", "user"
+                )
+            ),
+            [("first", self.user.id), ("second", self.user.id)],
+        )
+
+        # The owner isn't changed by the updates.
+        response = self.client.patch(
+            reverse("comment:comment-detail", args=[self.comment.id]),
+            {"user": self.other_user.id},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Comment.objects.get(id=self.comment.id).user, self.user)
+
+    def test_partial_update_falls_back_with_signals(self):
+        # The owned_data_owner denormalization needs the loaded instance.
+        response = self.client.patch(
+            reverse("comment:comment-detail", args=[self.comment.id]),
+            {"body": "edited"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["id"], self.comment.id)
+        self.assertEqual(Comment.objects.get(id=self.comment.id).body, "edited")
+
+        response = self.client.patch(
+            reverse("comment:comment-detail", args=[self.other_comment.id]),
+            {"body": "edited"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Comment.objects.get(id=self.other_comment.id).body, "not mine")
+
+
+class TestCommentExport(BaseCommentAPITestCase):
+    def test_export_ndjson(self):
+        response = self.client.get(reverse("comment:comment-export"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            [json.loads(line) for line in b"".join(response.streaming_content).splitlines()],
+            [{"id": self.comment.id, "body": "mine", "post": self.comment.post_id}],
+        )
+
+    def test_export_csv(self):
+        response = self.client.get(
+            reverse("comment:comment-export"), {"export_format": "csv"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(
+            b"".join(response.streaming_content).decode().splitlines(),
+            ["id,body,post", f"{self.comment.id},mine,{self.comment.post_id}"],
+        )
+
+
+class TestCommentChecks(BaseCommentAPITestCase):
+    def test_check_many(self):
+        comments = [self.other_comment, self.comment]
+        # A single query, regardless of the number of objects.
+        with self.assertNumQueries(1):
+            allowed = owned_data_check_many(
+                CommentViewSet, self.user, "destroy", comments
+            )
+        self.assertEqual(allowed, [self.comment])
+
+        pks = [self.comment.pk, self.other_comment.pk, 0]
+        allowed = owned_data_check_many(
+            CommentViewSet, self.other_user, CollaborateType.GET, pks
+        )
+        self.assertEqual(allowed, [self.other_comment.pk])
+
+    def test_query_budgets(self):
+        assert_owned_data_query_budgets(self.user)
+
+        # The shared comments filter looks up the content type, once it's not cached.
+        ContentType.objects.clear_cache()
+        with mock.patch.object(CommentViewSet, "owned_data_query_budget", {"list": 0}):
+            with self.assertRaisesMessage(
+                AssertionError,
+                "comment.views.CommentViewSet list ran 1 owned data queries, "
+                "over the budget of 0:\nSELECT",
+            ):
+                assert_owned_data_query_budgets(self.user, [CommentViewSet])
+
+            # Out of DEBUG mode and tests, it's a sampled warning.
+            ContentType.objects.clear_cache()
+            with mock.patch.object(
+                OwnedDataQueryTracker, "strict", False
+            ), mock.patch.object(
+                OwnedDataQueryTracker, "sample_rate", 1
+            ), self.assertLogs(
+                "owned_data.drf.budgets", "WARNING"
+            ):
+                response = self.client.get(reverse("comment:comment-list"))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TestCommentSharing(BaseCommentAPITestCase):
+    def test_shared_comments(self):
+        grant_owned_data([self.other_comment], users=[self.user])
+        response = self.client.get(reverse("comment:comment-list"))
+        self.assertEqual([c["body"] for c in response.json()], ["mine", "not mine"])
+
+        # Only the shared actions.
+        response = self.client.patch(
+            reverse("comment:comment-detail", args=[self.other_comment.id]),
+            {"body": "edited"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        revoke_owned_data([self.other_comment], users=[self.user])
+        response = self.client.get(reverse("comment:comment-list"))
+        self.assertEqual([c["body"] for c in response.json()], ["mine"])
+
+    def test_revoke_records_of_several_models(self):
+        post = self.other_comment.post
+        grant_owned_data([post, self.other_comment], users=[self.user])
+        self.assertEqual(OwnedDataShare.objects.count(), 2)
+        # The grants are deleted by the content type of each record.
+        deleted = revoke_owned_data([post, self.other_comment], users=[self.user])
+        self.assertEqual(deleted, 2)
+        self.assertFalse(OwnedDataShare.objects.exists())
+
+    def test_shared_comments_by_group(self):
+        editor = Group.objects.get(name="editor")
+        self.user.groups.add(editor)
+        grant_owned_data(
+            Comment.objects.filter(user=self.other_user),
+            groups=[editor],
+            actions=[CollaborateType.GET, CollaborateType.PATCH],
+        )
+        response = self.client.patch(
+            reverse("comment:comment-detail", args=[self.other_comment.id]),
+            {"body": "edited"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Comment.objects.get(id=self.other_comment.id).body, "edited")
+
+
+class TestPostComment(BaseOwnersAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.post = Post.objects.create(title="post", body="content", author=cls.user)
+        cls.other_post = Post.objects.create(
+            title="post", body="content", author=cls.other_user
+        )
+        Comment.objects.create(body="on my post", user=cls.other_user, post=cls.post)
+        Comment.objects.create(body="on other post", user=cls.user, post=cls.other_post)
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def test_filter_by_denormalized_owner(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("comment:post_comment-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([c["body"] for c in response.json()], ["on my post"])
+        self.assertNotIn("JOIN", queries[0]["sql"])
+
+    def test_resync_on_intermediate_change(self):
+        self.post.author = self.other_user
+        self.post.save()
+        self.assertEqual(
+            list(Comment.objects.values_list("owned_data_owner", flat=True)),
+            [self.other_user.id, self.other_user.id],
+        )
+
+        Post.objects.update(author=self.user)
+        resync_owned_data_field(Comment, "post__author", "owned_data_owner")
+        self.assertEqual(
+            list(Comment.objects.values_list("owned_data_owner", flat=True)),
+            [self.user.id, self.user.id],
+        )
+
+        Post.objects.update(author=self.other_user)
+        stdout = io.StringIO()
+        call_command(
+            "owned_data_resync_denormalized", "--model=comment.Comment", stdout=stdout
+        )
+        self.assertEqual(
+            stdout.getvalue(), "comment.Comment.owned_data_owner (post__author): 2\n"
+        )
+        self.assertEqual(
+            list(Comment.objects.values_list("owned_data_owner", flat=True)),
+            [self.other_user.id, self.other_user.id],
+        )
+        with self.assertRaisesMessage(
+            CommandError, "post.Post has no owned_data_denormalized_fields!"
+        ):
+            call_command("owned_data_resync_denormalized", "--model=post.Post")
+
+    def test_change_feed_fan_out(self):
+        transport = OwnedDataInMemoryTransport()
+        feed = OwnedDataChangeFeed(PostCommentViewSet, transport)
+        for subscriber, user in [("a", self.user), ("b", self.other_user)]:
+            request = Request(APIRequestFactory().get("/"))
+            request.user = user
+            feed.subscribe(subscriber, request)
+
+        # Recipients are resolved in memory by the denormalized owner.
+        comment = Comment.objects.get(post=self.post)
+        with self.assertNumQueries(0):
+            self.assertEqual(feed.get_recipients(comment), {"a"})
+
+        feed.connect()
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                comment.body = "edited"
+                comment.save()
+                # Sent once the transaction commits.
+                self.assertEqual(transport.messages, {})
+
+            # The previous owner is notified of an owner reassignment.
+            with self.captureOnCommitCallbacks(execute=True):
+                comment.post = self.other_post
+                comment.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                comment_id = comment.pk
+                comment.delete()
+        finally:
+            feed.disconnect()
+
+        message = {"model": "comment.Comment", "pk": comment_id}
+        self.assertEqual(
+            transport.messages["a"],
+            [{"event": "updated", **message}, {"event": "deleted", **message}],
+        )
+        self.assertEqual(
+            transport.messages["b"],
+            [{"event": "updated", **message}, {"event": "deleted", **message}],
+        )
+
+        feed.unsubscribe("b")
+        self.assertEqual(feed.get_recipients(comment), set())
+
+    def test_policy_harness_matches_sql(self):
+        comments = list(Comment.objects.select_related("post"))
+        harness = OwnedDataPolicyHarness(
+            PostCommentViewSet, OwnedDataFakeUser(self.user.pk), verify=True
+        )
+        allowed = harness.filter("list", comments)
+        self.assertEqual(allowed, [c for c in comments if c.post == self.post])
+
+
+class TestCommentReadReplica(BaseAPITestCase):
+    databases = {"default", "replica"}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="user1")
+        cls.post = Post.objects.create(title="post", body="content", author=cls.user)
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    @mock.patch.object(CommentViewSet, "owned_data_read_database", "replica")
+    def test_read_your_writes(self):
+        # The replica is not replicated in tests, so reads from it are empty.
+        Comment.objects.create(body="old", user=self.user, post=self.post)
+        response = self.client.get(reverse("comment:comment-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [])
+
+        # Right after a write, the user reads from the primary.
+        response = self.client.post(
+            reverse("comment:comment-list"),
+            {"body": "new", "user": self.user.id, "post": self.post.id},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.get(reverse("comment:comment-list"))
+        self.assertEqual([c["body"] for c in response.json()], ["old", "new"])
+
+        # Once the stickiness expires, reads go back to the replica.
+        cache.clear()
+        response = self.client.get(reverse("comment:comment-list"))
+        self.assertEqual(response.json(), [])
+
 
 # Defined:
 # 2 posts from User A and User B.
@@ -42,4 +407,3 @@ class PostTest(APITestCase):
 # 4.3 Should be able to edit both posts.
 # 4.4 Should be able to delete both posts.
 # 4.5 Logout.
-
@@ -0,0 +1,13 @@
+from django.urls import path, include
+
+from rest_framework import routers
+
+from comment.views import CommentViewSet, PostCommentViewSet
+
+router = routers.DefaultRouter()
+router.register("me/comments", CommentViewSet, basename="comment")
+router.register("me/posts/comments", PostCommentViewSet, basename="post_comment")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -1,11 +1,31 @@
 from rest_framework import viewsets
-from owned_data.views import CollaborateType, OwnedDataViewSet
-from .models import Post, Comment
-from .serializers import PostSerializer, CommentSerializer
+from owned_data.drf import CollaborateType, OwnedDataModelViewSet
+from .models import Comment
+from .serializers import CommentSerializer
 
 
+class CommentViewSet(OwnedDataModelViewSet, viewsets.ModelViewSet):
 
-class CommentViewSet(viewsets.ModelViewSet):
+    serializer_class = CommentSerializer
+    queryset = Comment.objects.all()
+
+    # owned-data attributes
+    owned_data_fields = ["user"]
+    owned_data_collaborators = {
+        CollaborateType.GET: ["*"],
+    }
+    owned_data_fast_write = True
+    owned_data_inject_owner_fields = True
+    owned_data_export_fields = ["id", "body", "post"]
+    owned_data_shared = True
+    owned_data_query_budget = {"list": 1, "retrieve": 1, "partial_update": 1}
+
+
+class PostCommentViewSet(OwnedDataModelViewSet, viewsets.ModelViewSet):
 
     serializer_class = CommentSerializer
     queryset = Comment.objects.all()
+
+    # owned-data attributes
+    owned_data_fields = ["post__author"]
+    owned_data_denormalized_fields = {"post__author": "owned_data_owner"}
@@ -1,3 +1,12 @@
 from django.contrib import admin
+from owned_data.drf.admin import OwnedDataModelAdmin
+from .models import Post
 
-# Register your models here.
+
+@admin.register(Post)
+class PostAdmin(OwnedDataModelAdmin, admin.ModelAdmin):
+
+    list_display = ["title", "author", "is_draft"]
+
+    # owned-data attributes
+    owned_data_viewset = "post.views.AdminPostViewSet"
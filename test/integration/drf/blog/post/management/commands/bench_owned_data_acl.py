@@ -0,0 +1,73 @@
+"""Compare the collaborator validation of the ORM and the bitmask principal sources."""
+import time
+from typing import List
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+from owned_data.drf import (
+    CollaborateType,
+    OwnedDataBitmaskPrincipalSource,
+    OwnedDataORMPrincipalSource,
+)
+from post.views import AdminPostViewSet
+
+
+class Command(BaseCommand):
+    """Benchmark the g: collaborator validation per principal source."""
+
+    help = "Compare the ORM and the bitmask principal sources on g: collaborators."
+
+    def add_arguments(self, parser):
+        """Django built-in method."""
+        parser.add_argument("--iterations", type=int, default=1000)
+        parser.add_argument("--groups", type=int, default=20, help="groups of the user.")
+        parser.add_argument(
+            "--collaborators", type=int, default=3, help="g: collaborators per method."
+        )
+
+    def handle(self, *args, **options):
+        """Django built-in method."""
+        # Everything is rolled back at the end.
+        with transaction.atomic():
+            user = User.objects.create(username="bench-owned-data-acl")
+            groups = [
+                Group.objects.create(name=f"bench-owned-data-acl-{i}")
+                for i in range(options["groups"])
+            ]
+            user.groups.add(*groups)
+            collaborators = [
+                f"g:{group.name}" for group in groups[: options["collaborators"]]
+            ]
+
+            for source in (OwnedDataORMPrincipalSource, OwnedDataBitmaskPrincipalSource):
+                self.bench(source, collaborators, user, options["iterations"])
+
+            transaction.set_rollback(True)
+
+    def bench(self, source, collaborators: List[str], user, iterations: int):
+        """Time the collaborator validation of the principal source."""
+        http_request = APIRequestFactory().get("/")
+        force_authenticate(http_request, user)
+        # The attributes are set on the instance, since a subclass would register
+        # itself, e.g. in get_owned_data_viewsets() and the summaries.
+        viewset = AdminPostViewSet(action="list", format_kwarg=None, args=(), kwargs={})
+        viewset.owned_data_principal_source_class = source
+        viewset.owned_data_collaborators = {CollaborateType.GET: collaborators}
+        # A request per check, since the group names and the decision are memoized
+        # per request.
+        requests = [Request(http_request) for _ in range(iterations)]
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for request in requests:
+                viewset.request = request
+                viewset.check_owned_data_collaborators()
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{source.__name__:<36}{elapsed / iterations * 1_000_000:>10.1f} us/check"
+            f"{len(queries) / iterations:>8.2f} queries/check"
+        )
@@ -0,0 +1,172 @@
+"""Replay a mixed owned data traffic against the blog endpoints."""
+import logging
+import random
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from post.models import Post
+
+
+def percentile(values: List[float], percent: int) -> float:
+    """Get the nearest-rank percentile of the values."""
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, round(percent / 100 * len(values)) - 1))]
+
+
+class Command(BaseCommand):
+    """Replay list/retrieve/write requests and report latency and queries."""
+
+    help = "Replay mixed list/retrieve/write traffic against me/managed and posts."
+
+    def add_arguments(self, parser):
+        """Django built-in method."""
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument(
+            "--mix",
+            default="list_mine=30,list=30,retrieve=30,create=10",
+            help="operation weights.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--min-success-rate",
+            type=float,
+            default=0.95,
+            help="minimum rate of the 2xx responses, e.g. not 403s. Defaults to 0.95.",
+        )
+
+    def handle(self, *args, **options):
+        """Django built-in method."""
+        mix = dict(item.split("=") for item in options["mix"].split(","))
+        operations, weights = list(mix), [float(weight) for weight in mix.values()]
+        user_ids = list(
+            User.objects.filter(username__startswith="seed-user-").values_list(
+                "id", flat=True
+            )
+        )
+        # Public posts to retrieve, by their authors.
+        posts_by_author: Dict[int, List[int]] = defaultdict(list)
+        for post_id, author_id in Post.objects.filter(is_draft=False).values_list(
+            "id", "author_id"
+        )[:100_000]:
+            posts_by_author[author_id].append(post_id)
+
+        # Keep the expected 403/404 responses out of the output.
+        logging.getLogger("django.request").setLevel(logging.ERROR)
+        results: Dict[str, List[tuple]] = defaultdict(list)
+        lock = threading.Lock()
+
+        def worker(worker_id: int, count: int):
+            rand = random.Random(options["seed"] + worker_id)
+            client = APIClient(HTTP_HOST="localhost")
+            users = {}
+            try:
+                for _ in range(count):
+                    operation = rand.choices(operations, weights=weights)[0]
+                    if operation == "retrieve" and posts_by_author:
+                        user_id = rand.choice(list(posts_by_author))
+                    else:
+                        user_id = rand.choice(user_ids)
+                    if user_id not in users:
+                        users[user_id] = User.objects.get(id=user_id)
+                    client.force_authenticate(users[user_id])
+
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        response = self.request(
+                            client, operation, rand, posts_by_author.get(user_id)
+                        )
+                        elapsed = time.perf_counter() - started
+                    with lock:
+                        results[operation].append(
+                            (elapsed, len(queries), response.status_code)
+                        )
+            finally:
+                connection.close()
+
+        threads = options["threads"]
+        counts = [options["requests"] // threads] * threads
+        counts[0] += options["requests"] % threads
+        started = time.perf_counter()
+        if threads == 1:
+            worker(0, counts[0])
+        else:
+            workers = [
+                threading.Thread(target=worker, args=(i, count))
+                for i, count in enumerate(counts)
+            ]
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+        elapsed = time.perf_counter() - started
+
+        success_rate = self.report(results, elapsed)
+        if success_rate < options["min_success_rate"]:
+            raise CommandError(
+                "2xx rate %.3f is below %.3f! the requests don't measure the owned data "
+                "reads and writes" % (success_rate, options["min_success_rate"])
+            )
+
+    def request(
+        self,
+        client: APIClient,
+        operation: str,
+        rand: random.Random,
+        post_ids: Optional[List[int]],
+    ):
+        """Send a request of the operation."""
+        # The owner filtered endpoints which every seeded user can read and write.
+        if operation == "list_mine":
+            return client.get(reverse("post:managed_post-list"))
+        elif operation == "list":
+            return client.get(reverse("post:post-list"))
+        elif operation == "retrieve":
+            post_id = rand.choice(post_ids) if post_ids else 0
+            return client.get(reverse("post:post-detail", args=[post_id]))
+        elif operation == "create":
+            return client.post(
+                reverse("post:managed_post-list"),
+                {"title": "load test", "body": "content", "is_draft": True},
+            )
+        raise ValueError("invalid operation: %s" % operation)
+
+    def report(self, results: Dict[str, List[tuple]], elapsed: float) -> float:
+        """Write the latency, throughput and queries per request report.
+
+        Returns:
+            float: rate of the 2xx responses.
+        """
+        total = sum(len(samples) for samples in results.values())
+        succeeded = sum(
+            200 <= sample[2] < 300 for samples in results.values() for sample in samples
+        )
+        success_rate = succeeded / total if total else 0
+        self.stdout.write(
+            f"requests: {total}, seconds: {elapsed:.2f}, throughput: {total / elapsed:.1f} req/s"
+            f", 2xx: {success_rate:.1%}"
+        )
+        self.stdout.write(
+            f"{'operation':<12}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+            f"{'queries':>10}  statuses"
+        )
+        for operation, samples in sorted(results.items()):
+            latencies = [sample[0] * 1000 for sample in samples]
+            statuses = Counter(sample[2] for sample in samples)
+            self.stdout.write(
+                f"{operation:<12}{len(samples):>8}"
+                f"{percentile(latencies, 50):>10.2f}"
+                f"{percentile(latencies, 95):>10.2f}"
+                f"{percentile(latencies, 99):>10.2f}"
+                f"{statistics.mean(sample[1] for sample in samples):>10.2f}"
+                f"  {dict(statuses)}"
+            )
+        return success_rate
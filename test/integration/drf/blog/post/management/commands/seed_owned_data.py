@@ -0,0 +1,107 @@
+"""Seed the blog database with a large owned data set for load tests."""
+import random
+from itertools import accumulate
+from typing import List
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand
+from comment.models import Comment
+from owned_data.drf import resync_owned_data_field
+from post.models import Post
+
+
+def skewed_weights(size: int, skew: float) -> List[float]:
+    """Cumulative Zipf-like weights, so a few owners own most of the records."""
+    return list(accumulate(1 / (rank**skew) for rank in range(1, size + 1)))
+
+
+class Command(BaseCommand):
+    """Seed users, groups, posts and comments with a skewed ownership."""
+
+    help = "Seed users, groups, posts and comments with a skewed ownership distribution."
+
+    def add_arguments(self, parser):
+        """Django built-in method."""
+        parser.add_argument("--users", type=int, default=5000)
+        parser.add_argument("--groups", type=int, default=50)
+        parser.add_argument("--posts", type=int, default=1_000_000)
+        parser.add_argument("--comments", type=int, default=2_000_000)
+        parser.add_argument("--editors", type=float, default=0.05, help="ratio of editors.")
+        parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        """Django built-in method."""
+        rand = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+
+        # Users.
+        password = make_password(None)
+        first_user = User.objects.count()
+        for start in range(0, options["users"], batch_size):
+            User.objects.bulk_create(
+                User(username=f"seed-user-{first_user + i}", password=password)
+                for i in range(start, min(start + batch_size, options["users"]))
+            )
+        user_ids = list(
+            User.objects.filter(username__startswith="seed-user-")
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        rand.shuffle(user_ids)
+        user_weights = skewed_weights(len(user_ids), options["skew"])
+        self.stdout.write(f"users: {len(user_ids)}")
+
+        # Groups of varying size, plus the editors.
+        editor, _ = Group.objects.get_or_create(name="editor")
+        groups = [editor] + [
+            Group.objects.get_or_create(name=f"seed-group-{i}")[0]
+            for i in range(options["groups"])
+        ]
+        memberships = []
+        for group in groups:
+            ratio = options["editors"] if group == editor else rand.paretovariate(1) / 100
+            size = min(len(user_ids), max(1, int(len(user_ids) * ratio)))
+            memberships.extend(
+                User.groups.through(user_id=user_id, group_id=group.id)
+                for user_id in rand.sample(user_ids, size)
+            )
+        User.groups.through.objects.bulk_create(
+            memberships, batch_size=batch_size, ignore_conflicts=True
+        )
+        self.stdout.write(f"groups: {len(groups)}, memberships: {len(memberships)}")
+
+        # Posts.
+        for start in range(0, options["posts"], batch_size):
+            size = min(batch_size, options["posts"] - start)
+            Post.objects.bulk_create(
+                Post(
+                    title=f"post {start + i}",
+                    body="content",
+                    author_id=author_id,
+                    is_draft=rand.random() < 0.3,
+                )
+                for i, author_id in enumerate(
+                    rand.choices(user_ids, cum_weights=user_weights, k=size)
+                )
+            )
+        post_ids = list(Post.objects.order_by("id").values_list("id", flat=True))
+        rand.shuffle(post_ids)
+        post_weights = skewed_weights(len(post_ids), options["skew"])
+        self.stdout.write(f"posts: {len(post_ids)}")
+
+        # Comments, on the popular posts mostly.
+        if post_ids:
+            for start in range(0, options["comments"], batch_size):
+                size = min(batch_size, options["comments"] - start)
+                Comment.objects.bulk_create(
+                    Comment(body="comment", user_id=user_id, post_id=post_id)
+                    for user_id, post_id in zip(
+                        rand.choices(user_ids, cum_weights=user_weights, k=size),
+                        rand.choices(post_ids, cum_weights=post_weights, k=size),
+                    )
+                )
+            # bulk_create doesn't send signals.
+            resync_owned_data_field(Comment, "post__author", "owned_data_owner")
+        self.stdout.write(f"comments: {Comment.objects.count()}")
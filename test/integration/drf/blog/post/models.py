@@ -10,3 +10,12 @@ class Post(models.Model):
 
     def __str__(self):
         return f"User: {self.author.id}, Post: {self.title}"
+
+
+class Note(models.Model):
+    body = models.TextField()
+    author = models.ForeignKey(User, on_delete=models.CASCADE)
+    is_pinned = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"User: {self.author.id}, Note: {self.id}"
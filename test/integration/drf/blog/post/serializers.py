@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Post
+from .models import Note, Post
 from comment.serializers import CommentSerializer
 
 
@@ -17,3 +17,23 @@ class PostSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         attrs["author"] = self.context["request"].user
         return super().validate(attrs)
+
+
+class PublicPostSerializer(PostSerializer):
+
+    comments = CommentSerializer(many=True, read_only=True)
+
+    class Meta(PostSerializer.Meta):
+        fields = PostSerializer.Meta.fields + ("comments",)
+
+
+class NoteSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Note
+        fields = (
+            "id",
+            "body",
+            "author",
+            "is_pinned",
+        )
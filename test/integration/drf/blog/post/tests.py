@@ -1,6 +1,942 @@
+import io
+import json
+import os
+import tempfile
+import time
+from typing import List
+from unittest import mock
+from django.contrib import admin
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.exceptions import MultipleObjectsReturned, ValidationError
+from django.core.management import call_command
+from django.db import connections
+from django.test import RequestFactory, SimpleTestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.permissions import BasePermission, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 from rest_framework.reverse import reverse
-from blog.test import BaseAPITestCase
+from django.contrib.auth.models import Group, Permission, User
+from owned_data.drf.admin import OwnedDataEstimatedCountPaginator
+from owned_data.drf.summaries import _summaries, register_owned_data_summaries
+from owned_data.drf.views import (
+    _OwnedDataScatteredRecords,
+    _get_owned_data_literal_filter,
+    get_owned_data_viewsets,
+)
+from owned_data.drf import (
+    CollaborateType,
+    OwnedDataAuditLog,
+    OwnedDataAuditSink,
+    OwnedDataBitmaskPrincipalSource,
+    OwnedDataDecisionRecord,
+    OwnedDataFilterBackend,
+    OwnedDataSnapshot,
+    OwnedDataSnapshotPrincipalSource,
+    OwnedDataTokenClaimsPrincipalSource,
+    get_owned_data_summaries,
+    owned_data_check_many,
+    owned_data_acl_index,
+    transfer_owned_data,
+)
+from blog.test import BaseAPITestCase, BaseOwnersAPITestCase
+from comment.models import Comment
+from comment.views import CommentViewSet
+from owned_data.drf.policies import OwnedDataPolicyStore
+from owned_data.drf.testing import (
+    OwnedDataFakeUser,
+    OwnedDataPolicyHarness,
+    assert_owned_data_query_budgets,
+)
+from owned_data.models import OwnedDataDecision, OwnedDataPolicy, OwnedDataSummary
+from post.models import Note, Post
+from post.views import (
+    AdminPostViewSet,
+    ManagedPostViewSet,
+    NoteViewSet,
+    PublicShardedPostViewSet,
+)
+
+
+class ListAuditSink(OwnedDataAuditSink):
+    def __init__(self):
+        self.records = []
+
+    def write(self, records: List[OwnedDataDecisionRecord]):
+        self.records.extend(records)
+
+
+class TestPostQueries(BaseOwnersAPITestCase):
+    def test_public_posts_prefetch_owned_comments(self):
+        for i in range(3):
+            post = Post.objects.create(
+                title=f"post {i}", body="content", author=self.user, is_draft=False
+            )
+            Comment.objects.create(body="mine", user=self.user, post=post)
+            Comment.objects.create(body="not mine", user=self.other_user, post=post)
+
+        self.client.force_authenticate(self.user)
+        # The shared comments filter looks up the content type once per process.
+        ContentType.objects.get_for_model(Comment)
+
+        # Posts and their comments, regardless of the number of posts.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("post:post-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 3)
+        for post in response.json():
+            self.assertEqual([c["body"] for c in post["comments"]], ["mine"])
+
+    @mock.patch.object(CommentViewSet, "filter_backends", [OwnedDataFilterBackend])
+    def test_public_posts_prefetch_through_filter_backend(self):
+        post = Post.objects.create(
+            title="post", body="content", author=self.user, is_draft=False
+        )
+        Comment.objects.create(body="mine", user=self.user, post=post)
+        Comment.objects.create(body="theirs", user=self.other_user, post=post)
+
+        # The related viewset leaves the owned data filter to its filter backend.
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse("post:post-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([c["body"] for c in response.json()[0]["comments"]], ["mine"])
+
+    def test_generic_view_filter_backend_and_permission(self):
+        Post.objects.create(title="draft post", body="content", author=self.user)
+        Post.objects.create(title="published post", body="content", author=self.user)
+        Post.objects.create(title="draft post", body="content", author=self.other_user)
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(reverse("post:owned_post-list"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.groups.add(Group.objects.get(name="editor"))
+
+        # The group membership, and the posts in a single filter.
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("post:owned_post-list"), {"title": "draft"}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p["title"] for p in response.json()], ["draft post"])
+
+    def test_select_related_owner_and_only_serialized_fields(self):
+        self.user.groups.add(Group.objects.get(name="editor"))
+        for i in range(3):
+            Post.objects.create(title=f"post {i}", body="content", author=self.user)
+
+        request = Request(APIRequestFactory().get("/"))
+        request.user = self.user
+        view = AdminPostViewSet(
+            request=request, action="list", format_kwarg=None, args=(), kwargs={}
+        )
+        queryset = view.get_queryset()
+        self.assertEqual(
+            queryset.query.deferred_loading,
+            (frozenset({"id", "title", "body", "is_draft", "author"}), False),
+        )
+        # __str__ uses the author, without a query per post.
+        with self.assertNumQueries(1):
+            self.assertEqual(len([str(post) for post in queryset]), 3)
+
+        # A policy override of owned_data_fields gets its own plan.
+        view = AdminPostViewSet(
+            request=request, action="list", format_kwarg=None, args=(), kwargs={}
+        )
+        view.owned_data_fields = ["is_draft=False"]
+        self.assertFalse(view.get_queryset().query.select_related)
+        view = AdminPostViewSet(
+            request=request, action="list", format_kwarg=None, args=(), kwargs={}
+        )
+        self.assertEqual(view.get_queryset().query.select_related, {"author": {}})
+
+
+class TestPostPrincipalSources(BaseOwnersAPITestCase):
+    @mock.patch.object(
+        AdminPostViewSet,
+        "owned_data_principal_source_class",
+        OwnedDataTokenClaimsPrincipalSource,
+    )
+    def test_collaborators_by_token_claims(self):
+        Post.objects.create(title="post", body="content", author=self.user)
+
+        # Only the posts query, the group is validated by the token claims.
+        self.client.force_authenticate(self.user, token={"groups": ["editor"]})
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("post:admin_post-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 1)
+
+        self.client.force_authenticate(self.user, token={"groups": ["customer"]})
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("post:admin_post-list"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @mock.patch.object(
+        AdminPostViewSet,
+        "owned_data_principal_source_class",
+        OwnedDataBitmaskPrincipalSource,
+    )
+    def test_collaborators_by_bitmask_index(self):
+        owned_data_acl_index.invalidate()
+        editor = Group.objects.get(name="editor")
+        self.user.groups.add(editor)
+        self.client.force_authenticate(self.user)
+
+        # The user masks: groups, user and group permissions, then the posts.
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("post:admin_post-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # The posts only.
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("post:admin_post-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # The membership change drops the user mask.
+        self.user.groups.remove(editor)
+        response = self.client.get(reverse("post:admin_post-list"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_collaborators_by_snapshot(self):
+        editor = Group.objects.get(name="editor")
+        self.user.groups.add(editor)
+        Post.objects.create(title="post", body="content", author=self.user)
+        self.client.force_authenticate(self.user)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "owned_data.snapshot")
+            call_command("owned_data_snapshot", path, stdout=io.StringIO())
+
+            snapshot = OwnedDataSnapshot(path)
+            snapshot.check_interval = 0
+            source_class = type(
+                "PostSnapshotPrincipalSource",
+                (OwnedDataSnapshotPrincipalSource,),
+                {"snapshot": snapshot},
+            )
+            with mock.patch.object(
+                AdminPostViewSet, "owned_data_principal_source_class", source_class
+            ):
+                # The posts only.
+                with self.assertNumQueries(1):
+                    response = self.client.get(reverse("post:admin_post-list"))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(len(response.json()), 1)
+
+                # The workers see the swapped snapshot.
+                layout = snapshot._layout
+                self.user.groups.remove(editor)
+                call_command("owned_data_snapshot", path, stdout=io.StringIO())
+                response = self.client.get(reverse("post:admin_post-list"))
+                self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+                # The concurrent readers of the previous mapping still read it whole.
+                self.assertIsNot(snapshot._layout, layout)
+                group_mask, _ = layout.get_user_masks(self.user.pk)
+                self.assertTrue(group_mask & layout.get_bits("g", "editor"))
+
+    def test_snapshot_permission_labels_and_max_age(self):
+        user = self.user
+        user.user_permissions.add(Permission.objects.get(codename="change_note"))
+        # The same codename in another app.
+        Permission.objects.create(
+            codename="change_note",
+            name="Can change comment notes",
+            content_type=ContentType.objects.get_for_model(Comment),
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "owned_data.snapshot")
+            call_command("owned_data_snapshot", path, stdout=io.StringIO())
+            snapshot = OwnedDataSnapshot(path)
+            self.assertIs(snapshot.check(user.pk, "p", "post.change_note"), True)
+            self.assertIs(snapshot.check(user.pk, "p", "comment.change_note"), False)
+            # The bare codenames, unless they're in several apps.
+            self.assertIs(snapshot.check(user.pk, "p", "delete_note"), False)
+            self.assertIsNone(snapshot.check(user.pk, "p", "change_note"))
+
+            # The snapshot expires, e.g. if the refresher stops.
+            snapshot.max_age = 60
+            built_at = snapshot._layout.built_at
+            with mock.patch(
+                "owned_data.drf.snapshot.time.time", return_value=built_at + 30
+            ):
+                self.assertTrue(snapshot.check(user.pk, "p", "post.change_note"))
+            with mock.patch(
+                "owned_data.drf.snapshot.time.time", return_value=built_at + 90
+            ):
+                self.assertIsNone(snapshot.check(user.pk, "p", "post.change_note"))
+
+    def test_collaborators_short_circuit_by_cost(self):
+        Post.objects.create(title="post", body="content", author=self.user)
+        self.client.force_authenticate(self.user)
+
+        collaborators = {CollaborateType.GET: ["p:view_post", "g:editor", "u:user1"]}
+        with mock.patch.object(
+            AdminPostViewSet, "owned_data_collaborators", collaborators
+        ), mock.patch.object(
+            AdminPostViewSet,
+            "owned_data_collaborators_match",
+            {CollaborateType.GET: "any"},
+        ):
+            # The posts only, the user is matched in memory before the lookups.
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse("post:admin_post-list"))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            # The group names, then the permission lookup and the permission sets.
+            self.client.force_authenticate(self.other_user)
+            with self.assertNumQueries(4):
+                response = self.client.get(reverse("post:admin_post-list"))
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        # All of them: the user mismatch denies without a query.
+        with mock.patch.object(
+            AdminPostViewSet, "owned_data_collaborators", collaborators
+        ):
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse("post:admin_post-list"))
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+            # Superusers have the permission without a lookup.
+            self.user.is_superuser = True
+            self.user.groups.add(Group.objects.get(name="editor"))
+            self.client.force_authenticate(self.user)
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse("post:admin_post-list"))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TestPostAuditLog(BaseOwnersAPITestCase):
+    def test_audit_log_decisions(self):
+        self.client.force_authenticate(self.user)
+        audit_log = OwnedDataAuditLog(background=False)
+
+        with mock.patch.object(AdminPostViewSet, "owned_data_audit_log", audit_log):
+            response = self.client.get(reverse("post:admin_post-list"))
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            self.user.groups.add(Group.objects.get(name="editor"))
+            # The decision is queued, without an audit write.
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse("post:admin_post-list"))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        audit_log.flush()
+        user_pk = self.user.pk
+        self.assertEqual(
+            list(
+                OwnedDataDecision.objects.order_by("pk").values_list(
+                    "user", "viewset", "action", "allowed", "collaborator"
+                )
+            ),
+            [
+                (user_pk, "post.views.AdminPostViewSet", "list", False, "g:editor"),
+                (user_pk, "post.views.AdminPostViewSet", "list", True, "g:editor"),
+            ],
+        )
+
+    def test_audit_log_one_decision_per_write(self):
+        self.user.groups.add(Group.objects.get(name="editor"))
+        post = Post.objects.create(title="post", body="content", author=self.user)
+        self.client.force_authenticate(self.user)
+        audit_log = OwnedDataAuditLog(background=False)
+
+        with mock.patch.object(
+            AdminPostViewSet, "owned_data_audit_log", audit_log
+        ), mock.patch.object(ManagedPostViewSet, "owned_data_audit_log", audit_log):
+            response = self.client.patch(
+                reverse("post:admin_post-detail", args=[post.id]), {"title": "patched"}
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = self.client.put(
+                reverse("post:admin_post-detail", args=[post.id]),
+                {"title": "put", "body": "content", "is_draft": True},
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = self.client.delete(
+                reverse("post:managed_post-detail", args=[post.id])
+            )
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        audit_log.flush()
+        self.assertEqual(
+            list(
+                OwnedDataDecision.objects.order_by("pk").values_list(
+                    "action", "allowed"
+                )
+            ),
+            [("partial_update", True), ("update", True), ("destroy", True)],
+        )
+
+    def test_audit_log_truncates_collaborator(self):
+        audit_log = OwnedDataAuditLog(background=False)
+        collaborators = ",".join(f"g:group{i}" for i in range(100))
+        audit_log.record(None, "post.views.AdminPostViewSet", "list", True, collaborators)
+        audit_log.flush()
+        self.assertEqual((audit_log.written, audit_log.failed), (1, 0))
+        self.assertEqual(OwnedDataDecision.objects.get().collaborator, collaborators[:255])
+
+    def test_audit_log_drop_and_background_flush(self):
+        sink = ListAuditSink()
+        audit_log = OwnedDataAuditLog(sink=sink, background=False, max_size=1)
+        audit_log.record(1, "post.views.AdminPostViewSet", "list", True)
+        audit_log.record(1, "post.views.AdminPostViewSet", "list", True)
+        self.assertEqual((audit_log.recorded, audit_log.dropped), (1, 1))
+        audit_log.flush()
+        self.assertEqual(len(sink.records), 1)
+
+        audit_log = OwnedDataAuditLog(sink=sink, flush_interval=0.01)
+        audit_log.record(2, "post.views.AdminPostViewSet", "destroy", False, "g:editor")
+        deadline = time.monotonic() + 5
+        while audit_log.written < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(sink.records[-1].user_pk, 2)
+
+
+class TestPostCommands(BaseAPITestCase):
+    def test_seed_and_load_commands(self):
+        call_command(
+            "seed_owned_data",
+            "--users=10",
+            "--groups=3",
+            "--posts=50",
+            "--comments=100",
+            "--batch-size=20",
+            stdout=io.StringIO(),
+        )
+        self.assertEqual(Post.objects.count(), 50)
+        self.assertFalse(Comment.objects.filter(owned_data_owner=None).exists())
+
+        stdout = io.StringIO()
+        # The driver sends the requests to localhost.
+        with self.settings(ALLOWED_HOSTS=["localhost"]):
+            call_command(
+                "load_owned_data", "--requests=20", "--threads=1", stdout=stdout
+            )
+        self.assertIn("requests: 20", stdout.getvalue())
+        self.assertIn("2xx: 100.0%", stdout.getvalue())
+
+    def test_bench_command_keeps_the_registered_viewsets(self):
+        viewsets = get_owned_data_viewsets()
+        stdout = io.StringIO()
+        call_command("bench_owned_data_acl", "--iterations=5", stdout=stdout)
+        self.assertIn("OwnedDataBitmaskPrincipalSource", stdout.getvalue())
+        self.assertEqual(get_owned_data_viewsets(), viewsets)
+
+
+class TestPostSummaries(BaseOwnersAPITestCase):
+    def test_summary(self):
+        user, other_user = self.user, self.other_user
+        user.groups.add(Group.objects.get(name="editor"))
+        post = Post.objects.create(title="post", body="content", author=user)
+        Post.objects.create(title="post", body="content", author=user, is_draft=False)
+        Post.objects.create(title="post", body="content", author=other_user)
+
+        self.client.force_authenticate(user)
+        # The collaborator check and the summary rows, without GROUP BY.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("post:admin_post-summary"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(), {"total": 2, "per_status": {"True": 1, "False": 1}}
+        )
+
+        # Incremental updates.
+        post.is_draft = False
+        post.save()
+        Post.objects.filter(author=user, is_draft=False).first().delete()
+        response = self.client.get(reverse("post:admin_post-summary"))
+        self.assertEqual(response.json(), {"total": 1, "per_status": {"False": 1}})
+
+        # Repair the drift of the writes without signals.
+        Post.objects.filter(author=user).update(is_draft=True)
+        OwnedDataSummary.objects.all().delete()
+        out = io.StringIO()
+        call_command("owned_data_rebuild_summaries", "--model", "post.Post", stdout=out)
+        self.assertEqual(out.getvalue(), "summary rows: 4\n")
+        response = self.client.get(reverse("post:admin_post-summary"))
+        self.assertEqual(response.json(), {"total": 1, "per_status": {"True": 1}})
+
+        # Rebuild the summaries of both users of an ownership transfer.
+        transfer_owned_data(user, other_user)
+        self.assertEqual(
+            get_owned_data_summaries(AdminPostViewSet, other_user),
+            {"total": 2, "per_status": {"True": 2}},
+        )
+        response = self.client.get(reverse("post:admin_post-summary"))
+        self.assertEqual(response.json(), {"total": 0, "per_status": {}})
+
+    def test_summary_scope_per_viewset(self):
+        user = self.user
+        draft = Post.objects.create(title="post", body="content", author=user)
+        Post.objects.create(title="post", body="content", author=user, is_draft=False)
+
+        # The literal terms of the owner, e.g. of a viewset for the published posts.
+        label = "post.views.PublishedPostViewSet"
+        self.addCleanup(_summaries.pop, label)
+        literal_filter = _get_owned_data_literal_filter(
+            [["author", "is_draft=False"], ["is_draft=True"]], "author"
+        )
+        register_owned_data_summaries(
+            label,
+            Post.objects.filter(literal_filter),
+            "author",
+            {"total": ("count", None)},
+        )
+        call_command("owned_data_rebuild_summaries", stdout=io.StringIO())
+        self.assertEqual(get_owned_data_summaries(label, user), {"total": 1})
+        # The summaries of the other viewsets of the model are kept.
+        self.assertEqual(
+            get_owned_data_summaries(AdminPostViewSet, user),
+            {"total": 2, "per_status": {"True": 1, "False": 1}},
+        )
+
+        # The records move in and out of the queryset.
+        draft.is_draft = False
+        draft.save()
+        self.assertEqual(get_owned_data_summaries(label, user), {"total": 2})
+        draft.is_draft = True
+        draft.save()
+        self.assertEqual(get_owned_data_summaries(label, user), {"total": 1})
+        draft.delete()
+        Post.objects.get().delete()
+        self.assertEqual(get_owned_data_summaries(label, user), {"total": 0})
+        self.assertEqual(
+            get_owned_data_summaries(AdminPostViewSet, user),
+            {"total": 0, "per_status": {}},
+        )
+
+
+class TestPostActions(BaseOwnersAPITestCase):
+    def test_custom_action_query_budgets(self):
+        budgets = {"publish": 0, "unpublish": 0}
+        with mock.patch.object(ManagedPostViewSet, "owned_data_query_budget", budgets):
+            with self.assertRaisesMessage(
+                AssertionError, "post.views.ManagedPostViewSet publish ran"
+            ):
+                assert_owned_data_query_budgets(self.user, [ManagedPostViewSet])
+
+            budgets.update(publish=10, unpublish=10)
+            assert_owned_data_query_budgets(self.user, [ManagedPostViewSet])
+
+    def test_custom_and_bulk_actions(self):
+        first = Post.objects.create(title="first", body="content", author=self.user)
+        second = Post.objects.create(title="second", body="content", author=self.user)
+        other = Post.objects.create(
+            title="other", body="content", author=self.other_user
+        )
+        self.client.force_authenticate(self.user)
+
+        # The custom action by the method of owned_data_actions.
+        first.is_draft = False
+        first.save()
+        response = self.client.post(
+            reverse("post:managed_post-unpublish", args=[first.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(Post.objects.get(id=first.id).is_draft)
+        response = self.client.post(
+            reverse("post:managed_post-unpublish", args=[other.id])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # The collaborators of the bulk action.
+        ids = {"ids": [first.id, second.id, other.id]}
+        response = self.client.post(
+            reverse("post:managed_post-publish"), ids, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        # The summaries listen to the save signals, so the records are saved one by one.
+        self.user.groups.add(Group.objects.get(name="editor"))
+        response = self.client.post(
+            reverse("post:managed_post-publish"), ids, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"updated": 2})
+        self.assertEqual(
+            list(Post.objects.order_by("id").values_list("is_draft", flat=True)),
+            [False, False, True],
+        )
+        self.assertEqual(
+            get_owned_data_summaries(AdminPostViewSet, self.user),
+            {"total": 2, "per_status": {"False": 2}},
+        )
+
+        response = self.client.post(
+            reverse("post:managed_post-publish"), {"ids": "all"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_action_without_owner_filter(self):
+        Post.objects.create(title="first", body="content", author=self.user)
+        url = reverse("post:managed_post-publish")
+
+        # Neither an anonymous user nor a literal only filter updates the whole table.
+        with mock.patch.object(
+            ManagedPostViewSet, "permission_classes", []
+        ), mock.patch.object(ManagedPostViewSet, "owned_data_collaborators", {}):
+            response = self.client.post(url, format="json")
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            self.client.force_authenticate(self.user)
+            with mock.patch.object(ManagedPostViewSet, "owned_data_fields", None):
+                response = self.client.post(url, format="json")
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Post.objects.get().is_draft)
+
+        # Unless the collaborators of the action allow it.
+        self.client.force_authenticate(None)
+        with mock.patch.object(
+            ManagedPostViewSet, "permission_classes", []
+        ), mock.patch.object(
+            ManagedPostViewSet, "owned_data_collaborators", {"publish": ["*"]}
+        ):
+            response = self.client.post(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"updated": 1})
+
+
+class TestPostAdmin(BaseOwnersAPITestCase):
+    def test_admin_get_owned_posts(self):
+        user = self.user
+        user.is_staff = user.is_superuser = True
+        user.save()
+        self.other_user.is_staff = True
+        self.other_user.save()
+        user.groups.add(Group.objects.get(name="editor"))
+        post = Post.objects.create(title="mine", body="content", author=user)
+        Post.objects.create(title="not mine", body="content", author=self.other_user)
+
+        post_admin = admin.site._registry[Post]
+        request = RequestFactory().get("/admin/post/post/")
+        request.user = user
+        self.assertEqual(list(post_admin.get_queryset(request)), [post])
+        self.assertTrue(post_admin.has_view_permission(request))
+        self.assertTrue(post_admin.has_change_permission(request, post))
+
+        # Not an editor.
+        user.groups.clear()
+        request.user = User.objects.get(pk=user.pk)
+        self.assertFalse(post_admin.has_view_permission(request))
+        self.assertFalse(post_admin.has_change_permission(request, post))
+
+    def test_admin_paginator_estimates_large_counts(self):
+        for i in range(5):
+            Post.objects.create(title=f"post {i}", body="content", author=self.user)
+
+        paginator = OwnedDataEstimatedCountPaginator(Post.objects.order_by("id"), 2)
+        self.assertEqual(paginator.count, 5)
+
+        # No plan estimate out of PostgreSQL, so it's the full count.
+        paginator = OwnedDataEstimatedCountPaginator(Post.objects.order_by("id"), 2)
+        paginator.estimate_threshold = 3
+        self.assertEqual(paginator.count, 5)
+        self.assertEqual(paginator.num_pages, 3)
+
+        paginator = OwnedDataEstimatedCountPaginator(Post.objects.order_by("id"), 2)
+        paginator.estimate_threshold = 3
+        postgresql = {"default": mock.Mock(vendor="postgresql")}
+        plan = json.dumps([{"Plan": {"Plan Rows": 1000}}])
+        with mock.patch("owned_data.drf.admin.connections", postgresql), mock.patch(
+            "django.db.models.query.QuerySet.explain", return_value=plan
+        ):
+            self.assertEqual(paginator.count, 1000)
+
+
+class TestPostPolicies(BaseOwnersAPITestCase):
+    def test_policy_overrides_collaborators(self):
+        post = Post.objects.create(title="post", body="content", author=self.user)
+        self.client.force_authenticate(self.user)
+
+        url = reverse("post:managed_post-detail", args=[post.pk])
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            owned_data_check_many(ManagedPostViewSet, self.user, "destroy", [post]), []
+        )
+
+        # The saved policy is applied without a redeploy.
+        policy = OwnedDataPolicy.objects.create(
+            viewset="post.views.ManagedPostViewSet", collaborators={"delete": ["*"]}
+        )
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+
+        policy.delete()
+        post = Post.objects.create(title="post", body="content", author=self.user)
+        url = reverse("post:managed_post-detail", args=[post.pk])
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_policy_merges_collaborators(self):
+        Post.objects.create(title="post", body="content", author=self.user)
+        self.client.force_authenticate(self.user)
+        url = reverse("post:managed_post-publish")
+
+        # The "publish" collaborators of the class are kept.
+        OwnedDataPolicy.objects.create(
+            viewset="post.views.ManagedPostViewSet", collaborators={"get": ["*"]}
+        )
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Post.objects.get().is_draft)
+
+        # The actions are valid policy keys.
+        policy = OwnedDataPolicy.objects.get()
+        policy.collaborators = {"publish": ["*"]}
+        policy.full_clean()
+        policy.save()
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_200_OK)
+        self.assertFalse(Post.objects.get().is_draft)
+
+        # The conditional collaborators are rejected.
+        policy.collaborators = {"post": [[["g:bot"], ["is_draft=True"]]]}
+        with self.assertRaisesMessage(ValidationError, "must be a list of strings"):
+            policy.full_clean()
+
+    def test_policy_store_version_check(self):
+        label = "post.views.ManagedPostViewSet"
+        OwnedDataPolicy.objects.create(viewset=label, fields=["author"])
+        store = OwnedDataPolicyStore()
+        store.check_interval = 60
+        self.assertEqual(store.get_policy(label), (["author"], None))
+
+        # Changed by another worker.
+        OwnedDataPolicy.objects.filter(viewset=label).update(fields=[["author"]])
+        cache.set(store.version_key, "other worker")
+        with self.assertNumQueries(0):
+            self.assertEqual(store.get_policy(label), (["author"], None))
+
+        # After the check interval.
+        with mock.patch("owned_data.drf.policies.time.monotonic", return_value=1e12):
+            self.assertEqual(store.get_policy(label), ([["author"]], None))
+
+
+class DenyObjectPermission(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        return False
+
+
+class TestNote(BaseOwnersAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.note = Note.objects.create(body="mine", author=cls.user)
+        cls.other_note = Note.objects.create(body="theirs", author=cls.other_user)
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def test_partial_update_in_single_statement(self):
+        with self.assertNumQueries(1):
+            response = self.client.patch(
+                reverse("post:note-detail", args=[self.note.id]), {"is_pinned": True}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"is_pinned": True})
+        self.assertTrue(Note.objects.get(id=self.note.id).is_pinned)
+
+        response = self.client.patch(
+            reverse("post:note-detail", args=[self.other_note.id]), {"is_pinned": True}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Note.objects.get(id=self.other_note.id).is_pinned)
+
+    def test_bulk_update_in_single_statement(self):
+        ids = {"ids": [self.note.id, self.other_note.id]}
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse("post:note-pin"), ids, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"updated": 1})
+        self.assertTrue(Note.objects.get(id=self.note.id).is_pinned)
+        self.assertFalse(Note.objects.get(id=self.other_note.id).is_pinned)
+
+    def test_object_permissions_load_the_object(self):
+        url = reverse("post:note-detail", args=[self.note.id])
+        with mock.patch.object(
+            NoteViewSet, "permission_classes", [IsAuthenticated, DenyObjectPermission]
+        ):
+            response = self.client.patch(url, {"is_pinned": True})
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            response = self.client.delete(url)
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Note.objects.get(id=self.note.id).is_pinned)
+
+    def test_invalid_lookup_not_found(self):
+        url = reverse("post:note-detail", args=["abc"])
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.patch(url, {"is_pinned": True})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_empty_partial_update_checks_ownership(self):
+        # The owner fields are read-only, so nothing is left to update.
+        with self.assertNumQueries(1):
+            response = self.client.patch(
+                reverse("post:note-detail", args=[self.note.id]),
+                {"author": self.other_user.id},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Note.objects.get(id=self.note.id).author, self.user)
+
+        response = self.client.patch(
+            reverse("post:note-detail", args=[self.other_note.id]), {}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TestShardedPost(BaseAPITestCase):
+    databases = {"default", "shard_0", "shard_1"}
+
+    @classmethod
+    def setUpTestData(cls):
+        # The owners exist on every shard.
+        cls.users = [User.objects.create(username=f"user{i}") for i in range(2)]
+        for user in cls.users:
+            user.save(using="shard_0")
+            user.save(using="shard_1")
+
+    def test_route_by_owner(self):
+        for user in self.users:
+            self.client.force_authenticate(user)
+            response = self.client.post(
+                reverse("post:sharded_post-list"),
+                {"title": user.username, "body": "content", "is_draft": False},
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+            shard = f"shard_{user.pk % 2}"
+            post = Post.objects.using(shard).get(author=user)
+            self.assertFalse(Post.objects.filter(pk=post.pk, author=user).exists())
+
+            response = self.client.get(reverse("post:sharded_post-list"))
+            self.assertEqual([p["title"] for p in response.json()], [user.username])
+
+            response = self.client.patch(
+                reverse("post:sharded_post-detail", args=[post.pk]), {"body": "edited"}
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(Post.objects.using(shard).get(pk=post.pk).body, "edited")
+
+    def test_scatter_gather(self):
+        # The primary keys are unique across the shards.
+        posts = [("b", self.users[0]), ("a", self.users[1]), ("c", self.users[0])]
+        for pk, (title, user) in enumerate(posts, 1):
+            Post.objects.using(f"shard_{user.pk % 2}").create(
+                pk=pk, title=title, body="content", author=user, is_draft=False
+            )
+        Post.objects.using("shard_0").create(
+            pk=4, title="draft", body="content", author=self.users[1]
+        )
+
+        response = self.client.get(reverse("post:public_sharded_post-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p["title"] for p in response.json()], ["a", "b", "c"])
+
+        post = Post.objects.using(f"shard_{self.users[1].pk % 2}").get(title="a")
+        response = self.client.get(
+            reverse("post:public_sharded_post-detail", args=[post.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["title"], "a")
+
+        response = self.client.get(reverse("post:public_sharded_post-export"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(sorted(row["title"] for row in rows), ["a", "b", "c"])
+
+        # The scattered routes are read only.
+        self.client.force_authenticate(self.users[1])
+        response = self.client.delete(
+            reverse("post:public_sharded_post-detail", args=[post.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        with mock.patch.object(
+            PublicShardedPostViewSet, "http_method_names", ["get", "post"]
+        ):
+            response = self.client.post(
+                reverse("post:public_sharded_post-list"),
+                {"title": "d", "body": "content", "is_draft": False},
+            )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_scatter_gather_duplicate_pk(self):
+        for user in self.users:
+            Post.objects.using(f"shard_{user.pk % 2}").create(
+                pk=1, title=user.username, body="content", author=user, is_draft=False
+            )
+
+        with self.assertRaises(MultipleObjectsReturned):
+            self.client.get(reverse("post:public_sharded_post-detail", args=[1]))
+
+    def test_scatter_gather_page_window(self):
+        for i, title in enumerate("abcdef"):
+            user = self.users[i % 2]
+            Post.objects.using(f"shard_{user.pk % 2}").create(
+                title=title, body="content", author=user, is_draft=False
+            )
+
+        with mock.patch.object(
+            PublicShardedPostViewSet, "pagination_class", LimitOffsetPagination
+        ), CaptureQueriesContext(connections["shard_0"]) as queries:
+            response = self.client.get(
+                reverse("post:public_sharded_post-list"), {"limit": 2, "offset": 1}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 6)
+        self.assertEqual([p["title"] for p in response.json()["results"]], ["b", "c"])
+        # The count, and the first offset + limit records of the shard.
+        self.assertEqual(len(queries), 2)
+        self.assertIn("LIMIT 3", queries[1]["sql"])
+
+    def test_scatter_gather_null_ordering(self):
+        # The primary keys are unique across the shards.
+        for i, user in enumerate(self.users):
+            shard = f"shard_{user.pk % 2}"
+            post = Post.objects.using(shard).create(
+                pk=i + 1, title="post", body="content", author=user
+            )
+            Comment.objects.using(shard).bulk_create(
+                Comment(
+                    pk=i * 2 + j + 1,
+                    body="comment",
+                    user_id=user.pk,
+                    post_id=post.pk,
+                    owned_data_owner_id=owner_pk,
+                )
+                for j, owner_pk in enumerate([user.pk, None])
+            )
+
+        queryset = Comment.objects.order_by("-owned_data_owner")
+        records = _OwnedDataScatteredRecords(queryset, ["shard_0", "shard_1"])
+        owners = [c.owned_data_owner_id for c in records]
+        self.assertEqual(owners, [self.users[1].pk, self.users[0].pk, None, None])
+        self.assertEqual([c.owned_data_owner_id for c in records[2:]], [None, None])
+
+        records = _OwnedDataScatteredRecords(
+            queryset.order_by("owned_data_owner"), ["shard_0", "shard_1"]
+        )
+        self.assertEqual(
+            [c.owned_data_owner_id for c in records[:3]],
+            [None, None, self.users[0].pk],
+        )
+        self.assertEqual(len(records), 4)
+
+
+class TestPostPolicyHarness(SimpleTestCase):
+    def test_collaborators_and_filter_in_memory(self):
+        posts = [Post(pk=1, author_id=1), Post(pk=2, author_id=2)]
+
+        editor = OwnedDataPolicyHarness(
+            AdminPostViewSet, OwnedDataFakeUser(1, groups=["editor"])
+        )
+        self.assertTrue(editor.is_allowed("list"))
+        self.assertTrue(editor.is_allowed("create"))
+        self.assertEqual(editor.filter("list", posts), posts[:1])
+
+        user = OwnedDataPolicyHarness(AdminPostViewSet, OwnedDataFakeUser(2))
+        self.assertFalse(user.is_allowed("partial_update"))
+        self.assertEqual(user.filter("list", posts), [])
 
 
 class TestPost(BaseAPITestCase):
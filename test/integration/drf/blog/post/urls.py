@@ -2,12 +2,25 @@ from django.urls import path, include
 
 from rest_framework import routers
 
-from post.views import PublicPostViewSet, AdminPostViewSet
+from post.views import (
+    AdminPostViewSet,
+    ManagedPostViewSet,
+    NoteViewSet,
+    OwnedPostListView,
+    PublicPostViewSet,
+    PublicShardedPostViewSet,
+    ShardedPostViewSet,
+)
 
 router = routers.DefaultRouter()
 router.register("me/posts", AdminPostViewSet, basename="admin_post")
 router.register("posts", PublicPostViewSet, basename="post")
+router.register("me/managed", ManagedPostViewSet, basename="managed_post")
+router.register("me/notes", NoteViewSet, basename="note")
+router.register("me/sharded", ShardedPostViewSet, basename="sharded_post")
+router.register("sharded", PublicShardedPostViewSet, basename="public_sharded_post")
 
 urlpatterns = [
+    path("me/list/", OwnedPostListView.as_view(), name="owned_post-list"),
     path("", include(router.urls)),
 ]
@@ -1,7 +1,15 @@
-from rest_framework import viewsets, permissions
-from owned_data.drf import CollaborateType, OwnedDataModelViewSet
-from .models import Post
-from .serializers import PostSerializer
+from rest_framework import generics, viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from owned_data.drf import (
+    CollaborateType,
+    OwnedDataFilterBackend,
+    OwnedDataMixin,
+    OwnedDataModelViewSet,
+    OwnedDataPermission,
+)
+from .models import Note, Post
+from .serializers import NoteSerializer, PostSerializer, PublicPostSerializer
 
 
 class AdminPostViewSet(OwnedDataModelViewSet, viewsets.ModelViewSet):
@@ -18,12 +26,16 @@ class AdminPostViewSet(OwnedDataModelViewSet, viewsets.ModelViewSet):
     }
     owned_data_filter_by_fields = True
     owned_data_apply_default_permissions = True
+    owned_data_summaries = {
+        "total": ("count", None),
+        "per_status": ("count", "is_draft"),
+    }
     permission_classes = [permissions.IsAuthenticated]
 
 
 class PublicPostViewSet(OwnedDataModelViewSet, viewsets.ModelViewSet):
 
-    serializer_class = PostSerializer
+    serializer_class = PublicPostSerializer
     queryset = Post.objects.filter(is_draft=False)
 
     # owned-data attributes
@@ -32,5 +44,81 @@ class PublicPostViewSet(OwnedDataModelViewSet, viewsets.ModelViewSet):
         CollaborateType.GET: ["*"],
     }
     owned_data_filter_by_fields = False
+    owned_data_prefetch_related = {"comments": "comment.views.CommentViewSet"}
     owned_data_apply_default_permissions = True
 
+
+class ShardedPostViewSet(OwnedDataModelViewSet, viewsets.ModelViewSet):
+
+    serializer_class = PostSerializer
+    queryset = Post.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
+
+    # owned-data attributes
+    owned_data_fields = ["author"]
+    owned_data_shards = ["shard_0", "shard_1"]
+
+
+class PublicShardedPostViewSet(OwnedDataModelViewSet, viewsets.ReadOnlyModelViewSet):
+
+    serializer_class = PostSerializer
+    queryset = Post.objects.order_by("title")
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    http_method_names = ["get", "head", "options"]
+
+    # owned-data attributes
+    owned_data_fields = ["is_draft=False"]
+    owned_data_shards = ["shard_0", "shard_1"]
+    owned_data_export_fields = ["id", "title"]
+
+
+class ManagedPostViewSet(OwnedDataModelViewSet, viewsets.ModelViewSet):
+
+    serializer_class = PostSerializer
+    queryset = Post.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
+
+    # owned-data attributes
+    owned_data_fields = ["author"]
+    owned_data_collaborators = {
+        CollaborateType.DELETE: ["g:editor"],
+        "publish": ["g:editor"],
+    }
+    owned_data_actions = {"unpublish": CollaborateType.POST}
+    owned_data_bulk_updates = {"publish": {"is_draft": False}}
+    owned_data_policy = True
+
+    @action(detail=True, methods=["post"])
+    def unpublish(self, request, pk=None):
+        post = self.get_object()
+        post.is_draft = True
+        post.save(update_fields=["is_draft"])
+        return Response(self.get_serializer(post).data)
+
+
+class NoteViewSet(OwnedDataModelViewSet, viewsets.ModelViewSet):
+
+    serializer_class = NoteSerializer
+    queryset = Note.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
+
+    # owned-data attributes
+    owned_data_fields = ["author"]
+    owned_data_fast_write = True
+    owned_data_inject_owner_fields = True
+    owned_data_bulk_updates = {"pin": {"is_pinned": True}}
+
+
+class OwnedPostListView(OwnedDataMixin, generics.ListAPIView):
+
+    serializer_class = PostSerializer
+    queryset = Post.objects.all()
+    filter_backends = [OwnedDataFilterBackend]
+    permission_classes = [permissions.IsAuthenticated, OwnedDataPermission]
+
+    # owned-data attributes
+    owned_data_fields = ["author"]
+    owned_data_collaborators = {
+        CollaborateType.GET: ["g:editor"],
+    }
+    owned_data_filter_params = {"title": "title__icontains"}
@@ -0,0 +1,57 @@
+"""Seed the cron database with a large owned data set for load tests."""
+import random
+from itertools import accumulate
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from job.models import Job
+
+
+class Command(BaseCommand):
+    """Seed users and jobs with a skewed ownership."""
+
+    help = "Seed users and jobs with a skewed ownership distribution."
+
+    def add_arguments(self, parser):
+        """Django built-in method."""
+        parser.add_argument("--users", type=int, default=5000)
+        parser.add_argument("--jobs", type=int, default=1_000_000)
+        parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        """Django built-in method."""
+        rand = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+
+        password = make_password(None)
+        first_user = User.objects.count()
+        for start in range(0, options["users"], batch_size):
+            User.objects.bulk_create(
+                User(username=f"seed-user-{first_user + i}", password=password)
+                for i in range(start, min(start + batch_size, options["users"]))
+            )
+        user_ids = list(
+            User.objects.filter(username__startswith="seed-user-").values_list(
+                "id", flat=True
+            )
+        )
+        rand.shuffle(user_ids)
+        user_weights = list(
+            accumulate(1 / (rank ** options["skew"]) for rank in range(1, len(user_ids) + 1))
+        )
+
+        for start in range(0, options["jobs"], batch_size):
+            size = min(batch_size, options["jobs"] - start)
+            Job.objects.bulk_create(
+                Job(
+                    command=f"job {start + i}",
+                    user_id=user_id,
+                    timeout=rand.choice((30, 60, 300, 3600)),
+                )
+                for i, user_id in enumerate(
+                    rand.choices(user_ids, cum_weights=user_weights, k=size)
+                )
+            )
+        self.stdout.write(f"users: {len(user_ids)}, jobs: {Job.objects.count()}")